@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,6 +44,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its latency covers the other middleware as well
+    'my_garden_app.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -56,7 +59,8 @@ ROOT_URLCONF = 'my_garden.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates which reports render time to the request metrics
+        'BACKEND': 'my_garden_app.metrics.TimedDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -96,6 +100,40 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'my-garden',
+    }
+}
+
+# Lifetime of cached plant, maintenance and comments pages (in seconds)
+PLANT_CACHE_TIMEOUT = 60 * 60
+# Ids of each user's gardens, used for ownership checks of garden views (invalidated on change);
+# with the process-local LocMemCache only for GARDEN_OWNERSHIP_LOCAL_CACHE_TIMEOUT, so access taken away
+# in one worker process ends in the others within that time
+GARDEN_OWNERSHIP_CACHE_TIMEOUT = 60 * 60
+GARDEN_OWNERSHIP_LOCAL_CACHE_TIMEOUT = 10
+# Upper limit for cached task dashboards; they expire at the end of the week of the month anyway
+DASHBOARD_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+# Limit for the process-local LocMemCache, whose invalidations other worker processes do not see;
+# with a shared cache (Redis, Memcached) DASHBOARD_CACHE_TIMEOUT applies
+DASHBOARD_LOCAL_CACHE_TIMEOUT = 60
+# Request metrics exposed at /metrics (see my_garden_app/metrics.py)
+METRICS_LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+# Shared directory for totals of preforked worker processes; unset - metrics of the scraped process only
+METRICS_DIR = os.environ.get('MY_GARDEN_METRICS_DIR')
+METRICS_FLUSH_INTERVAL = 5
+# Scrapers of /metrics send "Authorization: Bearer <token>"; unset - /metrics is open to staff users only.
+# Client addresses are not trusted: behind a local reverse proxy every request comes from 127.0.0.1
+METRICS_TOKEN = os.environ.get('MY_GARDEN_METRICS_TOKEN')
+
+# Admin changelists of tables with at least this many rows (PostgreSQL estimate) show an estimated count
+ESTIMATED_COUNT_THRESHOLD = 100000
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -142,4 +180,32 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 LOGIN_URL = '/login'
 LOGIN_REDIRECT_URL = '/'
 # Set up required to process messages
-MESSAGE_STORAGE = 'django.contrib.messages.storage.session.SessionStorage'
\ No newline at end of file
+MESSAGE_STORAGE = 'django.contrib.messages.storage.session.SessionStorage'
+
+# In-memory plant attribute index used by the faceted plant filter,
+# rebuilt after plant changes and at least every PLANT_ATTRIBUTE_INDEX_MAX_AGE seconds
+PLANT_ATTRIBUTE_INDEX = True
+PLANT_ATTRIBUTE_INDEX_MAX_AGE = 300
+# In-memory prefix index of plant names for autocomplete, rebuilt when the catalogue version in the cache
+# changes and at least every PLANT_AUTOCOMPLETE_MAX_AGE seconds
+PLANT_AUTOCOMPLETE_MAX_AGE = 300
+
+# Resized JPEG/WebP variants of static images, generated by `manage.py build_responsive_images`
+RESPONSIVE_IMAGES = [
+    'images/azalia.jpg',
+    'images/bez.jpg',
+    'images/budleja.jpg',
+    'images/glicynia.jpg',
+    'images/magnolia.jpg',
+    'images/clematis.jpg',
+]
+RESPONSIVE_IMAGE_WIDTHS = [480, 960, 1600]
+RESPONSIVE_IMAGES_ROOT = BASE_DIR / 'my_garden_app' / 'static' / 'images' / 'responsive'
+RESPONSIVE_IMAGES_URL = STATIC_URL + 'images/responsive/'
+
+# User uploads (plant photos)
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+PLANT_PHOTO_MAX_SIZE = 10 * 1024 * 1024
+# Threads generating photo thumbnails in the background; 0 generates them in the request
+PLANT_PHOTO_WORKERS = 2
@@ -14,8 +14,18 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path
+from my_garden_app.api import ApiListView, ApiDetailView
+from my_garden_app.async_views import (AsyncPlantsListView,
+                                       AsyncPlantDetailView,
+                                       AsyncGardensListView,
+                                       AsyncGardenDetailView,
+                                       AsyncDisplayMonthlyTasksView,
+                                       AsyncCommentsListView,
+                                       )
 from my_garden_app.views import (MyGardenLoginView,
                                  PlantAddView,
                                  PlantEditView,
@@ -39,6 +49,15 @@ from my_garden_app.views import (MyGardenLoginView,
                                  GardenDetailView,
                                  GardenEditView,
                                  CommentsListView,
+                                 PlantFacetView,
+                                 PlantAutocompleteView,
+                                 GardenAutocompleteView,
+                                 CacheStatsView,
+                                 MetricsView,
+                                 CommentsFeedView,
+                                 GardenExportView,
+                                 DashboardView,
+                                 PlantPhotoAddView,
                                  )
 
 urlpatterns = [
@@ -60,10 +79,38 @@ urlpatterns = [
     path('gardens_list/', GardensListView.as_view(), name='gardens_list'),
     path('garden_details/<int:garden_id>/', GardenDetailView.as_view(), name='garden_details'),
     path('plant_search/', PlantSearchView.as_view(), name='plant_search'),
+    path('plants_filter/', PlantFacetView.as_view(), name='plants_filter'),
+    path('autocomplete/plants/', PlantAutocompleteView.as_view(), name='plant_autocomplete'),
+    path('autocomplete/gardens/', GardenAutocompleteView.as_view(), name='garden_autocomplete'),
     path('add_plant_to_garden/<int:garden_id>/', PlantToGardenAddView.as_view(), name='add_plant_to_garden'),
     path('edit_plant_in_garden/<int:plant_garden_id>/', PlantToGardenEditView.as_view(), name='edit_plant_in_garden'),
     path('delete_plant_from_garden/<int:plant_garden_id>/', PlantToGardenDeleteView.as_view(), name='delete_plant_from_garden'),
     path('monthly_tasks/<int:garden_id>/', DisplayMonthlyTasksView.as_view(), name='monthly_tasks'),
     path('plant/<int:plant_id>/comment/', AddCommentView.as_view(), name='add_comment'),
+    path('dashboard/', DashboardView.as_view(), name='dashboard'),
+    path('export/<int:garden_id>/<str:dataset>/', GardenExportView.as_view(), name='garden_export'),
+    path('plant/<int:plant_id>/photo/', PlantPhotoAddView.as_view(), name='add_plant_photo'),
     path('comments_list/<int:plant_id>/', CommentsListView.as_view(), name='comments_list'),
+    path('comments_feed/<int:plant_id>/', CommentsFeedView.as_view(), name='comments_feed'),
+    path('cache_stats/', CacheStatsView.as_view(), name='cache_stats'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+    path('api/plants/', ApiListView.as_view(resource='plants'), name='api_plant_list'),
+    path('api/plants/<int:pk>/', ApiDetailView.as_view(resource='plants'), name='api_plant_detail'),
+    path('api/gardens/', ApiListView.as_view(resource='gardens'), name='api_garden_list'),
+    path('api/gardens/<int:pk>/', ApiDetailView.as_view(resource='gardens'), name='api_garden_detail'),
+    path('api/plantings/', ApiListView.as_view(resource='plantings'), name='api_planting_list'),
+    path('api/plantings/<int:pk>/', ApiDetailView.as_view(resource='plantings'), name='api_planting_detail'),
+    path('api/tasks/', ApiListView.as_view(resource='tasks'), name='api_task_list'),
+    path('api/tasks/<int:pk>/', ApiDetailView.as_view(resource='tasks'), name='api_task_detail'),
+    path('api/comments/', ApiListView.as_view(resource='comments'), name='api_comment_list'),
+    path('api/comments/<int:pk>/', ApiDetailView.as_view(resource='comments'), name='api_comment_detail'),
+    path('async/plants_list/', AsyncPlantsListView.as_view(), name='async_plants_list'),
+    path('async/plant_details/<int:plant_id>/', AsyncPlantDetailView.as_view(), name='async_plant_details'),
+    path('async/gardens_list/', AsyncGardensListView.as_view(), name='async_gardens_list'),
+    path('async/garden_details/<int:garden_id>/', AsyncGardenDetailView.as_view(), name='async_garden_details'),
+    path('async/monthly_tasks/<int:garden_id>/', AsyncDisplayMonthlyTasksView.as_view(), name='async_monthly_tasks'),
+    path('async/comments_list/<int:plant_id>/', AsyncCommentsListView.as_view(), name='async_comments_list'),
 ]
+
+# Uploaded photos, served by Django only in development
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
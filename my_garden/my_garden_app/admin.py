@@ -1,34 +1,88 @@
 from django.contrib import admin
+from django.db.models import Q
 
 # Register your models here.
-from .models import Plant, Garden, PlantGarden, PlantMaintenance, MaintenanceMonthlySchedule, Comments
+from .models import Plant, Garden, PlantGarden, PlantMaintenance, MaintenanceMonthlySchedule, Comments, \
+    PlantPhoto
+from .pagination import EstimatedCountPaginator
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Changelist settings for tables which may grow large: bounded pages and no COUNT(*) of the whole table.
+    """
+
+    list_per_page = 50
+    list_max_show_all = 200
+    # The "N total" link next to search results would count the whole table
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+
+class NamePrefixSearchAdmin(LargeTableAdmin):
+    """
+    Search by the beginning of the name, also used by autocomplete_fields of other admins.
+
+    A case-sensitive prefix match (as typed, or with the first letter capitalized) can use the index of
+    the name column, unlike the default icontains which scans the whole table.
+    """
+
+    search_fields = ['name']
+    ordering = ['name']
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        capitalized = search_term[:1].upper() + search_term[1:]
+        return queryset.filter(Q(name__startswith=search_term) | Q(name__startswith=capitalized)), False
 
 
 @admin.register(Plant)
-class PlantAdmin(admin.ModelAdmin):
-    pass
+class PlantAdmin(NamePrefixSearchAdmin):
+    list_display = ['name', 'flowering_season', 'sunlight_exposure', 'watering_needs']
 
 
 @admin.register(Garden)
-class GardenAdmin(admin.ModelAdmin):
-    pass
+class GardenAdmin(NamePrefixSearchAdmin):
+    list_display = ['name']
 
 
 @admin.register(PlantGarden)
-class PlantGardenAdmin(admin.ModelAdmin):
-    pass
+class PlantGardenAdmin(LargeTableAdmin):
+    list_display = ['plant', 'garden', 'start_date', 'location']
+    list_select_related = ['plant', 'garden']
+    autocomplete_fields = ['plant', 'garden']
 
 
 @admin.register(PlantMaintenance)
-class PlantMaintenanceAdmin(admin.ModelAdmin):
-    pass
+class PlantMaintenanceAdmin(LargeTableAdmin):
+    list_display = ['__str__', 'week_of_month', 'month']
+    list_select_related = ['plant']
+    list_filter = ['task', 'month']
+    autocomplete_fields = ['plant']
 
 
 @admin.register(MaintenanceMonthlySchedule)
-class MaintenanceMonthlyScheduleAdmin(admin.ModelAdmin):
-    pass
+class MaintenanceMonthlyScheduleAdmin(LargeTableAdmin):
+    list_display = ['plant_garden', 'task', 'month', 'status', 'completion_date']
+    # Both columns render with the name of the plant
+    list_select_related = ['plant_garden__plant', 'task__plant']
+    list_filter = ['status', 'month']
+    raw_id_fields = ['plant_garden', 'task']
 
 
 @admin.register(Comments)
-class CommentsAdmin(admin.ModelAdmin):
+class CommentsAdmin(LargeTableAdmin):
     list_display = ['comment', 'created_on', 'user', 'plant']
+    list_select_related = ['user', 'plant']
+    autocomplete_fields = ['plant']
+    raw_id_fields = ['user']
+
+
+@admin.register(PlantPhoto)
+class PlantPhotoAdmin(LargeTableAdmin):
+    list_display = ['plant', 'image', 'status', 'created_on']
+    list_select_related = ['plant']
+    autocomplete_fields = ['plant']
+    raw_id_fields = ['user']
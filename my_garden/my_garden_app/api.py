@@ -0,0 +1,231 @@
+import hashlib
+
+from django.http import HttpResponseNotModified, JsonResponse
+from django.views import View
+
+from .models import Plant, PlantMaintenance, PlantGarden, Garden, Comments
+from .ownership import get_garden_ids
+from .pagination import parse_cursor_id
+
+
+class ApiField:
+    """
+    One field of an API resource: the model fields it needs in .only() and how to read its value.
+    """
+
+    def __init__(self, only, value=None, related=None):
+        self.only = only if isinstance(only, tuple) else (only,)
+        self.value = value or (lambda obj, attname=self.only[0]: getattr(obj, attname))
+        self.related = related
+
+
+def _fk(name):
+    """
+    A foreign key exposed as the id of the related object, read without a join.
+    """
+    return ApiField(name, lambda obj: getattr(obj, f'{name}_id'))
+
+
+class Resource:
+    """
+    A read-only API resource: queryset, exposed fields and the query parameters accepted as filters.
+    """
+
+    def __init__(self, model, fields, default_fields=None, filters=(), login_required=False, queryset=None):
+        self.model = model
+        self.fields = fields
+        self.default_fields = default_fields or list(fields)
+        self.filters = filters
+        self.login_required = login_required
+        # queryset(request) -> QuerySet; defaults to all objects of the model
+        self.queryset = queryset or (lambda request: model.objects.all())
+
+
+PLANT_FIELDS = ['name', 'description', 'max_height', 'spread', 'flowering_season', 'sunlight_exposure',
+                'pruning_frequency', 'watering_needs', 'fertilization', 'pest_disease_resistance']
+
+RESOURCES = {
+    'plants': Resource(
+        Plant,
+        fields={name: ApiField(name) for name in PLANT_FIELDS},
+    ),
+    'gardens': Resource(
+        Garden,
+        fields={'name': ApiField('name')},
+        login_required=True,
+        queryset=lambda request: Garden.objects.filter(id__in=get_garden_ids(request)),
+    ),
+    'plantings': Resource(
+        PlantGarden,
+        fields={
+            'garden': _fk('garden'),
+            'plant': _fk('plant'),
+            'plant_name': ApiField(('plant', 'plant__name'), lambda obj: obj.plant.name, related='plant'),
+            'start_date': ApiField('start_date'),
+            'location': ApiField('location'),
+        },
+        default_fields=['garden', 'plant', 'start_date', 'location'],
+        filters=('garden', 'plant'),
+        login_required=True,
+        queryset=lambda request: PlantGarden.objects.filter(garden_id__in=get_garden_ids(request)),
+    ),
+    'tasks': Resource(
+        PlantMaintenance,
+        fields={
+            'plant': _fk('plant'),
+            'task': ApiField('task'),
+            'task_description': ApiField('task_description'),
+            'week_of_month': ApiField('week_of_month'),
+            'month': ApiField('month'),
+        },
+        filters=('plant',),
+    ),
+    'comments': Resource(
+        Comments,
+        fields={
+            'plant': _fk('plant'),
+            'comment': ApiField('comment'),
+            'created_on': ApiField('created_on'),
+            'user': ApiField(('user', 'user__username'), lambda obj: obj.user.username, related='user'),
+        },
+        filters=('plant',),
+    ),
+}
+
+
+def etag_for(*parts):
+    """
+    Return a strong ETag computed from the given (already fetched) values.
+    """
+    return '"%s"' % hashlib.md5(repr(parts).encode('utf-8')).hexdigest()
+
+
+def etag_matches(request, etag):
+    """
+    Check whether If-None-Match of the request contains the ETag (or '*').
+    """
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(',')]
+    return '*' in candidates or any(candidate.removeprefix('W/') == etag for candidate in candidates)
+
+
+class ApiView(View):
+    """
+    Base class of the JSON API views, configured with the name of a resource in as_view(resource=...).
+    """
+
+    resource = None
+    max_limit = 100
+    default_limit = 20
+
+    def dispatch(self, request, *args, **kwargs):
+        self.api = RESOURCES[self.resource]
+        if self.api.login_required and not request.user.is_authenticated:
+            return JsonResponse({'error': 'Wymagane logowanie.'}, status=401)
+        return super().dispatch(request, *args, **kwargs)
+
+    def parse_fields(self):
+        """
+        Return the list of requested field names from ?fields=a,b, or None if some of them are unknown.
+        """
+        value = self.request.GET.get('fields')
+        if not value:
+            return self.api.default_fields
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        if any(name not in self.api.fields for name in names):
+            return None
+        return names
+
+    def get_queryset(self, names):
+        """
+        Queryset of the resource loading only the columns (and joins) of the requested fields.
+        """
+        queryset = self.api.queryset(self.request)
+        only = ['id']
+        related = []
+        for name in names:
+            field = self.api.fields[name]
+            only.extend(field.only)
+            if field.related:
+                related.append(field.related)
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.only(*only)
+
+    def rows(self, objects, names):
+        """
+        Read the values of the requested fields, as a list of tuples starting with the id.
+        """
+        values = [self.api.fields[name].value for name in names]
+        return [(obj.id, *(value(obj) for value in values)) for obj in objects]
+
+    def respond(self, etag, build):
+        """
+        Return 304 if the client already has the data, otherwise the JSON document made by build().
+        """
+        if etag_matches(self.request, etag):
+            response = HttpResponseNotModified()
+        else:
+            response = JsonResponse(build())
+        response['ETag'] = etag
+        return response
+
+    def invalid_fields(self):
+        return JsonResponse({
+            'error': 'Nieznane pole w parametrze fields.',
+            'fields': list(self.api.fields),
+        }, status=400)
+
+
+class ApiListView(ApiView):
+    """
+    A JSON view listing a resource in id order, paginated with ?after=<id>&limit=<n>.
+    """
+
+    def get(self, request, *args, **kwargs):
+        names = self.parse_fields()
+        if names is None:
+            return self.invalid_fields()
+
+        queryset = self.get_queryset(names)
+        for name in self.api.filters:
+            if name in request.GET:
+                value = parse_cursor_id(request.GET[name])
+                if value is None:
+                    return JsonResponse({'error': f'Niepoprawna wartość parametru {name}.'}, status=400)
+                queryset = queryset.filter(**{f'{name}_id': value})
+
+        after = parse_cursor_id(request.GET.get('after')) or 0
+        limit = parse_cursor_id(request.GET.get('limit')) or self.default_limit
+        limit = min(limit, self.max_limit)
+        # Keyset pagination by id, one extra row tells whether there is a next page
+        objects = list(queryset.filter(id__gt=after).order_by('id')[:limit + 1])
+        next_after = objects[limit - 1].id if len(objects) > limit else None
+        rows = self.rows(objects[:limit], names)
+
+        def build():
+            return {
+                'results': [dict(zip(['id', *names], row)) for row in rows],
+                'next_after': next_after,
+            }
+
+        return self.respond(etag_for(names, rows, next_after), build)
+
+
+class ApiDetailView(ApiView):
+    """
+    A JSON view returning one object of a resource.
+    """
+
+    def get(self, request, pk, *args, **kwargs):
+        names = self.parse_fields()
+        if names is None:
+            return self.invalid_fields()
+
+        obj = self.get_queryset(names).filter(pk=pk).first()
+        if obj is None:
+            return JsonResponse({'error': 'Nie znaleziono obiektu.'}, status=404)
+        row = self.rows([obj], names)[0]
+        return self.respond(etag_for(names, row), lambda: dict(zip(['id', *names], row)))
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class MyGardenAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'my_garden_app'
+
+    def ready(self):
+        # Connect model signal handlers
+        from . import signals  # noqa: F401
+        # Install the query counter of the request metrics on every new database connection
+        from . import metrics  # noqa: F401
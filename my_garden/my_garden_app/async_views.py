@@ -0,0 +1,237 @@
+"""
+Async versions of the read-only views, for the ASGI deployment.
+
+They render the same templates with the same context as the views in views.py, but run their queries
+with the async ORM, so a request does not hold a worker thread while it waits for the database.
+Everything a template needs is loaded before rendering - templates must not trigger queries here.
+"""
+
+import asyncio
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user
+from django.contrib.auth.views import redirect_to_login
+from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+from django.http import Http404
+from django.shortcuts import render
+from django.views import View
+
+from .models import Plant, PlantMaintenance, PlantGarden, Garden, MONTH_CHOICES, Comments, PlantPhoto
+from .ownership import get_garden_ids
+from .pagination import acursor_page, akeyset_page, parse_cursor_id
+from .photos import with_thumbnail
+from .task_calendar import calendar_rows, filter_month, parse_month
+
+
+async def resolve_user(request):
+    """
+    Load the user of the request in a thread and put it back on the request.
+
+    request.user is lazy and would query the database when a template or context processor touches it.
+    """
+    user = await sync_to_async(get_user)(request)
+    request.user = user
+    return user
+
+
+async def resolve_garden_ids(request):
+    """
+    Resolve the user of the request and return the ids of their gardens (see ownership.py).
+    """
+    await resolve_user(request)
+    return await sync_to_async(get_garden_ids)(request)
+
+
+def garden_access_denied(request, garden_id, garden_ids):
+    """
+    Return the response for a garden the user may not see - a login redirect - or raise Http404, or return None.
+    """
+    if not request.user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
+    if garden_id not in garden_ids:
+        raise Http404("Nie znaleziono ogrodu.")
+    return None
+
+
+async def get_or_404(queryset, **kwargs):
+    try:
+        return await queryset.aget(**kwargs)
+    except queryset.model.DoesNotExist:
+        raise Http404("Nie znaleziono obiektu.")
+
+
+async def alist(queryset):
+    return [obj async for obj in queryset]
+
+
+async def apaginate(queryset, page_number, per_page):
+    """
+    Return the page of the queryset, counting it with acount() instead of the synchronous count().
+    """
+    paginator = Paginator(queryset, per_page)
+    # count is a cached property, filling it in keeps Paginator from calling queryset.count()
+    paginator.count = await queryset.acount()
+    try:
+        number = paginator.validate_number(page_number)
+    except PageNotAnInteger:
+        number = 1
+    except EmptyPage:
+        number = paginator.num_pages
+    bottom = (number - 1) * per_page
+    objects = [obj async for obj in queryset[bottom:bottom + per_page]]
+    return paginator._get_page(objects, number, paginator)
+
+
+class AsyncPlantsListView(View):
+    """
+    Async version of PlantsListView.
+    """
+
+    paginate_by = 20
+
+    async def get(self, request, *args, **kwargs):
+        await resolve_user(request)
+        plants = with_thumbnail(Plant.objects.only('id', 'name').order_by('id'))
+        after = parse_cursor_id(request.GET.get('after'))
+        if after is None:
+            page = await apaginate(plants, request.GET.get('page') or 1, self.paginate_by)
+            context = {'object_list': page.object_list, 'page_obj': page, 'is_paginated': page.has_other_pages(),
+                       'next_after': None}
+        else:
+            object_list, next_after = await akeyset_page(plants, after, self.paginate_by)
+            context = {'object_list': object_list, 'page_obj': None, 'is_paginated': next_after is not None,
+                       'next_after': next_after}
+        return render(request, 'plants_list.html', context)
+
+
+class AsyncPlantDetailView(View):
+    """
+    Async version of PlantDetailView.
+    """
+
+    async def get(self, request, plant_id, *args, **kwargs):
+        photos = PlantPhoto.objects.filter(plant_id=plant_id, status=PlantPhoto.STATUS_READY).order_by('id')
+        plant, photos, _ = await asyncio.gather(get_or_404(Plant.objects, pk=plant_id), alist(photos),
+                                                resolve_user(request))
+        context = {'object': plant, 'plant': plant, 'plant_id': plant_id, 'photos': photos}
+        return render(request, 'plant_details.html', context)
+
+
+class AsyncGardensListView(View):
+    """
+    Async version of GardensListView.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        garden_ids = await resolve_garden_ids(request)
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        gardens = await alist(Garden.objects.filter(id__in=garden_ids))
+        return render(request, 'gardens_list.html', {'object_list': gardens, 'garden_list': gardens})
+
+
+class AsyncGardenDetailView(View):
+    """
+    Async version of GardenDetailView; the garden and its plantings are queried concurrently.
+    """
+
+    async def get(self, request, garden_id, *args, **kwargs):
+        # Checked before the garden is looked up, so other users cannot tell which gardens exist
+        denied = garden_access_denied(request, garden_id, await resolve_garden_ids(request))
+        if denied:
+            return denied
+
+        plantings = (PlantGarden.objects
+                     .filter(garden_id=garden_id)
+                     .select_related('plant')
+                     .order_by('plant__name', 'plant_id', 'start_date', 'id'))
+        garden, plant_gardens = await asyncio.gather(
+            get_or_404(Garden.objects, pk=garden_id),
+            alist(plantings),
+        )
+
+        plant_groups = []
+        for plant_garden in plant_gardens:
+            if not plant_groups or plant_groups[-1]['plant'].id != plant_garden.plant_id:
+                plant_groups.append({'plant': plant_garden.plant, 'plantings': []})
+            plant_groups[-1]['plantings'].append(plant_garden)
+
+        context = {
+            'object': garden,
+            'garden': garden,
+            'plants': [group['plant'] for group in plant_groups],
+            'plant_groups': plant_groups,
+            'garden_id': garden.pk,
+            'no_plants': not plant_groups,
+        }
+        return render(request, 'garden_details.html', context)
+
+
+class AsyncDisplayMonthlyTasksView(View):
+    """
+    Async version of DisplayMonthlyTasksView; the garden, its plantings and their tasks are queried concurrently.
+    """
+
+    async def get(self, request, garden_id, *args, **kwargs):
+        denied = garden_access_denied(request, garden_id, await resolve_garden_ids(request))
+        if denied:
+            return denied
+
+        plantings = (PlantGarden.objects
+                     .filter(garden_id=garden_id)
+                     .select_related('plant')
+                     .only('id', 'start_date', 'location', 'plant', 'plant__id', 'plant__name')
+                     .order_by('plant__name', 'start_date', 'id'))
+        tasks = (PlantMaintenance.objects
+                 .filter(plant__in=PlantGarden.objects.filter(garden_id=garden_id).values('plant_id'))
+                 .only('id', 'plant', 'task', 'month', 'week_of_month'))
+        garden, plant_gardens, plant_tasks = await asyncio.gather(
+            get_or_404(Garden.objects, pk=garden_id),
+            alist(plantings),
+            alist(tasks),
+        )
+
+        tasks_by_plant = defaultdict(list)
+        for task in plant_tasks:
+            tasks_by_plant[task.plant_id].append(task)
+        rows = [row for plant_garden in plant_gardens
+                for row in calendar_rows(plant_garden, tasks_by_plant[plant_garden.plant_id])]
+
+        month = parse_month(request.GET.get('month'))
+        paginator = Paginator(filter_month(rows, month), 10)
+        try:
+            page = paginator.page(request.GET.get('page'))
+        except PageNotAnInteger:
+            page = paginator.page(1)
+        except EmptyPage:
+            page = paginator.page(paginator.num_pages)
+
+        context = {
+            'garden': garden,
+            'month_choices': MONTH_CHOICES,
+            'selected_month': month,
+            'tasks': page,
+        }
+        return render(request, 'monthly_tasks.html', context)
+
+
+class AsyncCommentsListView(View):
+    """
+    Async version of CommentsListView; the plant and the page of comments are queried concurrently.
+    """
+
+    page_size = 20
+
+    async def get(self, request, plant_id, *args, **kwargs):
+        comments = (Comments.objects
+                    .filter(plant_id=plant_id)
+                    .select_related('user')
+                    .only('id', 'comment', 'created_on', 'plant', 'user', 'user__username'))
+        plant, (object_list, next_cursor), _ = await asyncio.gather(
+            get_or_404(Plant.objects, pk=plant_id),
+            acursor_page(comments, request.GET.get('cursor'), self.page_size, 'created_on'),
+            resolve_user(request),
+        )
+        context = {'plant': plant, 'object_list': object_list, 'next_cursor': next_cursor}
+        return render(request, 'comments_list.html', context)
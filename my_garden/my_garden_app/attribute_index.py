@@ -0,0 +1,128 @@
+import threading
+import time
+from array import array
+from bisect import bisect_right
+
+from django.conf import settings
+
+from .facets import FACET_FIELDS, FACET_CHOICES
+from .models import Plant
+
+
+class PlantAttributeIndex:
+    """
+    Process-local bitmap index of the plant catalogue.
+
+    Plants are numbered by their position in id order. For every (facet, value) pair the index
+    keeps one bitmap - a Python int with bit N set when the plant at position N has that value.
+    Filters are bitwise OR within a facet and AND across facets, counts are popcounts, so faceted
+    queries run over whole machine words without touching the database.
+    """
+
+    def __init__(self, rows):
+        """
+        Build the index from (id, name, *FACET_FIELDS) rows ordered by id.
+        """
+        self.ids = array('q')
+        self.names = []
+        positions = {field: {value: [] for value, _ in FACET_CHOICES[field]} for field in FACET_FIELDS}
+        for position, (plant_id, name, *values) in enumerate(rows):
+            self.ids.append(plant_id)
+            self.names.append(name)
+            for field, value in zip(FACET_FIELDS, values):
+                if value in positions[field]:
+                    positions[field][value].append(position)
+
+        self.size = len(self.ids)
+        self.all = (1 << self.size) - 1
+        self.bitmaps = {
+            field: {value: self._to_bitmap(value_positions) for value, value_positions in field_positions.items()}
+            for field, field_positions in positions.items()
+        }
+
+    def _to_bitmap(self, positions):
+        """
+        Turn a list of positions into an int bitmap in O(n), without repeated big-int shifts.
+        """
+        buffer = bytearray((self.size + 7) // 8)
+        for position in positions:
+            buffer[position >> 3] |= 1 << (position & 7)
+        return int.from_bytes(buffer, 'little')
+
+    def match(self, filters):
+        """
+        Return the bitmap of plants matching {field: [values]} facet filters.
+        """
+        bitmap = self.all
+        for field, values in filters.items():
+            field_bitmaps = self.bitmaps[field]
+            union = 0
+            for value in values:
+                union |= field_bitmaps.get(value, 0)
+            bitmap &= union
+        return bitmap
+
+    def facet_counts(self, bitmap):
+        """
+        Count matching plants per (facet, value), in the same format as facets.facet_counts().
+        """
+        facets = {
+            field: [
+                {'value': value, 'label': label, 'count': (bitmap & self.bitmaps[field][value]).bit_count()}
+                for value, label in FACET_CHOICES[field]
+            ]
+            for field in FACET_FIELDS
+        }
+        return bitmap.bit_count(), facets
+
+    def page(self, bitmap, after, page_size):
+        """
+        Return ([(id, name), ...], next_after) for plants of the bitmap with id greater than `after`.
+        """
+        start = bisect_right(self.ids, after)
+        remaining = bitmap >> start
+        results = []
+        while remaining and len(results) <= page_size:
+            lowest = remaining & -remaining
+            offset = lowest.bit_length() - 1
+            position = start + offset
+            results.append((self.ids[position], self.names[position]))
+            remaining >>= offset + 1
+            start = position + 1
+        if len(results) > page_size:
+            results = results[:page_size]
+            return results, results[-1][0]
+        return results, None
+
+
+_index = None
+_built_at = 0.0
+_lock = threading.Lock()
+
+
+def get_attribute_index():
+    """
+    Return the index of this process, building it on first use, after invalidation and when it got too old.
+
+    Signals invalidate the index only in the process which saved the plant, so other worker processes
+    rebuild theirs after settings.PLANT_ATTRIBUTE_INDEX_MAX_AGE seconds.
+    """
+    global _index, _built_at
+    max_age = getattr(settings, 'PLANT_ATTRIBUTE_INDEX_MAX_AGE', 300)
+    index = _index
+    if index is None or time.monotonic() - _built_at > max_age:
+        with _lock:
+            if _index is None or time.monotonic() - _built_at > max_age:
+                rows = Plant.objects.order_by('id').values_list('id', 'name', *FACET_FIELDS).iterator(chunk_size=5000)
+                _index = PlantAttributeIndex(rows)
+                _built_at = time.monotonic()
+            index = _index
+    return index
+
+
+def invalidate_attribute_index():
+    """
+    Drop the index after the plant catalogue changed, it is rebuilt on the next query.
+    """
+    global _index
+    _index = None
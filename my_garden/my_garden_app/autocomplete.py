@@ -0,0 +1,140 @@
+import threading
+import time
+from bisect import bisect_left
+
+from django import forms
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+
+from .cache_versions import bump_versions, new_version
+from .models import Plant
+from .search import tokenize
+
+
+class PrefixIndex:
+    """
+    Sorted array of (key, plant_id) searched with bisect, where the keys are the whole lowercase name of
+    every plant and each of its words - "dam" finds "Róża damasceńska" as well as "Damascenka".
+    """
+
+    def __init__(self, rows):
+        self.names = {}
+        entries = set()
+        for plant_id, name in rows:
+            self.names[plant_id] = name
+            folded = name.casefold()
+            entries.add((folded, plant_id))
+            entries.update((word, plant_id) for word in tokenize(name))
+        entries = sorted(entries)
+        self.keys = [key for key, _ in entries]
+        self.ids = [plant_id for _, plant_id in entries]
+
+    def search(self, query, limit):
+        """
+        Return [(plant_id, name), ...] of up to `limit` plants whose name or a word of it starts with the query.
+
+        Plants whose whole name starts with the query come first, then the word matches, each by name.
+        """
+        term = query.strip().casefold()
+        if not term:
+            return []
+        name_matches, word_matches = [], []
+        seen = set()
+        position = bisect_left(self.keys, term)
+        while position < len(self.keys) and self.keys[position].startswith(term):
+            plant_id = self.ids[position]
+            if plant_id not in seen:
+                seen.add(plant_id)
+                name = self.names[plant_id]
+                (name_matches if name.casefold().startswith(term) else word_matches).append(plant_id)
+            position += 1
+        ranked = (sorted(name_matches, key=lambda plant_id: (self.names[plant_id], plant_id))
+                  + sorted(word_matches, key=lambda plant_id: (self.names[plant_id], plant_id)))
+        return [(plant_id, self.names[plant_id]) for plant_id in ranked[:limit]]
+
+
+# Version of the plant catalogue in the shared cache, bumped by every worker process which changes it
+VERSION_KEY = 'plant_autocomplete:version'
+
+_index = None
+_index_version = None
+_built_at = 0.0
+_index_lock = threading.Lock()
+
+
+def get_plant_index():
+    """
+    Return the prefix index of plant names of this process, built with one query on first use.
+
+    It is rebuilt when another process bumped the catalogue version in the shared cache, and in any case
+    after settings.PLANT_AUTOCOMPLETE_MAX_AGE seconds, for cache backends not shared between processes.
+    """
+    global _index, _index_version, _built_at
+    max_age = getattr(settings, 'PLANT_AUTOCOMPLETE_MAX_AGE', 300)
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Evicted or not set yet: the index of this process stays valid, bumps lost with the key are
+        # caught up by the age bound
+        version = _index_version or new_version()
+        cache.add(VERSION_KEY, version, timeout=None)
+    index = _index
+    if index is None or _index_version != version or time.monotonic() - _built_at > max_age:
+        with _index_lock:
+            if _index is None or _index_version != version or time.monotonic() - _built_at > max_age:
+                # The version is read before the query, a bump during the build triggers another one
+                _index = PrefixIndex(Plant.objects.values_list('id', 'name').iterator())
+                _index_version = version
+                _built_at = time.monotonic()
+            index = _index
+    return index
+
+
+def invalidate_plant_autocomplete():
+    """
+    Drop the index after the plant catalogue changed and bump the shared version, so other processes
+    rebuild theirs on the next lookup too.
+    """
+    global _index
+    _index = None
+    bump_versions(VERSION_KEY)
+
+
+def search_plant_names(query, limit=10):
+    return get_plant_index().search(query, limit)
+
+
+class AutocompleteWidget(forms.Widget):
+    """
+    Text input with suggestions from a JSON endpoint and a hidden input with the chosen id.
+
+    Renders only the label of the current value instead of an <option> for every row of the queryset.
+    """
+
+    template_name = 'widgets/autocomplete.html'
+
+    class Media:
+        js = ['js/autocomplete.js']
+
+    def __init__(self, url_name, attrs=None):
+        super().__init__(attrs)
+        self.url_name = url_name
+        self.choices = ()
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget'].update({'url': reverse(self.url_name), 'label': self.label_for(value)})
+        return context
+
+    def label_for(self, value):
+        """
+        Return the text of the chosen object; choices is the ModelChoiceIterator of the field, only this object is loaded.
+        """
+        if value in (None, '') or not hasattr(self.choices, 'queryset'):
+            return ''
+        try:
+            obj = self.choices.queryset.filter(pk=value).first()
+        except (ValueError, ValidationError):
+            return ''
+        return str(obj) if obj is not None else ''
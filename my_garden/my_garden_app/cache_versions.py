@@ -0,0 +1,44 @@
+"""
+Version counters in the shared cache, for data cached per user (dashboards, garden ids) or per process
+(the autocomplete index).
+
+Cache keys of the data hold the current version, so bumping it makes every worker process miss the old
+entries at once. With a process-local backend the bumps stay in one process, so entries are kept only for
+a short local timeout there.
+"""
+
+import time
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+# Cache backends whose entries live in one process; other workers do not see their invalidations
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+def new_version():
+    # Time-based start, so a counter evicted from the cache does not come back with an already used value
+    return time.time_ns() // 1000
+
+
+def get_version(key):
+    return cache.get_or_set(key, new_version, timeout=None)
+
+
+def bump_versions(*keys):
+    for key in set(keys):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, new_version(), timeout=None)
+
+
+def cache_timeout(timeout, local_timeout):
+    """
+    Return the timeout of a versioned entry: `timeout` with a shared cache, at most `local_timeout` with a
+    process-local one.
+    """
+    if isinstance(caches['default'], PROCESS_LOCAL_CACHES):
+        return min(timeout, local_timeout)
+    return timeout
@@ -0,0 +1,138 @@
+import datetime
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .cache_versions import bump_versions, cache_timeout, get_version
+from .models import PlantGarden, TASK_LABELS, WEEK_LABELS
+from .ownership import GardenUser
+from .schedule import NO_WEEK
+
+
+class DueTask(NamedTuple):
+    """
+    A maintenance task of a planting due in the current month.
+    """
+
+    plant_garden_id: int
+    plant_id: int
+    plant_name: str
+    location: str
+    task_id: int
+    task: int
+    week_of_month: int
+
+    @property
+    def task_label(self):
+        return TASK_LABELS.get(self.task)
+
+    @property
+    def week_label(self):
+        return WEEK_LABELS.get(self.week_of_month)
+
+
+def week_of_month(day):
+    """
+    Week of the month of the date as used by PlantMaintenance.week_of_month: days 1-7 are week 1, 29-31 week 5.
+    """
+    return (day.day - 1) // 7 + 1
+
+
+def next_week_start(day):
+    """
+    Return the first day of the next week of the month (the 8th, 15th, 22nd, 29th or the 1st of the next month).
+    """
+    next_month = (day.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+    start = week_of_month(day) * 7 + 1
+    last_day = (next_month - datetime.timedelta(days=1)).day
+    return day.replace(day=start) if start <= last_day else next_month
+
+
+def due_tasks(user_id, today):
+    """
+    Return the tasks due in the month of today in all gardens of the user, grouped by garden.
+
+    A single query joins the user's gardens, their plantings and the maintenance tasks of the planted plants.
+    Returns [{'garden_id', 'garden_name', 'overdue': [DueTask, ...], 'this_week': [...], 'later': [...]}, ...]
+    where overdue holds the tasks of the past weeks of the month, this_week the tasks of the current week
+    and the tasks without a week (they may be done any time) and later the tasks of the coming weeks.
+    """
+    week = week_of_month(today)
+    rows = (PlantGarden.objects
+            .filter(garden__user=user_id, plant__plantmaintenance__month=today.month)
+            .order_by('garden__name', 'garden_id', 'plant__name', 'id',
+                      'plant__plantmaintenance__week_of_month', 'plant__plantmaintenance__id')
+            .values_list('garden_id', 'garden__name', 'id', 'plant_id', 'plant__name', 'location',
+                         'plant__plantmaintenance__id', 'plant__plantmaintenance__task',
+                         'plant__plantmaintenance__week_of_month'))
+
+    gardens = []
+    for garden_id, garden_name, *task in rows:
+        if not gardens or gardens[-1]['garden_id'] != garden_id:
+            gardens.append({'garden_id': garden_id, 'garden_name': garden_name, 'overdue': [], 'this_week': [],
+                            'later': []})
+        task = DueTask(*task)
+        if task.week_of_month in (week, NO_WEEK):
+            gardens[-1]['this_week'].append(task)
+        elif task.week_of_month > week:
+            gardens[-1]['later'].append(task)
+        else:
+            gardens[-1]['overdue'].append(task)
+    return gardens
+
+
+def _version_key(user_id):
+    return f'dashboard:{user_id}:version'
+
+
+def dashboard_timeout(today):
+    """
+    Seconds until the end of the current week of the month, capped by DASHBOARD_CACHE_TIMEOUT.
+
+    With a process-local cache backend the version bumps of one worker are not seen by the others,
+    so dashboards are kept only for DASHBOARD_LOCAL_CACHE_TIMEOUT there.
+    """
+    week_end = timezone.make_aware(datetime.datetime.combine(next_week_start(today), datetime.time.min))
+    timeout = min(settings.DASHBOARD_CACHE_TIMEOUT, (week_end - timezone.now()).total_seconds())
+    return max(1, int(cache_timeout(timeout, settings.DASHBOARD_LOCAL_CACHE_TIMEOUT)))
+
+
+def get_dashboard(user_id):
+    """
+    Return due_tasks() of the user for today, cached until the end of the current week of the month.
+
+    The key holds the week, so a new week starts with a fresh dashboard, and the version of the user's
+    dashboard, so a change to their plantings, tasks or gardens (see invalidate_dashboards) drops it.
+    """
+    today = timezone.localdate()
+    version = get_version(_version_key(user_id))
+    key = f'dashboard:{user_id}:{version}:{today.isoformat()[:7]}-{week_of_month(today)}'
+    gardens = cache.get(key)
+    if gardens is None:
+        gardens = due_tasks(user_id, today)
+        cache.set(key, gardens, timeout=dashboard_timeout(today))
+    return gardens
+
+
+def invalidate_dashboards(*user_ids):
+    """
+    Make the cached dashboards of the users stale; they are rebuilt on their next visit.
+    """
+    bump_versions(*(_version_key(user_id) for user_id in user_ids))
+
+
+def owners_of_gardens(*garden_ids):
+    """
+    Return the ids of the users owning any of the gardens.
+    """
+    return set(GardenUser.objects.filter(garden_id__in=garden_ids).values_list('user_id', flat=True))
+
+
+def owners_of_plants(*plant_ids):
+    """
+    Return the ids of the users owning a garden in which any of the plants is planted.
+    """
+    return set(GardenUser.objects.filter(garden__plantgarden__plant_id__in=plant_ids)
+               .values_list('user_id', flat=True))
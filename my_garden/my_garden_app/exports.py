@@ -0,0 +1,159 @@
+import csv
+import json
+import zlib
+
+from asgiref.sync import sync_to_async
+
+from .models import PlantGarden, PlantMaintenance, MaintenanceMonthlySchedule
+
+# Rows fetched from the database per round trip while streaming
+CHUNK_SIZE = 2000
+# Encoded rows are sent in pieces of roughly this many bytes
+BUFFER_SIZE = 64 * 1024
+
+
+def _plantings(garden):
+    plant_gardens = (PlantGarden.objects
+                     .filter(garden=garden)
+                     .select_related('plant')
+                     .only('id', 'start_date', 'location', 'plant', 'plant__name')
+                     .order_by('id'))
+    for plant_garden in plant_gardens.iterator(chunk_size=CHUNK_SIZE):
+        yield {
+            'id': plant_garden.id,
+            'plant': plant_garden.plant.name,
+            'start_date': plant_garden.start_date.isoformat(),
+            'location': plant_garden.location,
+        }
+
+
+def _tasks(garden):
+    # Same columns and labels as the input of the import_maintenance command
+    tasks = (PlantMaintenance.objects
+             .filter(plant_id__in=PlantGarden.objects.filter(garden=garden).values('plant_id'))
+             .select_related('plant')
+             .only('id', 'task', 'task_description', 'week_of_month', 'month', 'plant', 'plant__name')
+             .order_by('id'))
+    for task in tasks.iterator(chunk_size=CHUNK_SIZE):
+        yield {
+            'id': task.id,
+            'plant': task.plant.name,
+            'task': task.get_task_display(),
+            'task_description': task.task_description,
+            'week_of_month': task.get_week_of_month_display(),
+            'month': task.get_month_display(),
+        }
+
+
+def _schedule(garden):
+    schedules = (MaintenanceMonthlySchedule.objects
+                 .filter(plant_garden__garden=garden)
+                 .select_related('plant_garden__plant', 'task')
+                 .only('id', 'status', 'completion_date', 'month',
+                       'plant_garden', 'plant_garden__location', 'plant_garden__plant', 'plant_garden__plant__name',
+                       'task', 'task__task', 'task__task_description')
+                 .order_by('completion_date', 'id'))
+    for schedule in schedules.iterator(chunk_size=CHUNK_SIZE):
+        yield {
+            'id': schedule.id,
+            'plant': schedule.plant_garden.plant.name,
+            'location': schedule.plant_garden.location,
+            'task': schedule.task.get_task_display(),
+            'task_description': schedule.task.task_description,
+            'month': schedule.get_month_display(),
+            'completion_date': schedule.completion_date.isoformat(),
+            'status': schedule.get_status_display(),
+        }
+
+
+# dataset name -> (row generator, columns)
+DATASETS = {
+    'plantings': (_plantings, ['id', 'plant', 'start_date', 'location']),
+    'tasks': (_tasks, ['id', 'plant', 'task', 'task_description', 'week_of_month', 'month']),
+    'schedule': (_schedule, ['id', 'plant', 'location', 'task', 'task_description', 'month', 'completion_date',
+                             'status']),
+}
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+}
+
+
+class _LineBuffer:
+    """
+    File-like object for csv.writer which hands back each written line instead of storing it.
+    """
+
+    def write(self, value):
+        return value
+
+
+def encode_rows(rows, columns, file_format):
+    """
+    Yield one encoded line (str) per row dict, preceded by the header line for CSV.
+    """
+    if file_format == 'csv':
+        writer = csv.writer(_LineBuffer())
+        yield writer.writerow(columns)
+        for row in rows:
+            yield writer.writerow([row[column] for column in columns])
+    else:
+        for row in rows:
+            yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+def buffered(lines, size=BUFFER_SIZE):
+    """
+    Join lines into UTF-8 byte chunks of about `size` bytes, so the response is not sent one row at a time.
+    """
+    buffer, length = [], 0
+    for line in lines:
+        data = line.encode('utf-8')
+        buffer.append(data)
+        length += len(data)
+        if length >= size:
+            yield b''.join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def gzipped(chunks):
+    """
+    Compress a stream of byte chunks into a gzip stream (wbits=31 writes the gzip header and trailer).
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(garden, dataset, file_format, compress=False):
+    """
+    Return an iterator of byte chunks with the dataset of the garden, reading rows lazily in chunks.
+    """
+    row_generator, columns = DATASETS[dataset]
+    chunks = buffered(encode_rows(row_generator(garden), columns, file_format))
+    return gzipped(chunks) if compress else chunks
+
+
+async def async_chunks(chunks):
+    """
+    Async iterator over a sync iterator of chunks, advancing it in a thread one chunk at a time.
+
+    Under ASGI StreamingHttpResponse reads a sync iterator into a list before sending anything, which would
+    hold the whole export in memory. thread_sensitive keeps the database cursor of the stream in one thread.
+    """
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    try:
+        while True:
+            chunk = await next_chunk(chunks, None)
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        # Closes the database cursor also when the client went away mid-stream
+        await sync_to_async(chunks.close, thread_sensitive=True)()
@@ -0,0 +1,71 @@
+from django.db.models import Count, Q
+
+from .models import Plant
+
+# Plant choice fields which can be combined in the faceted filter
+FACET_FIELDS = [
+    'max_height',
+    'spread',
+    'flowering_season',
+    'sunlight_exposure',
+    'pruning_frequency',
+    'watering_needs',
+    'fertilization',
+    'pest_disease_resistance',
+]
+
+FACET_CHOICES = {field: Plant._meta.get_field(field).choices for field in FACET_FIELDS}
+
+
+def parse_facet_filters(query_dict):
+    """
+    Read facet values from the query string, e.g. ?sunlight_exposure=1&sunlight_exposure=2&watering_needs=1.
+
+    Values of one facet are OR-ed, different facets are AND-ed. Unknown fields and values are ignored.
+    Returns {field: sorted list of values}.
+    """
+    filters = {}
+    for field in FACET_FIELDS:
+        allowed = {value for value, _ in FACET_CHOICES[field]}
+        values = set()
+        for raw_value in query_dict.getlist(field):
+            try:
+                value = int(raw_value)
+            except ValueError:
+                continue
+            if value in allowed:
+                values.add(value)
+        if values:
+            filters[field] = sorted(values)
+    return filters
+
+
+def filter_plants(filters, queryset=None):
+    """
+    Return plants matching the facet filters.
+    """
+    if queryset is None:
+        queryset = Plant.objects.all()
+    return queryset.filter(**{f'{field}__in': values for field, values in filters.items()})
+
+
+def facet_counts(queryset):
+    """
+    Count plants of the queryset for every (facet, value) pair with a single aggregate query.
+
+    Returns (total, {field: [{'value': ..., 'label': ..., 'count': ...}, ...]}).
+    """
+    aggregates = {'total': Count('id')}
+    for field in FACET_FIELDS:
+        for value, _ in FACET_CHOICES[field]:
+            aggregates[f'{field}__{value}'] = Count('id', filter=Q(**{field: value}))
+    counts = queryset.aggregate(**aggregates)
+
+    facets = {
+        field: [
+            {'value': value, 'label': label, 'count': counts[f'{field}__{value}']}
+            for value, label in FACET_CHOICES[field]
+        ]
+        for field in FACET_FIELDS
+    }
+    return counts['total'], facets
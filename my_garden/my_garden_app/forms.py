@@ -1,5 +1,7 @@
 from django import forms
-from .models import Plant, PlantMaintenance, PlantGarden, Garden, Comments
+from django.conf import settings
+from .autocomplete import AutocompleteWidget
+from .models import Plant, PlantMaintenance, PlantGarden, Garden, Comments, PlantPhoto
 
 
 class PlantAddForm(forms.ModelForm):
@@ -46,6 +48,9 @@ class PlantMaintenanceForm(forms.ModelForm):
             'week_of_month',
             'month'
         ]
+        widgets = {
+            'plant': AutocompleteWidget('plant_autocomplete'),
+        }
 
 
 class GardenAddForm(forms.ModelForm):
@@ -74,9 +79,26 @@ class PlantToGardenAddForm(forms.ModelForm):
     class Meta:
         model = PlantGarden
         fields = ['garden', 'plant', 'start_date', 'location']
+        widgets = {
+            'garden': AutocompleteWidget('garden_autocomplete'),
+            'plant': AutocompleteWidget('plant_autocomplete'),
+        }
 
 
 class CommentForm(forms.ModelForm):
     class Meta:
         model = Comments
         fields = ['comment']
+
+
+class PlantPhotoForm(forms.ModelForm):
+    class Meta:
+        model = PlantPhoto
+        fields = ['image']
+
+    def clean_image(self):
+        image = self.cleaned_data['image']
+        if image.size > settings.PLANT_PHOTO_MAX_SIZE:
+            raise forms.ValidationError(
+                f"Zdjęcie może mieć najwyżej {settings.PLANT_PHOTO_MAX_SIZE // (1024 * 1024)} MB.")
+        return image
@@ -0,0 +1,65 @@
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import Plant, Garden
+
+
+def touch_plants(*plant_ids):
+    """
+    Mark the plants as changed, e.g. after their maintenance tasks or comments changed.
+    """
+    plant_ids = {plant_id for plant_id in plant_ids if plant_id is not None}
+    if plant_ids:
+        Plant.objects.filter(id__in=plant_ids).update(updated_at=timezone.now())
+
+
+def touch_gardens(*garden_ids):
+    """
+    Mark the gardens as changed, e.g. after a plant was planted, moved or removed.
+    """
+    garden_ids = {garden_id for garden_id in garden_ids if garden_id is not None}
+    if garden_ids:
+        Garden.objects.filter(id__in=garden_ids).update(updated_at=timezone.now())
+
+
+def _memoized(request, key, load):
+    """
+    Load a value once per request - condition() asks for the ETag and Last-Modified separately.
+    """
+    cache = request.__dict__.setdefault('_last_modified', {})
+    if key not in cache:
+        cache[key] = load()
+    return cache[key]
+
+
+def plant_last_modified(request, plant_id, **kwargs):
+    """
+    Return when the plant, its maintenance tasks or its comments last changed (one primary key lookup).
+    """
+    return _memoized(request, ('plant', plant_id), lambda: (
+        Plant.objects.filter(pk=plant_id).values_list('updated_at', flat=True).first()))
+
+
+def garden_last_modified(request, garden_id, **kwargs):
+    """
+    Return when the garden, its plantings or the planted plants last changed, in one aggregate query.
+    """
+    def load():
+        dates = Garden.objects.filter(pk=garden_id).aggregate(
+            garden=Max('updated_at'), plants=Max('plantgarden__plant__updated_at'))
+        return max(filter(None, dates.values()), default=None)
+    return _memoized(request, ('garden', garden_id), load)
+
+
+def user_etag(last_modified_func):
+    """
+    Build an etag_func for condition() from a last_modified_func.
+
+    Pages show the name of the logged-in user, so the user id is a part of the ETag.
+    """
+    def etag_func(request, *args, **kwargs):
+        last_modified = last_modified_func(request, *args, **kwargs)
+        if last_modified is None:
+            return None
+        return f'{request.user.pk or 0}-{last_modified.timestamp()}'
+    return etag_func
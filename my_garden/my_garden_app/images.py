@@ -0,0 +1,142 @@
+import hashlib
+import io
+import json
+import threading
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is needed only to generate the variants, not to serve them
+    Image = ImageOps = None
+
+MANIFEST_NAME = 'manifest.json'
+# Output formats of every width: (format for Pillow, file extension, MIME type)
+FORMATS = [('WEBP', 'webp', 'image/webp'), ('JPEG', 'jpg', 'image/jpeg')]
+
+
+def get_storage():
+    """
+    Storage for the generated variants and their manifest, served from RESPONSIVE_IMAGES_URL.
+    """
+    return FileSystemStorage(location=settings.RESPONSIVE_IMAGES_ROOT, base_url=settings.RESPONSIVE_IMAGES_URL)
+
+
+def file_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def render_variants(source_path, widths, quality):
+    """
+    Return [(width, extension, bytes), ...] for every width not larger than the image, in every format.
+
+    Runs in worker processes of the build command, so it only touches the file system and Pillow.
+    """
+    with Image.open(source_path) as image:
+        image = image.convert('RGB')
+        targets = sorted({width for width in widths if width < image.width} | {min(max(widths), image.width)})
+        variants = []
+        for width in targets:
+            for image_format, extension, _ in FORMATS:
+                variants.append((width, extension, encode_resized(image, width, image_format, quality)))
+        return variants
+
+
+def encode_resized(image, width, image_format, quality):
+    """
+    Return the bytes of the Pillow image scaled to the width (keeping the aspect ratio) in the given format.
+    """
+    height = max(1, round(image.height * width / image.width))
+    resized = image.resize((width, height), Image.LANCZOS)
+    buffer = io.BytesIO()
+    options = {'quality': quality, 'optimize': True}
+    if image_format == 'JPEG':
+        options['progressive'] = True
+    else:
+        options['method'] = 6
+    resized.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def variant_name(source_name, width, extension, data):
+    """
+    Content-hashed file name of a variant, e.g. 'azalia.960.3f2a9c1b7d4e.webp' - safe to cache forever.
+    """
+    stem = PurePosixPath(source_name).stem
+    return f'{stem}.{width}.{file_digest(data)[:12]}.{extension}'
+
+
+def save_variants(storage, source_name, variants):
+    """
+    Write the variants to the storage and return their manifest entries.
+    """
+    entries = []
+    for width, extension, data in variants:
+        name = variant_name(source_name, width, extension, data)
+        if not storage.exists(name):
+            storage.save(name, ContentFile(data))
+        entries.append({'width': width, 'format': extension, 'name': name})
+    return entries
+
+
+def read_manifest(storage):
+    """
+    Return the manifest {source name: {'digest': ..., 'variants': [...]}} or an empty dict if there is none.
+    """
+    if not storage.exists(MANIFEST_NAME):
+        return {}
+    with storage.open(MANIFEST_NAME) as manifest_file:
+        return json.load(manifest_file)
+
+
+def write_manifest(storage, manifest):
+    if storage.exists(MANIFEST_NAME):
+        storage.delete(MANIFEST_NAME)
+    storage.save(MANIFEST_NAME, ContentFile(json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8')))
+
+
+_manifest = None
+_manifest_mtime = None
+_manifest_lock = threading.Lock()
+
+
+def get_manifest():
+    """
+    Return the manifest, read once per process and again whenever the build command rewrites it.
+    """
+    global _manifest, _manifest_mtime
+    storage = get_storage()
+    try:
+        mtime = storage.get_modified_time(MANIFEST_NAME)
+    except (FileNotFoundError, NotImplementedError):
+        mtime = None
+    with _manifest_lock:
+        if _manifest is None or mtime != _manifest_mtime:
+            _manifest = read_manifest(storage) if mtime is not None else {}
+            _manifest_mtime = mtime
+        return _manifest
+
+
+def responsive_image(item):
+    """
+    Add srcset data of a static image to a carousel item ({'image': static path, 'alt': ...}).
+
+    Items of images without generated variants are returned unchanged and shown at full size.
+    """
+    entry = get_manifest().get(item['image'])
+    if not entry:
+        return item
+    storage = get_storage()
+    srcsets = {}
+    for variant in entry['variants']:
+        srcsets.setdefault(variant['format'], []).append(f"{storage.url(variant['name'])} {variant['width']}w")
+    jpeg_variants = [variant for variant in entry['variants'] if variant['format'] == 'jpg']
+    return {
+        **item,
+        'src': storage.url(max(jpeg_variants, key=lambda variant: variant['width'])['name']),
+        'srcset': ', '.join(srcsets.get('jpg', [])),
+        'webp_srcset': ', '.join(srcsets.get('webp', [])),
+    }
@@ -0,0 +1,273 @@
+import csv
+import json
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from itertools import islice
+from operator import attrgetter
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from . import plant_cache
+from .attribute_index import invalidate_attribute_index
+from .autocomplete import invalidate_plant_autocomplete
+from .dashboard import invalidate_dashboards, owners_of_plants
+from .facets import FACET_FIELDS, FACET_CHOICES
+from .freshness import touch_plants
+from .forms import PlantAddForm, PlantMaintenanceForm
+from .models import MONTH_CHOICES, Plant, PlantMaintenance
+from .schedule import sync_schedule
+from .search import invalidate_search_index
+
+# English labels accepted next to the Polish ones from Plant.*_CHOICES
+ENGLISH_LABELS = {
+    'max_height': {1: ['high', 'tall'], 2: ['medium'], 3: ['low', 'short']},
+    'spread': {1: ['wide'], 2: ['medium'], 3: ['compact']},
+    'flowering_season': {1: ['spring'], 2: ['summer'], 3: ['autumn', 'fall'], 4: ['none']},
+    'sunlight_exposure': {1: ['full sun'], 2: ['partial shade', 'part shade'], 3: ['shade', 'full shade']},
+    'pruning_frequency': {1: ['regular'], 2: ['occasional']},
+    'watering_needs': {1: ['low'], 2: ['moderate', 'medium'], 3: ['high']},
+    'fertilization': {1: ['regular'], 2: ['occasional']},
+    'pest_disease_resistance': {1: ['resistant'], 2: ['susceptible']},
+}
+
+
+# English labels of the PlantMaintenance choices
+MAINTENANCE_ENGLISH_LABELS = {
+    'task': {1: ['pruning'], 2: ['fertilizing', 'fertilization']},
+    'week_of_month': {1: ['first'], 2: ['second'], 3: ['third'], 4: ['fourth'], 5: ['fifth'], 6: ['none', 'any']},
+    'month': {
+        1: ['january'], 2: ['february'], 3: ['march'], 4: ['april'], 5: ['may'], 6: ['june'],
+        7: ['july'], 8: ['august'], 9: ['september'], 10: ['october'], 11: ['november'], 12: ['december'],
+        13: ['none'],
+    },
+}
+
+
+def _choice_labels(choices, english_labels):
+    """
+    Map casefolded Polish labels, English labels and numeric values of one choice field to choice values.
+    """
+    labels = {}
+    for value, label in choices:
+        labels[str(value)] = value
+        labels[label.casefold()] = value
+        for english_label in english_labels.get(value, []):
+            labels[english_label] = value
+    return labels
+
+
+def _build_label_maps():
+    """
+    Label maps of the Plant choice fields, per field.
+    """
+    return {field_name: _choice_labels(FACET_CHOICES[field_name], ENGLISH_LABELS[field_name])
+            for field_name in FACET_FIELDS}
+
+
+LABEL_MAPS = _build_label_maps()
+MAINTENANCE_LABEL_MAPS = {
+    'task': _choice_labels(PlantMaintenance.TASK_CHOICES, MAINTENANCE_ENGLISH_LABELS['task']),
+    'week_of_month': _choice_labels(PlantMaintenance.WEEK_OF_MONTH_CHOICES,
+                                    MAINTENANCE_ENGLISH_LABELS['week_of_month']),
+    'month': _choice_labels(MONTH_CHOICES, MAINTENANCE_ENGLISH_LABELS['month']),
+}
+
+
+def map_choice(label_map, raw_value):
+    """
+    Translate a label to its choice value, leaving unknown values for the form field to reject.
+    """
+    if raw_value is None:
+        return None
+    return label_map.get(str(raw_value).strip().casefold(), raw_value)
+
+
+def read_rows(stream, file_format):
+    """
+    Yield (line number, dict) for each record of a CSV (with header) or JSON Lines stream, one at a time.
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif file_format == 'jsonl':
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as error:
+                row = {'__error__': f"Niepoprawny JSON: {error.msg}"}
+            if not isinstance(row, dict):
+                row = {'__error__': "Wiersz musi być obiektem JSON."}
+            yield line_number, row
+    else:
+        raise ValueError(f"Nieobsługiwany format: {file_format}")
+
+
+class RowValidator:
+    """
+    Validate import rows with the fields of a ModelForm, without building one form object per row.
+
+    Form fields are stateless, so their clean() can be reused for every row; choice fields get
+    their labels translated to values first.
+    """
+
+    def __init__(self, form_class, label_maps=None, exclude=()):
+        self.fields = {name: form_field for name, form_field in form_class.base_fields.items()
+                       if name not in exclude}
+        self.label_maps = label_maps or {}
+
+    def clean(self, row):
+        """
+        Return (cleaned values, errors) for the row; errors map field names to lists of messages.
+        """
+        if '__error__' in row:
+            return None, {'__all__': [row['__error__']]}
+        values, errors = {}, {}
+        for name, form_field in self.fields.items():
+            raw_value = row.get(name)
+            if name in self.label_maps:
+                raw_value = map_choice(self.label_maps[name], raw_value)
+            try:
+                values[name] = form_field.clean(raw_value)
+            except ValidationError as error:
+                errors[name] = error.messages
+        return values, errors
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    skipped: int = 0
+    rejected: list = field(default_factory=list)
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def processed(self):
+        return self.created + self.skipped + len(self.rejected)
+
+    @property
+    def rows_per_second(self):
+        elapsed = time.monotonic() - self.started
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+
+def import_plants(rows, batch_size=1000, dry_run=False, progress=None):
+    """
+    Validate (line number, dict) rows and insert valid plants with bulk_create, one transaction per batch.
+
+    Invalid rows are collected in ImportResult.rejected as (line number, errors) and skipped.
+    `progress` is called with the result after every batch.
+    """
+    validator = RowValidator(PlantAddForm, LABEL_MAPS)
+    result = ImportResult()
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            break
+        batch = []
+        for line_number, row in chunk:
+            values, errors = validator.clean(row)
+            if errors:
+                result.rejected.append((line_number, errors))
+            else:
+                batch.append(Plant(**values))
+        if batch and not dry_run:
+            with transaction.atomic():
+                Plant.objects.bulk_create(batch, batch_size=batch_size)
+        result.created += len(batch)
+        if progress:
+            progress(result)
+
+    if result.created and not dry_run:
+        # bulk_create sends no post_save signals
+        invalidate_search_index()
+        invalidate_attribute_index()
+        invalidate_plant_autocomplete()
+    return result
+
+
+def plant_ids_by_name():
+    """
+    Map casefolded plant names to the list of ids of plants with that name, with one query.
+    """
+    plant_ids = defaultdict(list)
+    for plant_id, name in Plant.objects.values_list('id', 'name').iterator(chunk_size=5000):
+        plant_ids[name.strip().casefold()].append(plant_id)
+    return plant_ids
+
+
+def import_maintenance(rows, batch_size=1000, dry_run=False, progress=None, diff=None):
+    """
+    Validate (line number, dict) rows of maintenance tasks keyed by plant name and insert the new ones.
+
+    Plant names are resolved through one prefetched name -> id map; unknown and ambiguous names are
+    rejected. Rows whose (plant, task, week, month) already exist - in the database or earlier in the
+    input - are skipped, checked with one query per batch. `diff` is called with
+    (line number, '+' or '=', task) for every new and skipped row, e.g. to report a dry run.
+    """
+    validator = RowValidator(PlantMaintenanceForm, MAINTENANCE_LABEL_MAPS, exclude=('plant',))
+    plant_ids = plant_ids_by_name()
+    key = attrgetter('plant_id', 'task', 'week_of_month', 'month')
+    result = ImportResult()
+    seen = set()
+    touched_plants, created_tasks = set(), []
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            break
+        candidates = []
+        for line_number, row in chunk:
+            values, errors = validator.clean(row)
+            if values is not None:
+                name = str(row.get('plant') or '').strip()
+                ids = plant_ids.get(name.casefold(), [])
+                if not name:
+                    errors['plant'] = ["To pole jest wymagane."]
+                elif not ids:
+                    errors['plant'] = [f"Nie znaleziono rośliny {name}."]
+                elif len(ids) > 1:
+                    errors['plant'] = [f"Nazwa {name} pasuje do {len(ids)} roślin."]
+                else:
+                    values['plant_id'] = ids[0]
+            if errors:
+                result.rejected.append((line_number, errors))
+            else:
+                candidates.append((line_number, PlantMaintenance(**values)))
+
+        # One set-based lookup of the batch against the tasks already in the database
+        existing = set(PlantMaintenance.objects
+                       .filter(plant_id__in={task.plant_id for _, task in candidates})
+                       .values_list('plant_id', 'task', 'week_of_month', 'month')) if candidates else set()
+        batch = []
+        for line_number, task in candidates:
+            if key(task) in existing or key(task) in seen:
+                result.skipped += 1
+                sign = '='
+            else:
+                seen.add(key(task))
+                batch.append(task)
+                sign = '+'
+            if diff:
+                diff(line_number, sign, task)
+
+        if batch and not dry_run:
+            with transaction.atomic():
+                created_tasks.extend(PlantMaintenance.objects.bulk_create(batch, batch_size=batch_size))
+            touched_plants.update(task.plant_id for task in batch)
+        result.created += len(batch)
+        if progress:
+            progress(result)
+
+    if created_tasks:
+        # bulk_create sends no post_save signals
+        sync_schedule(task_ids=[task.pk for task in created_tasks])
+        plant_cache.invalidate_plant(*touched_plants)
+        touch_plants(*touched_plants)
+        invalidate_dashboards(*owners_of_plants(*touched_plants))
+    return result
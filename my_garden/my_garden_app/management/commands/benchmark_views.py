@@ -0,0 +1,116 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from my_garden_app.models import Plant, Garden
+
+
+class Command(BaseCommand):
+    """
+    Compare the throughput of the sync views with their async versions from async_views.py.
+
+    Requests go through Django's test clients in this process - the sync views through the WSGI
+    handler from a pool of threads, the async views through the ASGI handler from concurrent tasks -
+    against the configured database, so the numbers compare the views, not a web server.
+    """
+
+    help = "Porównuje przepustowość widoków synchronicznych i asynchronicznych (żądania/s)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help="Liczba żądań na widok.")
+        parser.add_argument('--concurrency', type=int, default=10, help="Liczba równoczesnych żądań.")
+        parser.add_argument('--username', help="Użytkownik, jako który wysyłane są żądania.")
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError("--requests i --concurrency muszą być większe od 0.")
+        user = None
+        if options['username']:
+            user = User.objects.filter(username=options['username']).first()
+            if user is None:
+                raise CommandError(f"Użytkownik {options['username']} nie istnieje.")
+
+        plant = Plant.objects.order_by('id').first()
+        if plant is None:
+            raise CommandError("Baza musi zawierać co najmniej jedną roślinę.")
+
+        # (label, sync url name, async url name, url kwargs)
+        views = [
+            ('plants_list', 'plants_list', 'async_plants_list', {}),
+            ('plant_details', 'plant_details', 'async_plant_details', {'plant_id': plant.id}),
+            ('comments_list', 'comments_list', 'async_comments_list', {'plant_id': plant.id}),
+        ]
+        # Garden pages are shown only to the owners of the garden
+        if user:
+            garden = Garden.objects.filter(user=user).order_by('id').first()
+            if garden is None:
+                raise CommandError(f"Użytkownik {user.username} nie ma żadnego ogrodu.")
+            views += [
+                ('garden_details', 'garden_details', 'async_garden_details', {'garden_id': garden.id}),
+                ('monthly_tasks', 'monthly_tasks', 'async_monthly_tasks', {'garden_id': garden.id}),
+                ('gardens_list', 'gardens_list', 'async_gardens_list', {}),
+            ]
+
+        self.stdout.write(f"{'widok':<16}{'sync [req/s]':>14}{'async [req/s]':>15}{'async/sync':>12}")
+        # The test clients send requests to "testserver"
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for label, sync_name, async_name, kwargs in views:
+                sync_rate = self.run_sync(reverse(sync_name, kwargs=kwargs), user, options)
+                async_rate = self.run_async(reverse(async_name, kwargs=kwargs), user, options)
+                self.stdout.write(f"{label:<16}{sync_rate:>14.1f}{async_rate:>15.1f}{async_rate / sync_rate:>12.2f}")
+
+    def run_sync(self, url, user, options):
+        """
+        Send the requests from a pool of threads, one client per thread, and return requests per second.
+        """
+        concurrency, total = options['concurrency'], options['requests']
+
+        def worker(count):
+            client = Client()
+            if user:
+                client.force_login(user)
+            for _ in range(count):
+                self.check_response(client.get(url), url)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(worker, self.split(total, concurrency)))
+        return total / (time.perf_counter() - started)
+
+    def run_async(self, url, user, options):
+        """
+        Send the requests from concurrent tasks on one event loop, one client per task, and return requests per second.
+        """
+        concurrency, total = options['concurrency'], options['requests']
+        clients = [AsyncClient() for _ in range(concurrency)]
+        if user:
+            for client in clients:
+                client.force_login(user)
+
+        async def worker(client, count):
+            for _ in range(count):
+                self.check_response(await client.get(url), url)
+
+        async def run():
+            await asyncio.gather(*(worker(client, count)
+                                   for client, count in zip(clients, self.split(total, concurrency))))
+
+        started = time.perf_counter()
+        asyncio.run(run())
+        return total / (time.perf_counter() - started)
+
+    @staticmethod
+    def split(total, parts):
+        return [total // parts + (1 if part < total % parts else 0) for part in range(parts)]
+
+    @staticmethod
+    def check_response(response, url):
+        if response.status_code != 200:
+            raise CommandError(f"{url} zwrócił status {response.status_code}.")
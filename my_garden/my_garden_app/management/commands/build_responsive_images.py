@@ -0,0 +1,64 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+
+from my_garden_app import images
+
+
+class Command(BaseCommand):
+    """
+    Generate resized JPEG and WebP variants of static images with content-hashed names, plus their manifest.
+
+    Images are decoded and encoded in a process pool, one image per task, so rebuilding uses all cores.
+    Images whose content did not change since the last build are skipped.
+    """
+
+    help = "Generuje warianty obrazów (szerokości, WebP) z nazwami zawierającymi skrót zawartości."
+
+    def add_arguments(self, parser):
+        parser.add_argument('images', nargs='*',
+                            help="Ścieżki statyczne obrazów (domyślnie obrazy karuzeli, np. images/azalia.jpg).")
+        parser.add_argument('--widths', type=int, nargs='+', default=None,
+                            help="Szerokości wariantów w pikselach.")
+        parser.add_argument('--quality', type=int, default=80, help="Jakość kompresji (1-100).")
+        parser.add_argument('--workers', type=int, default=None,
+                            help="Liczba procesów (domyślnie liczba rdzeni).")
+        parser.add_argument('--force', action='store_true', help="Generuj także niezmienione obrazy.")
+
+    def handle(self, *args, **options):
+        if images.Image is None:
+            raise CommandError("Do generowania wariantów potrzebny jest pakiet Pillow (pip install Pillow).")
+        widths = options['widths'] or settings.RESPONSIVE_IMAGE_WIDTHS
+        names = options['images'] or settings.RESPONSIVE_IMAGES
+
+        storage = images.get_storage()
+        manifest = images.read_manifest(storage)
+        sources = {}
+        for name in names:
+            path = finders.find(name)
+            if path is None:
+                raise CommandError(f"Nie znaleziono obrazu {name}.")
+            with open(path, 'rb') as source:
+                digest = images.file_digest(source.read())
+            entry = manifest.get(name)
+            if options['force'] or not entry or entry['digest'] != digest or entry['widths'] != widths:
+                sources[name] = (path, digest)
+            else:
+                self.stdout.write(f"{name}: bez zmian")
+
+        workers = options['workers'] or os.cpu_count()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {name: executor.submit(images.render_variants, path, widths, options['quality'])
+                       for name, (path, _) in sources.items()}
+            for name, future in futures.items():
+                variants = future.result()
+                entries = images.save_variants(storage, name, variants)
+                manifest[name] = {'digest': sources[name][1], 'widths': widths, 'variants': entries}
+                size = sum(len(data) for _, _, data in variants)
+                self.stdout.write(f"{name}: {len(entries)} wariantów ({size // 1024} KB)")
+
+        images.write_manifest(storage, manifest)
+        self.stdout.write(self.style.SUCCESS(f"Wygenerowano warianty {len(sources)} obrazów."))
@@ -0,0 +1,72 @@
+import datetime
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from my_garden_app.synthetic_data import METHODS, GenerationPlan, default_method, generate
+
+
+class Command(BaseCommand):
+    """
+    Fill the database with seeded synthetic data for load tests and benchmarks.
+    """
+
+    help = ("Generuje losowe dane testowe (użytkownicy, ogrody, rośliny, nasadzenia, zadania, harmonogram, "
+            "komentarze). W PostgreSQL zapis przez COPY, w innych bazach przez bulk_create.")
+
+    def add_arguments(self, parser):
+        defaults = GenerationPlan()
+        parser.add_argument('--users', type=int, default=defaults.users, help="Liczba użytkowników.")
+        parser.add_argument('--gardens', type=int, default=defaults.gardens, help="Liczba ogrodów.")
+        parser.add_argument('--plants', type=int, default=defaults.plants, help="Liczba roślin w katalogu.")
+        parser.add_argument('--plantings-per-garden', type=int, default=defaults.plantings_per_garden,
+                            help="Średnia liczba roślin w ogrodzie.")
+        parser.add_argument('--tasks-per-plant', type=int, default=defaults.tasks_per_plant,
+                            help="Średnia liczba zadań pielęgnacyjnych rośliny.")
+        parser.add_argument('--comments-per-plant', type=int, default=defaults.comments_per_plant,
+                            help="Średnia liczba komentarzy do rośliny.")
+        parser.add_argument('--year', type=int, default=None,
+                            help="Rok harmonogramu prac (domyślnie rok z --today, a bez niego bieżący).")
+        parser.add_argument('--today', type=datetime.date.fromisoformat, default=None,
+                            help="Dzień, od którego zależą statusy harmonogramu, w formacie RRRR-MM-DD "
+                                 "(domyślnie 31 grudnia roku harmonogramu, więc dane z ziarnem są powtarzalne).")
+        parser.add_argument('--no-schedule', action='store_true',
+                            help="Nie twórz harmonogramu prac (MaintenanceMonthlySchedule).")
+        parser.add_argument('--seed', type=int, default=None,
+                            help="Ziarno generatora; te same ziarno i parametry dają te same dane.")
+        parser.add_argument('--method', choices=METHODS, default=None,
+                            help="copy (tylko PostgreSQL) lub bulk (domyślnie najszybsza dla bazy).")
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help="Liczba wierszy w jednym buforze COPY lub bulk_create.")
+        parser.add_argument('--password', default=None,
+                            help="Hasło użytkowników (domyślnie nie mogą się logować).")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size musi być większe od 0.")
+        counts = ('users', 'gardens', 'plants', 'plantings_per_garden', 'tasks_per_plant', 'comments_per_plant')
+        for name in counts:
+            if options[name] < 0:
+                raise CommandError(f"--{name.replace('_', '-')} nie może być ujemne.")
+        if options['plantings_per_garden'] < 1 and options['gardens'] and options['plants']:
+            raise CommandError("--plantings-per-garden musi być większe od 0.")
+
+        today = options['today']
+        year = options['year'] or (today or timezone.localdate()).year
+        plan = GenerationPlan(**{name: options[name] for name in counts}, year=year,
+                              schedule=not options['no_schedule'])
+        seed = options['seed'] if options['seed'] is not None else random.randrange(2 ** 32)
+        method = options['method'] or default_method()
+
+        def progress(model, rows, seconds):
+            speed = rows / seconds if seconds > 0 else 0.0
+            self.stdout.write(f"{model._meta.db_table}: {rows} wierszy ({speed:.0f} wierszy/s)")
+
+        self.stdout.write(f"Ziarno {seed}, metoda {method}.")
+        try:
+            result = generate(plan, seed, method=method, batch_size=options['batch_size'], today=today,
+                              password=options['password'], progress=progress)
+        except ValueError as error:
+            raise CommandError(str(error))
+        self.stdout.write(self.style.SUCCESS(f"Utworzono {sum(result.values())} wierszy (ziarno {seed})."))
@@ -0,0 +1,66 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from my_garden_app.importers import import_maintenance, read_rows
+from my_garden_app.management.commands.import_plants import detect_format, format_errors
+
+
+class Command(BaseCommand):
+    """
+    Stream maintenance tasks keyed by plant name from CSV or JSON Lines into the database in batches.
+    """
+
+    help = ("Importuje zadania pielęgnacyjne (plant, task, task_description, week_of_month, month) "
+            "z pliku CSV lub JSON Lines. Istniejące zadania są pomijane.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Ścieżka do pliku lub '-' dla standardowego wejścia.")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], default=None,
+                            help="Format danych (domyślnie na podstawie rozszerzenia).")
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Liczba zadań zapisywanych w jednej transakcji.")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Pokaż zmiany bez zapisu do bazy.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size musi być większe od 0.")
+        if path == '-':
+            if not options['format']:
+                raise CommandError("Dla standardowego wejścia podaj --format.")
+            return self.run_import(sys.stdin, options['format'], options)
+
+        file_format = detect_format(path, options['format'])
+        try:
+            with open(path, newline='', encoding='utf-8-sig') as stream:
+                self.run_import(stream, file_format, options)
+        except FileNotFoundError:
+            raise CommandError(f"Plik {path} nie istnieje.")
+
+    def run_import(self, stream, file_format, options):
+        reported = 0
+
+        def progress(result):
+            nonlocal reported
+            for line_number, errors in result.rejected[reported:]:
+                self.stderr.write(f"Wiersz {line_number} odrzucony: {format_errors(errors)}")
+            reported = len(result.rejected)
+            self.stdout.write(f"Przetworzono {result.processed} wierszy ({result.rows_per_second:.0f} wierszy/s)")
+
+        def diff(line_number, sign, task):
+            # "+" - task would be added, "=" - the same task already exists
+            self.stdout.write(f"{sign} wiersz {line_number}: {task.get_task_display()}, "
+                              f"tydzień {task.get_week_of_month_display()}, {task.get_month_display()} "
+                              f"(roślina #{task.plant_id})")
+
+        result = import_maintenance(read_rows(stream, file_format), batch_size=options['batch_size'],
+                                    dry_run=options['dry_run'], progress=progress,
+                                    diff=diff if options['dry_run'] else None)
+
+        action = "Do dodania" if options['dry_run'] else "Dodano"
+        self.stdout.write(self.style.SUCCESS(
+            f"{action} {result.created} zadań, pominięto {result.skipped} istniejących, "
+            f"odrzucono {len(result.rejected)} wierszy ({result.rows_per_second:.0f} wierszy/s)."
+        ))
@@ -0,0 +1,77 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from my_garden_app.importers import import_plants, read_rows
+
+
+def detect_format(path, file_format):
+    """
+    Return the explicit format, or guess it from the file extension.
+    """
+    if file_format:
+        return file_format
+    suffix = Path(path).suffix.lower()
+    if suffix == '.csv':
+        return 'csv'
+    if suffix in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    raise CommandError("Nie rozpoznano formatu pliku, użyj --format csv lub --format jsonl.")
+
+
+def format_errors(errors):
+    return '; '.join(f"{name}: {' '.join(messages)}" for name, messages in errors.items())
+
+
+class Command(BaseCommand):
+    """
+    Stream a plant catalogue from CSV or JSON Lines into the database in batches.
+    """
+
+    help = "Importuje katalog roślin z pliku CSV lub JSON Lines (etykiety po polsku lub angielsku)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Ścieżka do pliku lub '-' dla standardowego wejścia.")
+        parser.add_argument('--format', choices=['csv', 'jsonl'], default=None,
+                            help="Format danych (domyślnie na podstawie rozszerzenia).")
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Liczba roślin zapisywanych w jednej transakcji.")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Tylko sprawdź dane, bez zapisu do bazy.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size musi być większe od 0.")
+        if path == '-':
+            if not options['format']:
+                raise CommandError("Dla standardowego wejścia podaj --format.")
+            return self.run_import(sys.stdin, options['format'], options)
+
+        file_format = detect_format(path, options['format'])
+        try:
+            with open(path, newline='', encoding='utf-8-sig') as stream:
+                self.run_import(stream, file_format, options)
+        except FileNotFoundError:
+            raise CommandError(f"Plik {path} nie istnieje.")
+
+    def run_import(self, stream, file_format, options):
+        reported = 0
+
+        def progress(result):
+            # Report rejected rows of the batch and the current speed
+            nonlocal reported
+            for line_number, errors in result.rejected[reported:]:
+                self.stderr.write(f"Wiersz {line_number} odrzucony: {format_errors(errors)}")
+            reported = len(result.rejected)
+            self.stdout.write(f"Przetworzono {result.processed} wierszy ({result.rows_per_second:.0f} wierszy/s)")
+
+        result = import_plants(read_rows(stream, file_format), batch_size=options['batch_size'],
+                               dry_run=options['dry_run'], progress=progress)
+
+        action = "Poprawnych" if options['dry_run'] else "Dodano"
+        self.stdout.write(self.style.SUCCESS(
+            f"{action} {result.created} roślin, odrzucono {len(result.rejected)} wierszy "
+            f"({result.rows_per_second:.0f} wierszy/s)."
+        ))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from my_garden_app.models import Garden
+from my_garden_app.schedule import materialize_schedule
+
+
+class Command(BaseCommand):
+    """
+    Expand maintenance tasks of planted plants into MaintenanceMonthlySchedule rows.
+    """
+
+    help = "Tworzy harmonogram prac (MaintenanceMonthlySchedule) dla ogrodów na podany rok."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, default=None,
+                            help="Rok harmonogramu (domyślnie bieżący).")
+        parser.add_argument('--garden', type=int, default=None,
+                            help="ID ogrodu (domyślnie wszystkie ogrody).")
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Liczba wierszy zapisywanych w jednym bulk_create.")
+        parser.add_argument('--replace', action='store_true',
+                            help="Usuń istniejący harmonogram przed utworzeniem nowego.")
+
+    def handle(self, *args, **options):
+        year = options['year'] or timezone.localdate().year
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size musi być większe od 0.")
+
+        garden = None
+        if options['garden'] is not None:
+            try:
+                garden = Garden.objects.get(pk=options['garden'])
+            except Garden.DoesNotExist:
+                raise CommandError(f"Ogród o ID {options['garden']} nie istnieje.")
+
+        created = materialize_schedule(year, garden=garden, batch_size=options['batch_size'],
+                                       replace=options['replace'])
+        scope = f"ogrodu {garden.name}" if garden else "wszystkich ogrodów"
+        self.stdout.write(self.style.SUCCESS(f"Utworzono {created} zadań harmonogramu {year} dla {scope}."))
@@ -0,0 +1,29 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from my_garden_app.photos import process_stale_photos
+
+
+class Command(BaseCommand):
+    """
+    Generate derivatives of photos left pending, e.g. after a restart lost the in-process queue.
+    """
+
+    help = ("Generuje miniatury zdjęć, które pozostały w stanie \"Przetwarzanie\" (np. po restarcie serwera). "
+            "Warto uruchamiać po wdrożeniu lub cyklicznie (cron).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, default=10,
+                            help="Tylko zdjęcia dodane (lub przetwarzane) co najmniej tyle minut temu (domyślnie 10); "
+                                 "nowszymi zajmują się jeszcze wątki serwera.")
+        parser.add_argument('--workers', type=int, default=0,
+                            help="Liczba wątków przetwarzających zdjęcia (domyślnie 0 - kolejno w tym wątku).")
+
+    def handle(self, *args, **options):
+        if options['older_than'] < 1:
+            raise CommandError("--older-than musi być większe od 0.")
+        if options['workers'] < 0:
+            raise CommandError("--workers nie może być ujemne.")
+        count = process_stale_photos(datetime.timedelta(minutes=options['older_than']), workers=options['workers'])
+        self.stdout.write(self.style.SUCCESS(f"Przetworzono {count} zdjęć."))
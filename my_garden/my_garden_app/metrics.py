@@ -0,0 +1,446 @@
+"""
+Per-view request metrics in Prometheus text format.
+
+MetricsMiddleware records for every resolved URL name the request latency (histogram), status codes,
+number and time of database queries, template render time and response size. Each thread writes to its
+own shard, so requests never wait for each other; the shards are summed only when /metrics is scraped.
+Shards of finished threads are folded into one retired total, so thread-per-request servers do not
+pile up shards.
+
+With preforked workers each process writes its totals to METRICS_DIR every METRICS_FLUSH_INTERVAL
+seconds and /metrics sums the files of all processes, so any worker can answer the scrape. A process
+removes its file when it exits, and files of processes which are no longer running are removed on scrape.
+"""
+
+import atexit
+import contextvars
+import json
+import os
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.template.backends.django import DjangoTemplates
+
+from . import plant_cache
+
+# Label of requests which did not resolve to a URL name (404s, static files, ...)
+UNRESOLVED = '<unresolved>'
+
+# Metrics of the request being handled, shared with the template backend and the query wrapper
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    __slots__ = ('queries', 'db_seconds', 'template_seconds')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper() callback
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_seconds += time.perf_counter() - started
+
+
+def count_query(execute, sql, params, many, context):
+    """
+    connection.execute_wrapper() callback of every connection, adds the query to the metrics of the current request.
+
+    The request is found through a context variable, so queries run by the async ORM in sync_to_async threads
+    are counted as well.
+    """
+    request_metrics = _current.get()
+    if request_metrics is None:
+        return execute(sql, params, many, context)
+    return request_metrics(execute, sql, params, many, context)
+
+
+@receiver(connection_created)
+def install_query_counter(sender, connection, **kwargs):
+    # Fired on every reconnect of the same wrapper, which keeps its execute_wrappers
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+class ViewSeries:
+    """
+    Totals of one view in one shard.
+    """
+
+    __slots__ = ('buckets', 'latency_sum', 'count', 'statuses', 'queries', 'db_seconds', 'template_seconds',
+                 'response_bytes')
+
+    def __init__(self, bucket_count):
+        # Non-cumulative counts per bucket, the last one is +Inf
+        self.buckets = [0] * (bucket_count + 1)
+        self.latency_sum = 0.0
+        self.count = 0
+        self.statuses = {}
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+        self.response_bytes = 0
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Registry:
+    """
+    Per-thread shards of {view name: ViewSeries}; only the lock-protected list of shards is shared.
+    """
+
+    def __init__(self, buckets):
+        self.bucket_bounds = list(buckets)
+        self._local = threading.local()
+        # (weak reference to the thread, its shard)
+        self._shards = []
+        # Totals of threads which finished, in the merge_series() format
+        self._retired = {}
+        self._shards_lock = threading.Lock()
+
+    def shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._retire_finished()
+                self._shards.append((weakref.ref(threading.current_thread()), shard))
+        return shard
+
+    def _retire_finished(self):
+        """
+        Fold the shards of finished threads into the retired totals (called with the lock held).
+        """
+        live = []
+        for thread_ref, shard in self._shards:
+            thread = thread_ref()
+            if thread is not None and thread.is_alive():
+                live.append((thread_ref, shard))
+            else:
+                for view, series in shard.items():
+                    merge_series(self._retired, view, series.as_dict())
+        self._shards = live
+
+    def series(self, view):
+        shard = self.shard()
+        series = shard.get(view)
+        if series is None:
+            series = shard[view] = ViewSeries(len(self.bucket_bounds))
+        return series
+
+    def observe(self, view, status, seconds, request_metrics, response_bytes):
+        series = self.series(view)
+        series.buckets[bisect_left(self.bucket_bounds, seconds)] += 1
+        series.latency_sum += seconds
+        series.count += 1
+        series.statuses[status] = series.statuses.get(status, 0) + 1
+        series.queries += request_metrics.queries
+        series.db_seconds += request_metrics.db_seconds
+        series.template_seconds += request_metrics.template_seconds
+        if response_bytes is not None:
+            series.response_bytes += response_bytes
+
+    def snapshot(self):
+        """
+        Return the totals of this process: {'buckets': [...], 'views': {view: {...}}, 'cache': {...}}.
+        """
+        views = {}
+        with self._shards_lock:
+            self._retire_finished()
+            shards = [shard for _, shard in self._shards]
+            for view, series in self._retired.items():
+                merge_series(views, view, series)
+        for shard in shards:
+            for view, series in list(shard.items()):
+                merge_series(views, view, series.as_dict())
+        return {'buckets': self.bucket_bounds, 'views': views, 'cache': plant_cache.cache_stats()}
+
+    def reset(self):
+        with self._shards_lock:
+            for _, shard in self._shards:
+                shard.clear()
+            self._retired.clear()
+
+    def shard_count(self):
+        with self._shards_lock:
+            return len(self._shards)
+
+
+def merge_series(views, view, data):
+    """
+    Add the totals of one view (a ViewSeries.as_dict() or its JSON) to views[view].
+    """
+    total = views.get(view)
+    if total is None:
+        views[view] = {**data, 'buckets': list(data['buckets']), 'statuses': dict(data['statuses'])}
+        return
+    total['buckets'] = [a + b for a, b in zip(total['buckets'], data['buckets'])]
+    for status, count in data['statuses'].items():
+        total['statuses'][status] = total['statuses'].get(status, 0) + count
+    for name in ('latency_sum', 'count', 'queries', 'db_seconds', 'template_seconds', 'response_bytes'):
+        total[name] += data[name]
+
+
+registry = Registry(settings.METRICS_LATENCY_BUCKETS)
+
+_last_flush = 0.0
+_flush_lock = threading.Lock()
+# Process which registered the removal of its file at exit; forked workers register their own
+_exit_handler_pid = None
+
+
+def _process_file(directory, pid=None):
+    return Path(directory) / f'{pid or os.getpid()}.json'
+
+
+def flush(force=False):
+    """
+    Write the totals of this process to METRICS_DIR (at most every METRICS_FLUSH_INTERVAL seconds).
+    """
+    global _last_flush, _exit_handler_pid
+    directory = settings.METRICS_DIR
+    if not directory:
+        return
+    # Without force a thread which finds another one flushing just skips, the other one writes the totals
+    if not _flush_lock.acquire(blocking=force):
+        return
+    try:
+        now = time.monotonic()
+        if not force and now - _last_flush < settings.METRICS_FLUSH_INTERVAL:
+            return
+        _last_flush = now
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        path = _process_file(directory)
+        # Written to a temporary file and renamed, so readers never see half a file
+        temporary = Path(directory) / f'.{os.getpid()}.tmp'
+        temporary.write_text(json.dumps(registry.snapshot()))
+        os.replace(temporary, path)
+        if _exit_handler_pid != os.getpid():
+            _exit_handler_pid = os.getpid()
+            atexit.register(remove_process_file, directory, _exit_handler_pid)
+    finally:
+        _flush_lock.release()
+
+
+def remove_process_file(directory, pid=None):
+    """
+    Remove the totals file of the process, when it exits; a new process reusing its pid starts from zero.
+    """
+    try:
+        _process_file(directory, pid).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Running, under another user
+        return True
+    return True
+
+
+def collect():
+    """
+    Return the totals of all processes (files in METRICS_DIR) or of this process alone.
+    """
+    if not settings.METRICS_DIR:
+        return registry.snapshot()
+    flush(force=True)
+    views, cache = {}, {}
+    for path in sorted(Path(settings.METRICS_DIR).glob('*.json')):
+        if path.stem.isdigit() and not process_alive(int(path.stem)):
+            # Left by a worker which was killed before its atexit handler ran
+            remove_process_file(settings.METRICS_DIR, path.stem)
+            continue
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            # Removed or replaced while reading - it will be complete on the next scrape
+            continue
+        if data['buckets'] != registry.bucket_bounds:
+            continue
+        for view, series in data['views'].items():
+            merge_series(views, view, series)
+        for name, counts in data['cache'].items():
+            total = cache.setdefault(name, {'hits': 0, 'misses': 0})
+            total['hits'] += counts['hits']
+            total['misses'] += counts['misses']
+    return {'buckets': registry.bucket_bounds, 'views': views, 'cache': cache}
+
+
+def _labels(**labels):
+    escaped = (str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+               for value in labels.values())
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_exposition(data):
+    """
+    Format collected totals in the Prometheus text exposition format (version 0.0.4).
+    """
+    views = sorted(data['views'].items())
+    lines = [
+        '# HELP my_garden_request_duration_seconds Request latency by view.',
+        '# TYPE my_garden_request_duration_seconds histogram',
+    ]
+    bounds = [_number(float(bound)) for bound in data['buckets']] + ['+Inf']
+    for view, series in views:
+        cumulative = 0
+        for bound, count in zip(bounds, series['buckets']):
+            cumulative += count
+            lines.append(f'my_garden_request_duration_seconds_bucket{_labels(view=view, le=bound)} {cumulative}')
+        lines.append(f'my_garden_request_duration_seconds_sum{_labels(view=view)} {_number(series["latency_sum"])}')
+        lines.append(f'my_garden_request_duration_seconds_count{_labels(view=view)} {series["count"]}')
+
+    lines += ['# HELP my_garden_requests_total Responses by view and status code.',
+              '# TYPE my_garden_requests_total counter']
+    for view, series in views:
+        for status, count in sorted(series['statuses'].items()):
+            lines.append(f'my_garden_requests_total{_labels(view=view, status=status)} {count}')
+
+    counters = [
+        ('my_garden_db_queries_total', 'queries', 'Database queries by view.'),
+        ('my_garden_db_query_seconds_total', 'db_seconds', 'Time spent in database queries by view.'),
+        ('my_garden_template_render_seconds_total', 'template_seconds', 'Time spent rendering templates by view.'),
+        ('my_garden_response_bytes_total', 'response_bytes', 'Size of response bodies by view.'),
+    ]
+    for metric, key, help_text in counters:
+        lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} counter']
+        lines += [f'{metric}{_labels(view=view)} {_number(series[key])}' for view, series in views]
+
+    lines += ['# HELP my_garden_plant_cache_requests_total Plant cache lookups by cache and result.',
+              '# TYPE my_garden_plant_cache_requests_total counter']
+    for name, counts in sorted(data['cache'].items()):
+        for result in ('hits', 'misses'):
+            lines.append(f'my_garden_plant_cache_requests_total{_labels(cache=name, result=result)} '
+                         f'{counts[result]}')
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsMiddleware:
+    """
+    Record latency, status, queries, template time and response size of every request under its URL name.
+
+    Works both synchronously and asynchronously, so under ASGI async views are not moved to a worker thread.
+    Queries are counted by count_query(), installed on every database connection.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request_metrics = RequestMetrics()
+        token = _current.set(request_metrics)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._record(request, response, time.perf_counter() - started, request_metrics)
+
+    async def __acall__(self, request):
+        request_metrics = RequestMetrics()
+        token = _current.set(request_metrics)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._record(request, response, time.perf_counter() - started, request_metrics)
+
+    def _record(self, request, response, seconds, request_metrics):
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match and match.view_name else UNRESOLVED
+        size = None
+        if not response.streaming:
+            size = len(response.content)
+        elif response.is_async:
+            response.streaming_content = self._acount_stream(view, response.streaming_content)
+        else:
+            # The body is sent after this returns; its size is added when the stream is exhausted
+            response.streaming_content = self._count_stream(view, response.streaming_content)
+        registry.observe(view, response.status_code, seconds, request_metrics, size)
+        flush()
+        return response
+
+    @staticmethod
+    def _count_stream(view, content):
+        size = 0
+        try:
+            for chunk in content:
+                size += len(chunk)
+                yield chunk
+        finally:
+            registry.series(view).response_bytes += size
+
+    @staticmethod
+    async def _acount_stream(view, content):
+        size = 0
+        try:
+            async for chunk in content:
+                size += len(chunk)
+                yield chunk
+        finally:
+            registry.series(view).response_bytes += size
+
+
+class TimedTemplate:
+    """
+    Template of the Django backend which adds its render time to the metrics of the current request.
+    """
+
+    def __init__(self, template):
+        self._template = template
+
+    def __getattr__(self, name):
+        return getattr(self._template, name)
+
+    def render(self, context=None, request=None):
+        started = time.perf_counter()
+        try:
+            return self._template.render(context, request)
+        finally:
+            request_metrics = _current.get()
+            if request_metrics is not None:
+                request_metrics.template_seconds += time.perf_counter() - started
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    DjangoTemplates backend timing every top-level render (includes and tags are part of their template).
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
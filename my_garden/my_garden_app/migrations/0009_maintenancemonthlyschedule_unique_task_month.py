@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_garden_app', '0008_alter_garden_user'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='maintenancemonthlyschedule',
+            name='month',
+            field=models.IntegerField(choices=[(1, 'Styczeń'), (2, 'Luty'), (3, 'Marzec'), (4, 'Kwiecień'), (5, 'Maj'), (6, 'Czerwiec'), (7, 'Lipiec'), (8, 'Sierpień'), (9, 'Wrzesień'), (10, 'Październik'), (11, 'Listopad'), (12, 'Grudzień'), (13, 'Brak')], verbose_name='Miesiąc'),
+        ),
+        migrations.AlterField(
+            model_name='maintenancemonthlyschedule',
+            name='status',
+            field=models.IntegerField(choices=[(1, 'Nie rozpoczęto'), (2, 'W trakcie'), (3, 'Zakończono')], default=1, verbose_name='Status realizacji'),
+        ),
+        migrations.AlterField(
+            model_name='plantmaintenance',
+            name='month',
+            field=models.IntegerField(choices=[(1, 'Styczeń'), (2, 'Luty'), (3, 'Marzec'), (4, 'Kwiecień'), (5, 'Maj'), (6, 'Czerwiec'), (7, 'Lipiec'), (8, 'Sierpień'), (9, 'Wrzesień'), (10, 'Październik'), (11, 'Listopad'), (12, 'Grudzień'), (13, 'Brak')], verbose_name='Miesiąc'),
+        ),
+        migrations.AlterField(
+            model_name='plantmaintenance',
+            name='week_of_month',
+            field=models.IntegerField(choices=[(1, 'Pierwszy'), (2, 'Drugi'), (3, 'Trzeci'), (4, 'Czwarty'), (5, 'Piąty'), (6, 'Brak')], verbose_name='Tydzień'),
+        ),
+        migrations.AddConstraint(
+            model_name='maintenancemonthlyschedule',
+            constraint=models.UniqueConstraint(fields=('plant_garden', 'task', 'month'), name='unique_schedule_task_month'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+# pg_trgm and the indexes are created only on PostgreSQL, other databases use the in-process search index.
+# Expression indexes matching Django's icontains SQL on PostgreSQL: UPPER("column"::text) LIKE UPPER(%s)
+TRIGRAM_INDEXES = [
+    ('my_garden_app_plant_name_trgm', 'my_garden_app_plant', 'name'),
+    ('my_garden_app_plant_description_trgm', 'my_garden_app_plant', 'description'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for index_name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{index_name}" ON "{table}" USING gin (UPPER("{column}"::text) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for index_name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{index_name}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_garden_app', '0009_maintenancemonthlyschedule_unique_task_month'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_garden_app', '0010_plant_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='plant',
+            index=models.Index(fields=['sunlight_exposure', 'watering_needs'], name='plant_sunlight_watering_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plant',
+            index=models.Index(fields=['flowering_season', 'max_height'], name='plant_flowering_height_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plant',
+            index=models.Index(fields=['sunlight_exposure', 'flowering_season', 'spread'], name='plant_sunlight_flowering_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_garden_app', '0011_plant_facet_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comments',
+            index=models.Index(fields=['plant', 'created_on', 'id'], name='comments_plant_created_idx'),
+        ),
+    ]
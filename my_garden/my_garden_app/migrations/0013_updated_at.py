@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_garden_app', '0012_comments_plant_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comments',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Data modyfikacji'),
+        ),
+        migrations.AddField(
+            model_name='garden',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Data modyfikacji'),
+        ),
+        migrations.AddField(
+            model_name='plant',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Data modyfikacji'),
+        ),
+        migrations.AddField(
+            model_name='plantgarden',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Data modyfikacji'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:40
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('my_garden_app', '0013_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlantPhoto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('image', models.FileField(upload_to='plant_photos/%Y/%m/', validators=[django.core.validators.FileExtensionValidator(['jpg', 'jpeg', 'png', 'webp'])], verbose_name='Zdjęcie')),
+                ('thumbnail', models.FileField(blank=True, upload_to='plant_photos/thumbnails/', verbose_name='Miniatura')),
+                ('medium', models.FileField(blank=True, upload_to='plant_photos/medium/', verbose_name='Podgląd')),
+                ('status', models.IntegerField(choices=[(1, 'Przetwarzanie'), (2, 'Gotowe'), (3, 'Błąd')], default=1, verbose_name='Status')),
+                ('created_on', models.DateTimeField(auto_now_add=True, verbose_name='Data dodania')),
+                ('plant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='my_garden_app.plant', verbose_name='Roślina')),
+                ('user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='Dodane przez')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['plant', 'status', 'id'], name='plantphoto_plant_status_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_garden_app', '0014_plantphoto'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='garden',
+            name='name',
+            field=models.CharField(db_index=True, max_length=100, verbose_name='Nazwa ogrodu'),
+        ),
+        migrations.AlterField(
+            model_name='plant',
+            name='name',
+            field=models.CharField(db_index=True, max_length=100, verbose_name='Nazwa'),
+        ),
+    ]
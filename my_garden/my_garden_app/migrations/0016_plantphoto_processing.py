@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_garden_app', '0015_name_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plantphoto',
+            name='processing_started',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Początek przetwarzania'),
+        ),
+        migrations.AlterField(
+            model_name='plantphoto',
+            name='status',
+            field=models.IntegerField(choices=[(1, 'Oczekuje'), (4, 'Przetwarzanie'), (2, 'Gotowe'), (3, 'Błąd')], default=1, verbose_name='Status'),
+        ),
+    ]
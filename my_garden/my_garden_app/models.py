@@ -1,3 +1,4 @@
+from django.core.validators import FileExtensionValidator
 from django.db import models
 from django.contrib.auth.models import User
 
@@ -65,7 +66,7 @@ class Plant(models.Model):
         (4, 'Brak')
     ]
 
-    name = models.CharField(max_length=100, verbose_name="Nazwa")
+    name = models.CharField(max_length=100, db_index=True, verbose_name="Nazwa")
     description = models.TextField(verbose_name="Opis")
     max_height = models.IntegerField(choices=MAXIMUM_HEIGHT_CHOICES, verbose_name="Wysokość_max")
     spread = models.IntegerField(choices=SPREAD_CHOICES, verbose_name="Rozpiętość")
@@ -75,6 +76,16 @@ class Plant(models.Model):
     watering_needs = models.IntegerField(choices=WATERING_NEEDS_CHOICES, verbose_name="Potrzeba podlewania")
     fertilization = models.IntegerField(choices=FERTILIZATION_CHOICES, verbose_name="Nawożenie")
     pest_disease_resistance = models.IntegerField(choices=PEST_DISEASE_RESISTANCE_CHOICES, verbose_name="Odporność na szkodniki i choroby")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Data modyfikacji")
+
+    class Meta:
+        indexes = [
+            # Most common combinations in the faceted plant filter
+            models.Index(fields=['sunlight_exposure', 'watering_needs'], name='plant_sunlight_watering_idx'),
+            models.Index(fields=['flowering_season', 'max_height'], name='plant_flowering_height_idx'),
+            models.Index(fields=['sunlight_exposure', 'flowering_season', 'spread'],
+                         name='plant_sunlight_flowering_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -102,14 +113,20 @@ class PlantMaintenance(models.Model):
     month = models.IntegerField(choices=MONTH_CHOICES, verbose_name="Miesiąc")
 
     def __str__(self):
-        task_name = dict(self.TASK_CHOICES).get(self.task)
-        return f"{task_name} - {self.plant.name}"
+        return f"{TASK_LABELS.get(self.task)} - {self.plant.name}"
+
+
+# Choice labels looked up once per process instead of once per __str__ call or rendered row
+MONTH_LABELS = dict(MONTH_CHOICES)
+TASK_LABELS = dict(PlantMaintenance.TASK_CHOICES)
+WEEK_LABELS = dict(PlantMaintenance.WEEK_OF_MONTH_CHOICES)
 
 
 class Garden(models.Model):
-    name = models.CharField(max_length=100, verbose_name="Nazwa ogrodu")
+    name = models.CharField(max_length=100, db_index=True, verbose_name="Nazwa ogrodu")
     plants = models.ManyToManyField(Plant, through="PlantGarden")
     user = models.ManyToManyField(User, blank=True, editable=False, verbose_name="Użytkownik")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Data modyfikacji")
 
     def __str__(self):
         return self.name
@@ -120,6 +137,7 @@ class PlantGarden(models.Model):
     plant = models.ForeignKey(Plant, on_delete=models.CASCADE)
     start_date = models.DateField(verbose_name="Data posadzenia")
     location = models.CharField(max_length=100, verbose_name="Lokalizacja")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Data modyfikacji")
 
     def __str__(self):
         return f"{self.plant.name} - Start Date: {self.start_date}, Location: {self.location}"
@@ -127,20 +145,68 @@ class PlantGarden(models.Model):
 
 class MaintenanceMonthlySchedule(models.Model):
     STATUS_CHOICES = [
-        ('1', 'Nie rozpoczęto'),
-        ('2', 'W trakcie'),
-        ('3', 'Zakończono')
+        (1, 'Nie rozpoczęto'),
+        (2, 'W trakcie'),
+        (3, 'Zakończono')
     ]
 
     plant_garden = models.ForeignKey(PlantGarden, on_delete=models.CASCADE, verbose_name='Roślina')
     task = models.ForeignKey(PlantMaintenance, on_delete=models.CASCADE, verbose_name='Zadanie')
-    status = models.IntegerField(choices=STATUS_CHOICES, verbose_name="Status realizacji")
+    status = models.IntegerField(choices=STATUS_CHOICES, default=1, verbose_name="Status realizacji")
     completion_date = models.DateField(verbose_name='Data realizacji')
     month = models.IntegerField(choices=MONTH_CHOICES, verbose_name='Miesiąc')
 
+    class Meta:
+        constraints = [
+            # One schedule entry per planting, task and month keeps re-materialization idempotent
+            models.UniqueConstraint(fields=['plant_garden', 'task', 'month'], name='unique_schedule_task_month'),
+        ]
+
 
 class Comments(models.Model):
     comment = models.TextField(verbose_name="Komentarz")
     created_on = models.DateTimeField(auto_now_add=True, verbose_name="Data utworzenia")
     plant = models.ForeignKey(Plant, on_delete=models.CASCADE)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Data modyfikacji")
+
+    class Meta:
+        indexes = [
+            # Cursor pagination of the comments feed of a plant
+            models.Index(fields=['plant', 'created_on', 'id'], name='comments_plant_created_idx'),
+        ]
+
+
+class PlantPhoto(models.Model):
+    STATUS_PENDING = 1
+    STATUS_READY = 2
+    STATUS_FAILED = 3
+    STATUS_PROCESSING = 4
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Oczekuje'),
+        (STATUS_PROCESSING, 'Przetwarzanie'),
+        (STATUS_READY, 'Gotowe'),
+        (STATUS_FAILED, 'Błąd'),
+    ]
+
+    plant = models.ForeignKey(Plant, on_delete=models.CASCADE, verbose_name="Roślina")
+    user = models.ForeignKey(User, null=True, on_delete=models.SET_NULL, verbose_name="Dodane przez")
+    # FileField rather than ImageField - the image is checked by the thumbnail worker, not by the upload form
+    image = models.FileField(upload_to='plant_photos/%Y/%m/', verbose_name="Zdjęcie",
+                             validators=[FileExtensionValidator(['jpg', 'jpeg', 'png', 'webp'])])
+    thumbnail = models.FileField(upload_to='plant_photos/thumbnails/', blank=True, verbose_name="Miniatura")
+    medium = models.FileField(upload_to='plant_photos/medium/', blank=True, verbose_name="Podgląd")
+    status = models.IntegerField(choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name="Status")
+    created_on = models.DateTimeField(auto_now_add=True, verbose_name="Data dodania")
+    # Set when a worker claims the photo, so photos of workers which died mid-processing can be found
+    processing_started = models.DateTimeField(null=True, blank=True, verbose_name="Początek przetwarzania")
+
+    class Meta:
+        indexes = [
+            # Ready photos of a plant, oldest first
+            models.Index(fields=['plant', 'status', 'id'], name='plantphoto_plant_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.plant.name} - {self.image.name}"
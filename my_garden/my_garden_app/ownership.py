@@ -0,0 +1,80 @@
+from django.conf import settings
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.cache import cache
+from django.http import Http404
+
+from .cache_versions import bump_versions, cache_timeout, get_version
+from .models import Garden
+
+# Rows of the Garden.user many-to-many table
+GardenUser = Garden.user.through
+
+
+def _version_key(user_id):
+    return f'user:{user_id}:gardens:version'
+
+
+def garden_ids_of(user_id):
+    """
+    Return the frozenset of ids of the user's gardens, from the cache or from the many-to-many table alone.
+
+    The key holds the version of the user's gardens, bumped by invalidate_user_gardens on every worker's
+    change. With a process-local cache the entry is kept only for GARDEN_OWNERSHIP_LOCAL_CACHE_TIMEOUT,
+    so access taken away in another worker process ends within that time.
+    """
+    key = f'user:{user_id}:gardens:{get_version(_version_key(user_id))}'
+    garden_ids = cache.get(key)
+    if garden_ids is None:
+        garden_ids = frozenset(GardenUser.objects.filter(user_id=user_id).values_list('garden_id', flat=True))
+        cache.set(key, garden_ids, timeout=cache_timeout(settings.GARDEN_OWNERSHIP_CACHE_TIMEOUT,
+                                                         settings.GARDEN_OWNERSHIP_LOCAL_CACHE_TIMEOUT))
+    return garden_ids
+
+
+def invalidate_user_gardens(*user_ids):
+    """
+    Make the cached garden ids of the users stale, after gardens were assigned to them or taken away.
+    """
+    bump_versions(*(_version_key(user_id) for user_id in user_ids))
+
+
+def get_garden_ids(request):
+    """
+    Return the ids of the gardens of the logged-in user, looked up once per request (see garden_ids_of).
+    """
+    if not hasattr(request, '_garden_ids'):
+        user = request.user
+        request._garden_ids = garden_ids_of(user.pk) if user.is_authenticated else frozenset()
+    return request._garden_ids
+
+
+def owns_garden(request, garden_id):
+    return int(garden_id) in get_garden_ids(request)
+
+
+class GardenOwnerRequiredMixin(LoginRequiredMixin):
+    """
+    Allow the view only to users who own the garden from the URL; other gardens look as if they did not exist.
+    """
+
+    garden_url_kwarg = 'garden_id'
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated and not owns_garden(request, kwargs[self.garden_url_kwarg]):
+            raise Http404("Nie znaleziono ogrodu.")
+        return super().dispatch(request, *args, **kwargs)
+
+
+class OwnedPlantingMixin(LoginRequiredMixin):
+    """
+    Limit planting views to plantings in the user's gardens, and the garden choices of their form as well.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(garden_id__in=get_garden_ids(self.request))
+
+    def get_form(self, form_class=None):
+        form = super().get_form(form_class)
+        if 'garden' in form.fields:
+            form.fields['garden'].queryset = Garden.objects.filter(id__in=get_garden_ids(self.request))
+        return form
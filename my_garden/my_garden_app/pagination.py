@@ -0,0 +1,144 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.utils.dateparse import parse_datetime
+
+
+def parse_cursor_id(value):
+    """
+    Convert the ?after= query parameter to a positive int, returning None for missing or invalid values.
+    """
+    try:
+        cursor = int(value)
+    except (TypeError, ValueError):
+        return None
+    return cursor if cursor >= 0 else None
+
+
+def keyset_page(queryset, after, page_size):
+    """
+    Return (objects, next_after) for the page of the queryset following the object with id `after`.
+
+    The queryset is ordered by id and filtered with id > after, so the database seeks straight to the
+    page through the primary key index - no OFFSET scan and no COUNT(*). One extra row is fetched
+    to tell whether a next page exists; next_after is None on the last page.
+    """
+    objects = list(queryset.filter(id__gt=after).order_by('id')[:page_size + 1])
+    return _keyset_result(objects, page_size)
+
+
+async def akeyset_page(queryset, after, page_size):
+    """
+    Async version of keyset_page().
+    """
+    objects = [obj async for obj in queryset.filter(id__gt=after).order_by('id')[:page_size + 1]]
+    return _keyset_result(objects, page_size)
+
+
+def _keyset_result(objects, page_size):
+    if len(objects) > page_size:
+        objects = objects[:page_size]
+        return objects, objects[-1].id
+    return objects, None
+
+
+def encode_cursor(value, object_id):
+    """
+    Encode the position (datetime of the ordering field, id) of the last object on a page as an opaque string.
+    """
+    raw = f'{value.isoformat()}|{object_id}'
+    return urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor made by encode_cursor() into (datetime, id), returning None for missing or invalid cursors.
+    """
+    if not cursor:
+        return None
+    try:
+        raw = urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        value, object_id = raw.rsplit('|', 1)
+        value = parse_datetime(value)
+        object_id = int(object_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if value is None:
+        return None
+    return value, object_id
+
+
+def cursor_page(queryset, cursor, page_size, field):
+    """
+    Return (objects, next_cursor) for the page following the cursor, newest first.
+
+    The queryset is ordered by (-field, -id) and filtered to rows before the cursor position
+    (field < value OR field = value AND id < id), so a composite index on (..., field, id) serves
+    every page with an index range scan instead of an OFFSET.
+    """
+    objects = list(_cursor_queryset(queryset, cursor, field)[:page_size + 1])
+    return _cursor_result(objects, page_size, field)
+
+
+async def acursor_page(queryset, cursor, page_size, field):
+    """
+    Async version of cursor_page().
+    """
+    objects = [obj async for obj in _cursor_queryset(queryset, cursor, field)[:page_size + 1]]
+    return _cursor_result(objects, page_size, field)
+
+
+def _cursor_queryset(queryset, cursor, field):
+    queryset = queryset.order_by(f'-{field}', '-id')
+    position = decode_cursor(cursor)
+    if position is not None:
+        value, object_id = position
+        queryset = queryset.filter(Q(**{f'{field}__lt': value}) | Q(**{field: value, 'id__lt': object_id}))
+    return queryset
+
+
+def _cursor_result(objects, page_size, field):
+    if len(objects) > page_size:
+        objects = objects[:page_size]
+        last = objects[-1]
+        return objects, encode_cursor(getattr(last, field), last.id)
+    return objects, None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator which takes the row count of a large unfiltered table from the PostgreSQL statistics.
+
+    COUNT(*) reads the whole table; pg_class.reltuples is kept up to date by (auto)vacuum and analyze,
+    which is precise enough for page links. Filtered querysets, small tables, tables which were never
+    analyzed and other databases are counted exactly.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        estimate = None
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+        if estimate is not None and estimate >= settings.ESTIMATED_COUNT_THRESHOLD:
+            return estimate
+        return super().count
+
+
+def estimated_row_count(model, using='default'):
+    """
+    Return the planner's estimate of the number of rows of the model's table, or None if there is none.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                       [connection.ops.quote_name(model._meta.db_table)])
+        row = cursor.fetchone()
+    # -1 means the table was never vacuumed or analyzed
+    return row[0] if row and row[0] >= 0 else None
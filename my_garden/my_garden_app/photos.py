@@ -0,0 +1,149 @@
+import datetime
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.db.models import OuterRef, Q, Subquery
+from django.utils import timezone
+
+from . import images, plant_cache
+from .freshness import touch_plants
+from .models import PlantPhoto
+
+logger = logging.getLogger(__name__)
+
+# (field, width) of the derivatives generated for every photo
+DERIVATIVES = [('thumbnail', 320), ('medium', 960)]
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Return the thread pool of this process which generates photo derivatives, started on first use.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.PLANT_PHOTO_WORKERS,
+                                           thread_name_prefix='plant-photos')
+        return _executor
+
+
+def enqueue_photo(photo_id):
+    """
+    Generate derivatives of the photo in the background once the current transaction commits.
+
+    With PLANT_PHOTO_WORKERS = 0 they are generated right away in the calling thread (e.g. in tests).
+    """
+    def submit():
+        if settings.PLANT_PHOTO_WORKERS:
+            get_executor().submit(_process_in_worker, photo_id)
+        else:
+            process_photo(photo_id)
+    transaction.on_commit(submit)
+
+
+def _process_in_worker(photo_id, stale_before=None):
+    # Worker threads get their own database connections, which must not be left open
+    close_old_connections()
+    try:
+        return process_photo(photo_id, stale_before)
+    finally:
+        close_old_connections()
+
+
+def claim_photo(photo_id, stale_before=None):
+    """
+    Mark the pending photo as being processed; return False when another worker or the command got it first.
+
+    With stale_before, a photo whose processing started before that time is claimed again - its worker died.
+    """
+    claimable = Q(status=PlantPhoto.STATUS_PENDING)
+    if stale_before is not None:
+        claimable |= Q(status=PlantPhoto.STATUS_PROCESSING, processing_started__lt=stale_before)
+    claimed = (PlantPhoto.objects
+               .filter(claimable, pk=photo_id)
+               .update(status=PlantPhoto.STATUS_PROCESSING, processing_started=timezone.now()))
+    return claimed == 1
+
+
+def process_photo(photo_id, stale_before=None):
+    """
+    Write the thumbnail and medium WebP derivatives of the photo and mark it as ready (or failed).
+    Return whether this call processed it.
+
+    The photo is claimed first (see claim_photo), so the thread pool and the process_pending_photos
+    command never write the derivatives of the same photo twice.
+    """
+    if not claim_photo(photo_id, stale_before):
+        return False
+    photo = PlantPhoto.objects.filter(pk=photo_id).first()
+    if photo is None:
+        return False
+    try:
+        if images.Image is None:
+            raise RuntimeError("Pillow is not installed")
+        stem = PurePosixPath(photo.image.name).stem
+        with photo.image.open('rb') as source, images.Image.open(source) as image:
+            # Phone cameras store the rotation in EXIF; the derivatives are written upright, without EXIF
+            image = images.ImageOps.exif_transpose(image).convert('RGB')
+            for field_name, width in DERIVATIVES:
+                data = images.encode_resized(image, min(width, image.width), 'WEBP', 80)
+                getattr(photo, field_name).save(f'{stem}.{width}.webp', ContentFile(data), save=False)
+        photo.status = PlantPhoto.STATUS_READY
+    except Exception:
+        logger.exception("Nie udało się przetworzyć zdjęcia %s", photo_id)
+        photo.status = PlantPhoto.STATUS_FAILED
+    photo.save(update_fields=['thumbnail', 'medium', 'status'])
+    plant_cache.invalidate_plant(photo.plant_id)
+    touch_plants(photo.plant_id)
+    return True
+
+
+def stale_pending_photos(older_than, now=None):
+    """
+    Return photos still waiting for derivatives although they were uploaded more than `older_than` ago,
+    and photos whose processing started more than `older_than` ago.
+
+    Their work was lost with the thread pool of a process which was restarted or stopped, or died with it.
+    """
+    stale_before = (now or timezone.now()) - older_than
+    return (PlantPhoto.objects
+            .filter(Q(status=PlantPhoto.STATUS_PENDING, created_on__lt=stale_before)
+                    | Q(status=PlantPhoto.STATUS_PROCESSING, processing_started__lt=stale_before))
+            .order_by('id'))
+
+
+def process_stale_photos(older_than=datetime.timedelta(minutes=10), workers=0):
+    """
+    Generate derivatives of the stale photos (see stale_pending_photos) and return how many were processed.
+
+    Photos claimed in the meantime by the thread pool of a web process are skipped. With workers > 0 the
+    photos are processed by that many threads, the call returns when all are done.
+    """
+    now = timezone.now()
+    photo_ids = list(stale_pending_photos(older_than, now).values_list('id', flat=True))
+    stale_befores = [now - older_than] * len(photo_ids)
+    if workers:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='plant-photos') as executor:
+            processed = list(executor.map(_process_in_worker, photo_ids, stale_befores))
+    else:
+        processed = list(map(process_photo, photo_ids, stale_befores))
+    return sum(processed)
+
+
+def with_thumbnail(plants):
+    """
+    Annotate plants with the name of the thumbnail of their first ready photo, in the same query.
+    """
+    thumbnails = (PlantPhoto.objects
+                  .filter(plant=OuterRef('pk'), status=PlantPhoto.STATUS_READY)
+                  .order_by('id')
+                  .values('thumbnail')[:1])
+    return plants.annotate(thumbnail=Subquery(thumbnails))
@@ -0,0 +1,128 @@
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404
+
+from .models import Plant, PlantMaintenance, Comments, PlantPhoto
+from .pagination import cursor_page
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+# Cached values which mean "no such object", as opposed to a cache miss (None)
+_MISSING = 'missing'
+
+
+def _record(name, hit):
+    with _stats_lock:
+        _stats[(name, 'hits' if hit else 'misses')] += 1
+
+
+def cache_stats():
+    """
+    Return hit/miss counters of this process, e.g. {'plant': {'hits': 10, 'misses': 2}, ...}.
+    """
+    with _stats_lock:
+        stats = {}
+        for (name, kind), count in _stats.items():
+            stats.setdefault(name, {'hits': 0, 'misses': 0})[kind] = count
+        return stats
+
+
+def reset_cache_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def _version_key(plant_id):
+    return f'plant:{plant_id}:version'
+
+
+def _plant_version(plant_id):
+    """
+    Return the current cache version of the plant.
+
+    A missing version starts from the current time in milliseconds rather than 1, so entries written
+    under an evicted version are never read again.
+    """
+    version = cache.get(_version_key(plant_id))
+    if version is None:
+        version = int(time.time() * 1000)
+        if not cache.add(_version_key(plant_id), version, timeout=None):
+            version = cache.get(_version_key(plant_id), version)
+    return version
+
+
+def _get_or_load(plant_id, name, loader):
+    """
+    Read-through lookup of one cached value of the plant.
+    """
+    key = f'plant:{plant_id}:v{_plant_version(plant_id)}:{name}'
+    value = cache.get(key)
+    _record(name.split(':')[0], value is not None)
+    if value is None:
+        value = loader()
+        cache.set(key, _MISSING if value is None else value, timeout=getattr(settings, 'PLANT_CACHE_TIMEOUT', 3600))
+    return None if value == _MISSING else value
+
+
+def get_plant(plant_id):
+    """
+    Return the plant with the given id or raise Http404.
+    """
+    plant = _get_or_load(plant_id, 'plant', lambda: Plant.objects.filter(pk=plant_id).first())
+    if plant is None:
+        raise Http404("Nie znaleziono rośliny.")
+    return plant
+
+
+def get_maintenance_tasks(plant_id):
+    """
+    Return the list of maintenance tasks of the plant.
+    """
+    return _get_or_load(plant_id, 'maintenance', lambda: list(PlantMaintenance.objects.filter(plant_id=plant_id)))
+
+
+def get_photos(plant_id):
+    """
+    Return the list of the plant's photos with ready thumbnails, oldest first.
+    """
+    return _get_or_load(plant_id, 'photos', lambda: list(
+        PlantPhoto.objects.filter(plant_id=plant_id, status=PlantPhoto.STATUS_READY).order_by('id')))
+
+
+def get_comments(plant_id, page_size):
+    """
+    Return (comments, next_cursor) for the first page of the plant's comments feed, newest first.
+
+    Only the first page is cached, older pages are read from the database by cursor.
+    """
+    return _get_or_load(plant_id, f'comments:{page_size}', lambda: comments_page(plant_id, None, page_size))
+
+
+def comments_page(plant_id, cursor, page_size):
+    """
+    Return (comments, next_cursor) for the page of the plant's comments after the cursor, with their authors.
+    """
+    comments = (Comments.objects
+                .filter(plant_id=plant_id)
+                .select_related('user')
+                .only('id', 'comment', 'created_on', 'plant', 'user', 'user__username'))
+    return cursor_page(comments, cursor, page_size, 'created_on')
+
+
+def invalidate_plant(*plant_ids):
+    """
+    Bump the cache version of the plants, so all their cached pages are read again from the database.
+    """
+    for plant_id in set(plant_ids):
+        if plant_id is None:
+            continue
+        try:
+            cache.incr(_version_key(plant_id))
+        except ValueError:
+            # No version stored yet - nothing of this plant can be cached
+            pass
@@ -0,0 +1,155 @@
+import calendar
+import datetime
+from collections import defaultdict
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import PlantGarden, PlantMaintenance, MaintenanceMonthlySchedule
+
+# MONTH_CHOICES value for "no month" - such tasks never land in the calendar
+NO_MONTH = 13
+# WEEK_OF_MONTH_CHOICES value for "no week" - the task may be done any time in the month
+NO_WEEK = 6
+
+
+def planned_date(year, month, week_of_month):
+    """
+    Return the first day of the given week of the month, or None for tasks without a month.
+    """
+    if month == NO_MONTH:
+        return None
+    if week_of_month == NO_WEEK:
+        return datetime.date(year, month, 1)
+    last_day = calendar.monthrange(year, month)[1]
+    return datetime.date(year, month, min((week_of_month - 1) * 7 + 1, last_day))
+
+
+def _tasks_by_plant(plant_gardens):
+    """
+    Map plant_id to the list of (task_id, month, week_of_month) of its maintenance tasks.
+    """
+    tasks = (PlantMaintenance.objects
+             .filter(plant__in=plant_gardens.values('plant_id'))
+             .exclude(month=NO_MONTH)
+             .values_list('id', 'plant_id', 'month', 'week_of_month'))
+    by_plant = defaultdict(list)
+    for task_id, plant_id, month, week_of_month in tasks:
+        by_plant[plant_id].append((task_id, month, week_of_month))
+    return by_plant
+
+
+def iter_schedule_rows(year, plant_gardens, chunk_size=2000):
+    """
+    Yield unsaved schedule rows for every (planting, maintenance task) pair of the given plantings.
+    """
+    by_plant = _tasks_by_plant(plant_gardens)
+    plantings = plant_gardens.values_list('id', 'plant_id').order_by('id').iterator(chunk_size=chunk_size)
+    for plant_garden_id, plant_id in plantings:
+        for task_id, month, week_of_month in by_plant.get(plant_id, ()):
+            yield MaintenanceMonthlySchedule(
+                plant_garden_id=plant_garden_id,
+                task_id=task_id,
+                month=month,
+                completion_date=planned_date(year, month, week_of_month),
+            )
+
+
+def materialize_schedule(year, garden=None, batch_size=1000, replace=False):
+    """
+    Fill MaintenanceMonthlySchedule for one garden (or all gardens) for the given year.
+
+    Rows are written with bulk_create in batches; existing (plant_garden, task, month) rows are
+    left untouched, so the function can be re-run safely. With replace=True the existing rows
+    of the gardens are removed first, e.g. to start a new season.
+    Returns the number of created rows.
+    """
+    plant_gardens = PlantGarden.objects.all()
+    if garden is not None:
+        plant_gardens = plant_gardens.filter(garden=garden)
+    schedules = MaintenanceMonthlySchedule.objects.filter(plant_garden__in=plant_gardens.values('id'))
+
+    with transaction.atomic():
+        if replace:
+            schedules.delete()
+        count_before = schedules.count()
+
+        rows = iter_schedule_rows(year, plant_gardens)
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            MaintenanceMonthlySchedule.objects.bulk_create(batch, batch_size=batch_size, ignore_conflicts=True)
+
+        return schedules.count() - count_before
+
+
+def sync_schedule(plant_garden_ids=(), task_ids=()):
+    """
+    Bring schedule rows of the given plantings and maintenance tasks in line with their current state.
+
+    Only the affected rows are touched: missing (planting, task) pairs are inserted, rows whose task
+    moved to another month or week are updated and rows which no longer match (e.g. the planting now
+    holds another plant) are deleted. New rows are planned for the current year.
+    """
+    plant_garden_ids = set(plant_garden_ids)
+    task_ids = set(task_ids)
+    if not plant_garden_ids and not task_ids:
+        return
+
+    dirty_tasks = list(PlantMaintenance.objects.filter(id__in=task_ids)
+                       .values_list('id', 'plant_id', 'month', 'week_of_month'))
+    dirty_plantings = list(PlantGarden.objects.filter(id__in=plant_garden_ids).values_list('id', 'plant_id'))
+
+    # Plantings of plants whose tasks changed and tasks of plants which were planted or replanted
+    plantings_by_plant = defaultdict(list)
+    for plant_garden_id, plant_id in PlantGarden.objects.filter(
+            plant_id__in={plant_id for _, plant_id, _, _ in dirty_tasks}).values_list('id', 'plant_id'):
+        plantings_by_plant[plant_id].append(plant_garden_id)
+    tasks_by_plant = defaultdict(list)
+    for task in PlantMaintenance.objects.filter(
+            plant_id__in={plant_id for _, plant_id in dirty_plantings}).values_list('id', 'plant_id', 'month',
+                                                                                 'week_of_month'):
+        tasks_by_plant[task[1]].append(task)
+
+    # (plant_garden_id, task_id) -> (month, week_of_month) for every row which should exist
+    desired = {}
+    for plant_garden_id, plant_id in dirty_plantings:
+        for task_id, _, month, week_of_month in tasks_by_plant[plant_id]:
+            desired[(plant_garden_id, task_id)] = (month, week_of_month)
+    for task_id, plant_id, month, week_of_month in dirty_tasks:
+        for plant_garden_id in plantings_by_plant[plant_id]:
+            desired[(plant_garden_id, task_id)] = (month, week_of_month)
+    desired = {key: value for key, value in desired.items() if value[0] != NO_MONTH}
+
+    existing = MaintenanceMonthlySchedule.objects.filter(
+        Q(plant_garden_id__in=plant_garden_ids) | Q(task_id__in=task_ids))
+    to_delete, to_update = [], []
+    for schedule in existing.only('id', 'plant_garden', 'task', 'month', 'completion_date'):
+        key = (schedule.plant_garden_id, schedule.task_id)
+        if key not in desired:
+            to_delete.append(schedule.id)
+            continue
+        month, week_of_month = desired.pop(key)
+        completion_date = planned_date(schedule.completion_date.year, month, week_of_month)
+        if (schedule.month, schedule.completion_date) != (month, completion_date):
+            schedule.month = month
+            schedule.completion_date = completion_date
+            to_update.append(schedule)
+
+    year = timezone.localdate().year
+    to_create = [
+        MaintenanceMonthlySchedule(plant_garden_id=plant_garden_id, task_id=task_id, month=month,
+                                   completion_date=planned_date(year, month, week_of_month))
+        for (plant_garden_id, task_id), (month, week_of_month) in desired.items()
+    ]
+
+    with transaction.atomic():
+        if to_delete:
+            MaintenanceMonthlySchedule.objects.filter(id__in=to_delete).delete()
+        if to_update:
+            MaintenanceMonthlySchedule.objects.bulk_update(to_update, ['month', 'completion_date'])
+        if to_create:
+            MaintenanceMonthlySchedule.objects.bulk_create(to_create, ignore_conflicts=True)
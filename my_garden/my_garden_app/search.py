@@ -0,0 +1,167 @@
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+
+from .models import Plant
+
+# Words of plant names weigh more than words of descriptions when ranking results
+NAME_WEIGHT = 2
+DESCRIPTION_WEIGHT = 1
+
+_TOKEN_RE = re.compile(r'[^\W_]+')
+
+
+def tokenize(text):
+    """
+    Split text into lowercase words (underscores and punctuation separate words).
+    """
+    return _TOKEN_RE.findall(text.casefold())
+
+
+def terms_filter(terms):
+    """
+    Q matching plants which contain every term in their name or description.
+    """
+    condition = Q()
+    for term in terms:
+        condition &= Q(name__icontains=term) | Q(description__icontains=term)
+    return condition
+
+
+class PostgresSearchBackend:
+    """
+    Search backed by GIN trigram indexes on UPPER(name) and UPPER(description) (see migration 0010).
+
+    The icontains lookups compile to UPPER(column::text) LIKE UPPER(...), which is exactly the indexed
+    expression, so PostgreSQL answers them with a bitmap index scan instead of a sequential scan.
+    The query is split into words like in InvertedIndex and every word must match, each with its own
+    indexed lookup. Results are ranked by trigram similarity of the name.
+    """
+
+    def search(self, query, limit):
+        from django.contrib.postgres.search import TrigramSimilarity
+
+        terms = tokenize(query)
+        if not terms:
+            return []
+        return list(Plant.objects
+                    .filter(terms_filter(terms))
+                    .annotate(rank=TrigramSimilarity('name', ' '.join(terms)))
+                    .only('id', 'name')
+                    .order_by('-rank', 'name', 'id')[:limit])
+
+
+class InvertedIndex:
+    """
+    In-process inverted index: word -> {plant_id: score}, with a sorted word list for prefix lookups.
+    """
+
+    def __init__(self, rows):
+        postings = defaultdict(lambda: defaultdict(int))
+        self.names = {}
+        for plant_id, name, description in rows:
+            self.names[plant_id] = name
+            for word in tokenize(name):
+                postings[word][plant_id] += NAME_WEIGHT
+            for word in tokenize(description):
+                postings[word][plant_id] += DESCRIPTION_WEIGHT
+        self.postings = dict(postings)
+        self.words = sorted(self.postings)
+
+    def _prefix_scores(self, term):
+        """
+        Sum scores of all indexed words starting with the term.
+        """
+        scores = defaultdict(int)
+        position = bisect_left(self.words, term)
+        while position < len(self.words) and self.words[position].startswith(term):
+            for plant_id, score in self.postings[self.words[position]].items():
+                scores[plant_id] += score
+            position += 1
+        return scores
+
+    def search(self, query, limit):
+        """
+        Return ids of plants matching every word of the query (as a word prefix), best matches first.
+        """
+        scores = None
+        for term in tokenize(query):
+            term_scores = self._prefix_scores(term)
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {plant_id: scores[plant_id] + term_scores[plant_id]
+                          for plant_id in scores.keys() & term_scores.keys()}
+            if not scores:
+                return []
+        if not scores:
+            return []
+        ranked = sorted(scores, key=lambda plant_id: (-scores[plant_id], self.names[plant_id], plant_id))
+        return ranked[:limit]
+
+
+class InvertedIndexSearchBackend:
+    """
+    Pure-Python fallback for databases without trigram support (e.g. SQLite in test runs).
+
+    The index is built on first use and dropped whenever a Plant is saved or deleted.
+    """
+
+    def __init__(self):
+        self._index = None
+        self._lock = threading.Lock()
+
+    def get_index(self):
+        index = self._index
+        if index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = InvertedIndex(Plant.objects.values_list('id', 'name', 'description').iterator())
+                index = self._index
+        return index
+
+    def invalidate(self):
+        self._index = None
+
+    def search(self, query, limit):
+        plant_ids = self.get_index().search(query, limit)
+        plants = Plant.objects.only('id', 'name').in_bulk(plant_ids)
+        return [plants[plant_id] for plant_id in plant_ids if plant_id in plants]
+
+
+BACKENDS = {
+    'postgresql': PostgresSearchBackend(),
+    'inverted_index': InvertedIndexSearchBackend(),
+}
+
+
+def get_search_backend():
+    """
+    Return the backend from settings.PLANT_SEARCH_BACKEND, chosen by database vendor by default.
+    """
+    name = getattr(settings, 'PLANT_SEARCH_BACKEND', None)
+    if name is None:
+        name = 'postgresql' if connection.vendor == 'postgresql' else 'inverted_index'
+    return BACKENDS[name]
+
+
+def search_plants(query, limit=50):
+    """
+    Return up to `limit` plants matching the query in name or description, best matches first.
+    """
+    query = query.strip()
+    if not query:
+        return []
+    return get_search_backend().search(query, limit)
+
+
+def invalidate_search_index():
+    """
+    Drop the in-process index after the plant catalogue changed.
+    """
+    BACKENDS['inverted_index'].invalidate()
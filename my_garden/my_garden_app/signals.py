@@ -0,0 +1,200 @@
+import threading
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .attribute_index import invalidate_attribute_index
+from .autocomplete import invalidate_plant_autocomplete
+from .dashboard import invalidate_dashboards, owners_of_gardens, owners_of_plants
+from .freshness import touch_gardens, touch_plants
+from .models import Plant, Garden, PlantGarden, PlantMaintenance, Comments
+from .ownership import GardenUser, invalidate_user_gardens
+from .schedule import sync_schedule
+from .search import invalidate_search_index
+
+# Plantings and maintenance tasks changed in the current transaction, per thread (= per DB connection)
+_pending = threading.local()
+
+
+def _pending_changes():
+    """
+    Return the sets of changed plantings and tasks waiting for the schedule sync.
+    """
+    if not hasattr(_pending, 'plant_gardens'):
+        _pending.plant_gardens = set()
+        _pending.tasks = set()
+    return _pending.plant_gardens, _pending.tasks
+
+
+def _flush_schedule_changes():
+    """
+    Sync the schedule for everything collected so far; later callbacks of the same commit find nothing to do.
+    """
+    plant_gardens, tasks = _pending_changes()
+    if not plant_gardens and not tasks:
+        return
+    plant_garden_ids, task_ids = set(plant_gardens), set(tasks)
+    plant_gardens.clear()
+    tasks.clear()
+    sync_schedule(plant_garden_ids=plant_garden_ids, task_ids=task_ids)
+
+
+@receiver(post_save, sender=PlantGarden, dispatch_uid='schedule_plant_garden_saved')
+def plant_garden_saved(sender, instance, raw=False, using=None, **kwargs):
+    """
+    Queue schedule sync for a planting which was added or edited (e.g. its plant was replaced).
+    """
+    if raw:
+        return
+    _pending_changes()[0].add(instance.pk)
+    transaction.on_commit(_flush_schedule_changes, using=using)
+
+
+@receiver(post_save, sender=PlantMaintenance, dispatch_uid='schedule_maintenance_saved')
+def maintenance_saved(sender, instance, raw=False, using=None, **kwargs):
+    """
+    Queue schedule sync for a maintenance task which was added or moved to another month, week or plant.
+    """
+    if raw:
+        return
+    _pending_changes()[1].add(instance.pk)
+    transaction.on_commit(_flush_schedule_changes, using=using)
+
+
+@receiver(post_delete, sender=PlantGarden, dispatch_uid='schedule_plant_garden_deleted')
+def plant_garden_deleted(sender, instance, **kwargs):
+    """
+    Schedule rows of a removed planting are deleted by the cascade, only drop it from the pending sync.
+    """
+    _pending_changes()[0].discard(instance.pk)
+
+
+@receiver(post_delete, sender=PlantMaintenance, dispatch_uid='schedule_maintenance_deleted')
+def maintenance_deleted(sender, instance, **kwargs):
+    """
+    Schedule rows of a removed task are deleted by the cascade, only drop it from the pending sync.
+    """
+    _pending_changes()[1].discard(instance.pk)
+
+
+@receiver(post_save, sender=Plant, dispatch_uid='catalogue_plant_saved')
+@receiver(post_delete, sender=Plant, dispatch_uid='catalogue_plant_deleted')
+def plant_changed(sender, **kwargs):
+    """
+    Drop the in-process search, attribute and autocomplete indexes, they are rebuilt on the next query.
+    """
+    invalidate_search_index()
+    invalidate_attribute_index()
+    invalidate_plant_autocomplete()
+
+
+@receiver(post_save, sender=PlantGarden, dispatch_uid='freshness_plant_garden_saved')
+@receiver(post_delete, sender=PlantGarden, dispatch_uid='freshness_plant_garden_deleted')
+def planting_changed(sender, instance, raw=False, **kwargs):
+    """
+    A planting changed - the page of its garden is no longer fresh.
+    """
+    if not raw:
+        touch_gardens(instance.garden_id)
+
+
+@receiver(post_save, sender=PlantMaintenance, dispatch_uid='freshness_maintenance_saved')
+@receiver(post_delete, sender=PlantMaintenance, dispatch_uid='freshness_maintenance_deleted')
+@receiver(post_save, sender=Comments, dispatch_uid='freshness_comment_saved')
+@receiver(post_delete, sender=Comments, dispatch_uid='freshness_comment_deleted')
+def plant_page_changed(sender, instance, raw=False, **kwargs):
+    """
+    A maintenance task or comment changed - the pages of its plant are no longer fresh.
+    """
+    if not raw:
+        touch_plants(instance.plant_id)
+
+
+def _dashboard_owners(instance):
+    """
+    Return the ids of the users whose dashboards show the plant, garden, planting or task as it is stored now.
+    """
+    if isinstance(instance, Plant):
+        return owners_of_plants(instance.pk)
+    if isinstance(instance, Garden):
+        return owners_of_gardens(instance.pk)
+    if isinstance(instance, PlantGarden):
+        return owners_of_gardens(*PlantGarden.objects.filter(pk=instance.pk).values_list('garden_id', flat=True))
+    return owners_of_plants(*PlantMaintenance.objects.filter(pk=instance.pk).values_list('plant_id', flat=True))
+
+
+@receiver(pre_save, sender=PlantGarden, dispatch_uid='dashboard_plant_garden_saving')
+@receiver(pre_save, sender=PlantMaintenance, dispatch_uid='dashboard_maintenance_saving')
+def dashboard_data_saving(sender, instance, raw=False, **kwargs):
+    """
+    Remember the owners of the garden or plant an edited planting or task belonged to, it may be moved.
+    """
+    if not raw and instance.pk is not None:
+        instance._dashboard_owners = _dashboard_owners(instance)
+
+
+@receiver(post_save, sender=Plant, dispatch_uid='dashboard_plant_saved')
+@receiver(post_save, sender=Garden, dispatch_uid='dashboard_garden_saved')
+@receiver(post_save, sender=PlantGarden, dispatch_uid='dashboard_plant_garden_saved')
+@receiver(post_save, sender=PlantMaintenance, dispatch_uid='dashboard_maintenance_saved')
+def dashboard_data_saved(sender, instance, raw=False, **kwargs):
+    """
+    Names, plantings or tasks changed - drop the dashboards of the owners of the affected gardens.
+    """
+    if raw:
+        return
+    if isinstance(instance, PlantGarden):
+        owners = owners_of_gardens(instance.garden_id)
+    elif isinstance(instance, PlantMaintenance):
+        owners = owners_of_plants(instance.plant_id)
+    else:
+        owners = _dashboard_owners(instance)
+    invalidate_dashboards(*owners, *getattr(instance, '_dashboard_owners', ()))
+
+
+@receiver(pre_delete, sender=Plant, dispatch_uid='dashboard_plant_deleted')
+@receiver(pre_delete, sender=Garden, dispatch_uid='dashboard_garden_deleted')
+@receiver(pre_delete, sender=PlantGarden, dispatch_uid='dashboard_plant_garden_deleted')
+@receiver(pre_delete, sender=PlantMaintenance, dispatch_uid='dashboard_maintenance_deleted')
+def dashboard_data_deleted(sender, instance, **kwargs):
+    """
+    Owners are looked up before the delete, the cascade removes the rows linking them to the instance.
+    """
+    invalidate_dashboards(*_dashboard_owners(instance))
+
+
+@receiver(m2m_changed, sender=GardenUser, dispatch_uid='dashboard_garden_users_changed')
+def dashboard_owners_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Users got or lost a garden (garden.user.add/remove/clear or user.garden_set...) - drop their dashboards.
+    """
+    if reverse and action in ('post_add', 'post_remove', 'post_clear'):
+        # instance is the user
+        invalidate_dashboards(instance.pk)
+    elif action in ('post_add', 'post_remove'):
+        invalidate_dashboards(*pk_set)
+    elif action == 'pre_clear':
+        invalidate_dashboards(*instance.user.values_list('id', flat=True))
+
+
+@receiver(m2m_changed, sender=GardenUser, dispatch_uid='ownership_garden_users_changed')
+def garden_users_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Users got or lost a garden (garden.user.set/add/remove/clear or user.garden_set...) - drop their garden ids.
+    """
+    if reverse and action in ('post_add', 'post_remove', 'post_clear'):
+        # instance is the user
+        invalidate_user_gardens(instance.pk)
+    elif action in ('post_add', 'post_remove'):
+        invalidate_user_gardens(*pk_set)
+    elif action == 'pre_clear':
+        invalidate_user_gardens(*instance.user.values_list('id', flat=True))
+
+
+@receiver(pre_delete, sender=Garden, dispatch_uid='ownership_garden_deleted')
+def garden_deleted(sender, instance, **kwargs):
+    """
+    Rows of a deleted garden are removed by the cascade, without m2m_changed.
+    """
+    invalidate_user_gardens(*instance.user.values_list('id', flat=True))
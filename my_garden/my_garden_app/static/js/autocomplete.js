@@ -0,0 +1,53 @@
+// Suggestions for inputs rendered by AutocompleteWidget: the visible input shows names from the
+// JSON endpoint in its <datalist>, the hidden input holds the id of the chosen one.
+(function () {
+    var DELAY = 200;
+
+    function setUp(input) {
+        var target = document.getElementById(input.dataset.autocompleteTarget);
+        var options = document.getElementById(input.getAttribute('list'));
+        var timer = null;
+        var request = 0;
+
+        function choose() {
+            var option = Array.prototype.find.call(options.options, function (item) {
+                return item.value === input.value;
+            });
+            target.value = option ? option.dataset.id : '';
+        }
+
+        function load() {
+            var current = ++request;
+            fetch(input.dataset.autocompleteUrl + '?q=' + encodeURIComponent(input.value), {credentials: 'same-origin'})
+                .then(function (response) { return response.json(); })
+                .then(function (data) {
+                    if (current !== request) {
+                        return;
+                    }
+                    options.innerHTML = '';
+                    data.results.forEach(function (result) {
+                        var option = document.createElement('option');
+                        option.value = result.text;
+                        option.dataset.id = result.id;
+                        options.appendChild(option);
+                    });
+                    choose();
+                });
+        }
+
+        input.addEventListener('input', function () {
+            choose();
+            clearTimeout(timer);
+            timer = setTimeout(load, DELAY);
+        });
+        input.addEventListener('focus', function () {
+            if (!options.options.length) {
+                load();
+            }
+        });
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        document.querySelectorAll('[data-autocomplete-url]').forEach(setUp);
+    });
+})();
@@ -0,0 +1,455 @@
+"""
+Synthetic data for load tests: users, gardens, plants, plantings, maintenance tasks, schedule and comments.
+
+Every table gets its ids assigned up front (the next free id of the table), so foreign keys are known
+while the rows are generated and nothing has to be read back. On PostgreSQL rows are streamed with
+COPY FROM STDIN from generator-fed buffers, elsewhere they are written with batched bulk_create.
+The same seed, plan and day always give the same values.
+
+The database must not be written to by anyone else during generation - ids are reserved by counting,
+not by the sequences. Photos are not generated, they need image files.
+"""
+
+import datetime
+import random
+import re
+import time
+from array import array
+from dataclasses import dataclass
+from itertools import accumulate, islice
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+
+from .attribute_index import invalidate_attribute_index
+from .autocomplete import invalidate_plant_autocomplete
+from .dashboard import invalidate_dashboards
+from .models import MONTH_CHOICES, Comments, Garden, MaintenanceMonthlySchedule, Plant, PlantGarden, \
+    PlantMaintenance
+from .ownership import GardenUser, invalidate_user_gardens
+from .schedule import NO_MONTH, planned_date
+from .search import invalidate_search_index
+
+METHODS = ('copy', 'bulk')
+
+SPECIES = [
+    'Róża wielokwiatowa', 'Hortensja bukietowa', 'Lawenda wąskolistna', 'Tawuła japońska', 'Berberys Thunberga',
+    'Klon palmowy', 'Jałowiec łuskowaty', 'Funkia ogrodowa', 'Piwonia chińska', 'Rozchodnik okazały',
+    'Żurawka ogrodowa', 'Bukszpan wieczniezielony', 'Forsycja pośrednia', 'Lilak pospolity',
+    'Powojnik wielkokwiatowy', 'Szałwia omszona', 'Kocimiętka Faassena', 'Jeżówka purpurowa',
+    'Rudbekia błyskotliwa', 'Trzmielina Fortune’a',
+    'Cis pośredni', 'Magnolia gwiaździsta', 'Różanecznik katawbijski', 'Tulipan ogrodowy',
+]
+CULTIVARS = [
+    'Alba', 'Rubra', 'Aurea', 'Nana', 'Compacta', 'Variegata', 'Purpurea', 'Pendula', 'Gloria', 'Limelight',
+    'Hidcote', 'Blue Star', 'Goldflame', 'Vanilla', 'Magnus', 'Herbstfreude', 'Palace Purple', 'Bella',
+]
+DESCRIPTIONS = [
+    'Łatwa w uprawie, dobrze znosi suszę.', 'Wymaga żyznej, przepuszczalnej gleby.',
+    'Dobrze rośnie w pojemnikach.', 'Przyciąga pszczoły i motyle.', 'Nadaje się na żywopłoty.',
+    'Wrażliwa na późne przymrozki.', 'Długo kwitnie, przekwitłe kwiaty warto usuwać.',
+    'Ozdobna także zimą.',
+]
+GARDEN_NAMES = ['Ogród przydomowy', 'Ogród warzywny', 'Rabata bylinowa', 'Ogród na balkonie', 'Działka', 'Sad',
+                'Ogród skalny', 'Ogród cienisty']
+LOCATIONS = ['Rabata', 'Skalniak', 'Donica', 'Przy tarasie', 'Przy płocie', 'Warzywnik', 'Pod drzewem']
+TASK_DESCRIPTIONS = {
+    1: ['Przyciąć przekwitłe pędy.', 'Cięcie formujące.', 'Usunąć suche i chore gałęzie.'],
+    2: ['Nawóz wieloskładnikowy.', 'Nawóz jesienny bez azotu.', 'Kompost wokół rośliny.'],
+}
+COMMENTS = [
+    'Pięknie kwitnie w tym roku!', 'U mnie przemarzła, polecam okrywać na zimę.',
+    'Czy można ją przesadzić jesienią?',
+    'Świetnie rośnie w półcieniu.', 'Mszyce pojawiły się w czerwcu.', 'Polecam, bardzo odporna.',
+    'Jak często podlewać w donicy?', 'Kwitnie drugi raz po przycięciu.',
+]
+
+# Relative frequencies of choice values; fields and values missing here are drawn uniformly
+CHOICE_WEIGHTS = {
+    'max_height': {1: 2, 2: 5, 3: 3},
+    'flowering_season': {1: 4, 2: 5, 3: 2, 4: 1},
+    'sunlight_exposure': {1: 5, 2: 3, 3: 2},
+    'watering_needs': {1: 2, 2: 5, 3: 3},
+    'pest_disease_resistance': {1: 7, 2: 3},
+    'task': {1: 3, 2: 2},
+    # Mostly the first weeks of the month or any time in it; the fifth week is short
+    'week_of_month': {1: 4, 2: 3, 3: 3, 4: 2, 5: 1, 6: 4},
+    # Gardening season, a few tasks without a month
+    'month': {1: 1, 2: 2, 3: 6, 4: 9, 5: 8, 6: 6, 7: 5, 8: 5, 9: 5, 10: 6, 11: 3, 12: 1, 13: 1},
+}
+PLANT_CHOICE_FIELDS = ['max_height', 'spread', 'flowering_season', 'sunlight_exposure', 'pruning_frequency',
+                       'watering_needs', 'fertilization', 'pest_disease_resistance']
+# Exponent of the Zipf-like popularity of plants in gardens and comments
+POPULARITY_SKEW = 1.1
+# Share of gardens with a second owner
+SHARED_GARDENS = 0.1
+# Rows whose random values are drawn together, one rng.choices(k=...) call per column
+BLOCK_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class GenerationPlan:
+    """
+    Row counts to generate; the per-garden and per-plant values are means, the actual counts vary.
+    """
+
+    users: int = 100
+    gardens: int = 150
+    plants: int = 10_000
+    plantings_per_garden: int = 30
+    tasks_per_plant: int = 2
+    comments_per_plant: int = 2
+    year: int = 2024
+    schedule: bool = True
+
+
+def _choices(field_choices, name):
+    """
+    Return (values, cumulative weights) of a choice field for rng.choices().
+    """
+    weights = CHOICE_WEIGHTS.get(name, {})
+    values = [value for value, _ in field_choices]
+    return values, list(accumulate(weights.get(value, 1) for value in values))
+
+
+def _next_id(model):
+    return (model.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+
+
+def _blocks(count):
+    """
+    Yield (first index, size) of consecutive blocks covering range(count).
+    """
+    for start in range(0, count, BLOCK_SIZE):
+        yield start, min(BLOCK_SIZE, count - start)
+
+
+def _random_datetime(rng, start, seconds):
+    moment = start + datetime.timedelta(seconds=rng.randrange(seconds))
+    return moment.replace(tzinfo=datetime.timezone.utc) if settings.USE_TZ else moment
+
+
+class SyntheticData:
+    """
+    Row generators of one plan; generators run in the order of tables(), later ones use ids of earlier ones.
+    """
+
+    def __init__(self, plan, seed, today=None, password=None):
+        self.plan = plan
+        self.rng = random.Random(seed)
+        self.today = today or datetime.date(plan.year, 12, 31)
+        self.password = make_password(password)
+        self.first_id = {model: _next_id(model) for model, _, _ in self.tables()}
+        # Plants drawn for plantings and comments follow a Zipf-like popularity
+        self.popularity = list(accumulate(1 / (rank + 1) ** POPULARITY_SKEW for rank in range(plan.plants)))
+        # Maintenance tasks are consecutive per plant: plant i has tasks task_offsets[i]:task_offsets[i + 1]
+        self.task_offsets = array('q', [0])
+        self.task_months = array('b')
+        self.task_weeks = array('b')
+        # Plant index of every planting, in planting id order
+        self.planting_plants = array('q')
+
+    def tables(self):
+        """
+        (model, attnames, row generator) of every table, parents before children.
+        """
+        tables = [
+            (User, ['id', 'password', 'is_superuser', 'username', 'first_name', 'last_name', 'email', 'is_staff',
+                    'is_active', 'date_joined'], self.users),
+            (Plant, ['id', 'name', 'description', *PLANT_CHOICE_FIELDS, 'updated_at'], self.plants),
+            (PlantMaintenance, ['id', 'plant_id', 'task', 'task_description', 'week_of_month', 'month'], self.tasks),
+            (Garden, ['id', 'name', 'updated_at'], self.gardens),
+            (GardenUser, ['id', 'garden_id', 'user_id'], self.garden_users),
+            (PlantGarden, ['id', 'garden_id', 'plant_id', 'start_date', 'location', 'updated_at'], self.plantings),
+            (Comments, ['id', 'comment', 'created_on', 'plant_id', 'user_id', 'updated_at'], self.comments),
+        ]
+        if self.plan.schedule:
+            tables.append((MaintenanceMonthlySchedule, ['id', 'plant_garden_id', 'task_id', 'status',
+                                                        'completion_date', 'month'], self.schedule))
+        return tables
+
+    def _ids(self, model):
+        return self.first_id[model]
+
+    def _plant_index(self):
+        return self.rng.choices(range(self.plan.plants), cum_weights=self.popularity)[0]
+
+    def users(self):
+        joined_from = datetime.datetime(self.plan.year - 2, 1, 1)
+        for user_id in range(self._ids(User), self._ids(User) + self.plan.users):
+            yield (user_id, self.password, False, f'ogrodnik_{user_id}', '', '', f'ogrodnik_{user_id}@example.com',
+                   False, True, _random_datetime(self.rng, joined_from, 2 * 365 * 86400))
+
+    def plants(self):
+        choices = [_choices(Plant._meta.get_field(name).choices, name) for name in PLANT_CHOICE_FIELDS]
+        updated_from = datetime.datetime(self.plan.year - 1, 1, 1)
+        for start, size in _blocks(self.plan.plants):
+            columns = zip(*(self.rng.choices(values, cum_weights=weights, k=size) for values, weights in choices))
+            for index, values in enumerate(columns, start):
+                species = self.rng.choice(SPECIES)
+                description = ' '.join(self.rng.sample(DESCRIPTIONS, 2))
+                yield (self._ids(Plant) + index, f"{species} '{self.rng.choice(CULTIVARS)}' {index + 1}",
+                       f"{species}. {description}", *values, _random_datetime(self.rng, updated_from, 365 * 86400))
+
+    def tasks(self):
+        task_values, task_weights = _choices(PlantMaintenance.TASK_CHOICES, 'task')
+        week_values, week_weights = _choices(PlantMaintenance.WEEK_OF_MONTH_CHOICES, 'week_of_month')
+        month_values, month_weights = _choices(MONTH_CHOICES, 'month')
+        task_id = self._ids(PlantMaintenance)
+        for index in range(self.plan.plants):
+            # One task per (task, month) of a plant, like an imported maintenance calendar
+            planned = set()
+            for _ in range(self.rng.randint(0, 2 * self.plan.tasks_per_plant)):
+                task = self.rng.choices(task_values, cum_weights=task_weights)[0]
+                month = self.rng.choices(month_values, cum_weights=month_weights)[0]
+                week = self.rng.choices(week_values, cum_weights=week_weights)[0]
+                if (task, month) in planned:
+                    continue
+                planned.add((task, month))
+                self.task_months.append(month)
+                self.task_weeks.append(week)
+                yield task_id, self._ids(Plant) + index, task, self.rng.choice(TASK_DESCRIPTIONS[task]), week, month
+                task_id += 1
+            self.task_offsets.append(len(self.task_months))
+
+    def gardens(self):
+        updated_from = datetime.datetime(self.plan.year - 1, 1, 1)
+        for index in range(self.plan.gardens):
+            garden_id = self._ids(Garden) + index
+            yield (garden_id, f'{self.rng.choice(GARDEN_NAMES)} {index + 1}',
+                   _random_datetime(self.rng, updated_from, 365 * 86400))
+
+    def garden_users(self):
+        if not self.plan.users:
+            return
+        row_id = self._ids(GardenUser)
+        for index in range(self.plan.gardens):
+            # Every user gets a garden first, the rest go to random users; some gardens are shared
+            owner = index if index < self.plan.users else self.rng.randrange(self.plan.users)
+            owners = {owner}
+            if self.plan.users > 1 and self.rng.random() < SHARED_GARDENS:
+                owners.add(self.rng.randrange(self.plan.users))
+            for owner in sorted(owners):
+                yield row_id, self._ids(Garden) + index, self._ids(User) + owner
+                row_id += 1
+
+    def plantings(self):
+        if not self.plan.plants:
+            return
+        planted_from = datetime.date(self.plan.year - 3, 1, 1)
+        planting_id = self._ids(PlantGarden)
+        for index in range(self.plan.gardens):
+            # Mostly small gardens with a long tail of big ones
+            size = min(self.plan.plants, max(1, round(self.rng.expovariate(1 / self.plan.plantings_per_garden))))
+            planted = set()
+            for _ in range(3 * size):
+                if len(planted) == size:
+                    break
+                planted.add(self._plant_index())
+            for plant_index in sorted(planted):
+                self.planting_plants.append(plant_index)
+                start_date = planted_from + datetime.timedelta(days=self.rng.randrange(3 * 365))
+                location = f'{self.rng.choice(LOCATIONS)} {self.rng.randint(1, 20)}'
+                yield (planting_id, self._ids(Garden) + index, self._ids(Plant) + plant_index, start_date, location,
+                       _random_datetime(self.rng, datetime.datetime.combine(start_date, datetime.time()), 86400))
+                planting_id += 1
+
+    def comments(self):
+        if not self.plan.plants or not self.plan.users:
+            return
+        posted_from = datetime.datetime(self.plan.year - 1, 1, 1)
+        for start, size in _blocks(self.plan.plants * self.plan.comments_per_plant):
+            plant_indexes = self.rng.choices(range(self.plan.plants), cum_weights=self.popularity, k=size)
+            texts = self.rng.choices(COMMENTS, k=size)
+            for offset, (plant_index, text) in enumerate(zip(plant_indexes, texts), start):
+                created_on = _random_datetime(self.rng, posted_from, 2 * 365 * 86400)
+                yield (self._ids(Comments) + offset, text, created_on, self._ids(Plant) + plant_index,
+                       self._ids(User) + self.rng.randrange(self.plan.users), created_on)
+
+    def schedule(self):
+        row_id = self._ids(MaintenanceMonthlySchedule)
+        for planting_offset, plant_index in enumerate(self.planting_plants):
+            for task_offset in range(self.task_offsets[plant_index], self.task_offsets[plant_index + 1]):
+                month = self.task_months[task_offset]
+                if month == NO_MONTH:
+                    continue
+                completion_date = planned_date(self.plan.year, month, self.task_weeks[task_offset])
+                # Past tasks are mostly done, current ones in progress, future ones not started
+                done = self.rng.random() < 0.8
+                if completion_date < self.today.replace(day=1):
+                    status = 3 if done else 1
+                elif completion_date.replace(day=1) == self.today.replace(day=1):
+                    status = 2
+                else:
+                    status = 1
+                yield (row_id, self._ids(PlantGarden) + planting_offset, self._ids(PlantMaintenance) + task_offset,
+                       status, completion_date, month)
+                row_id += 1
+
+
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+_COPY_SPECIAL = re.compile(r'[\\\t\n\r]')
+
+
+def copy_value(value):
+    """
+    Format a value for COPY text format.
+    """
+    # Checked by exact type first, the generators write mostly ints and plain strings
+    kind = type(value)
+    if kind is int:
+        return str(value)
+    if kind is str:
+        return value.translate(_COPY_ESCAPES) if _COPY_SPECIAL.search(value) else value
+    if value is None:
+        return '\\N'
+    if kind is bool:
+        return 't' if value else 'f'
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return str(value).translate(_COPY_ESCAPES)
+
+
+def copy_chunks(rows, rows_per_chunk):
+    """
+    Yield COPY text-format buffers of rows_per_chunk rows each, encoded as UTF-8.
+    """
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, rows_per_chunk))
+        if not batch:
+            break
+        yield ''.join('\t'.join(map(copy_value, row)) + '\n' for row in batch).encode()
+
+
+class ChunkReader:
+    """
+    Read-only file object over a generator of bytes buffers, for psycopg2's copy_expert().
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = b''
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+class Counter:
+    """
+    Pass rows through while counting them.
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.count = 0
+
+    def __iter__(self):
+        for row in self.rows:
+            self.count += 1
+            yield row
+
+
+def copy_rows(model, fields, rows, batch_size):
+    """
+    Stream rows into the table of the model with COPY FROM STDIN (psycopg 3 or psycopg2).
+    """
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(model._meta.get_field(name).column) for name in fields)
+    sql = f'COPY {quote(model._meta.db_table)} ({columns}) FROM STDIN'
+    chunks = copy_chunks(rows, batch_size)
+    with connection.cursor() as cursor:
+        if hasattr(cursor.cursor, 'copy'):
+            with cursor.cursor.copy(sql) as copy:
+                for chunk in chunks:
+                    copy.write(chunk)
+        else:
+            cursor.cursor.copy_expert(sql, ChunkReader(chunks))
+
+
+def bulk_create_rows(model, fields, rows, batch_size):
+    """
+    Insert rows with bulk_create, batch_size objects at a time.
+
+    auto_now and auto_now_add are switched off on the given fields for the time of the insert, otherwise
+    bulk_create would overwrite the generated timestamps with the current time (COPY keeps them as they are).
+    """
+    stamped = [field for field in (model._meta.get_field(name) for name in fields)
+               if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)]
+    flags = [(field.auto_now, field.auto_now_add) for field in stamped]
+    for field in stamped:
+        field.auto_now = field.auto_now_add = False
+    try:
+        rows = iter(rows)
+        while True:
+            batch = [model(**dict(zip(fields, row))) for row in islice(rows, batch_size)]
+            if not batch:
+                break
+            model.objects.bulk_create(batch, batch_size=batch_size)
+    finally:
+        for field, (auto_now, auto_now_add) in zip(stamped, flags):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def reset_sequences(models):
+    """
+    Move the id sequences past the explicitly inserted ids.
+    """
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+
+def default_method():
+    return 'copy' if connection.vendor == 'postgresql' else 'bulk'
+
+
+def generate(plan, seed, method=None, batch_size=5000, today=None, password=None, progress=None):
+    """
+    Generate the plan in one transaction and return {model: number of rows}.
+
+    `method` is 'copy' (PostgreSQL only) or 'bulk', by default the fastest one for the database.
+    `progress` is called with (model, rows, seconds) after every table. Users get `password`,
+    or an unusable one.
+    """
+    method = method or default_method()
+    if method not in METHODS:
+        raise ValueError(f"Nieznana metoda: {method}")
+    if method == 'copy' and connection.vendor != 'postgresql':
+        raise ValueError("COPY jest dostępne tylko w PostgreSQL.")
+    write = copy_rows if method == 'copy' else bulk_create_rows
+
+    counts = {}
+    with transaction.atomic():
+        data = SyntheticData(plan, seed, today=today, password=password)
+        for model, fields, rows in data.tables():
+            started = time.monotonic()
+            counted = Counter(rows())
+            write(model, fields, counted, batch_size)
+            counts[model] = counted.count
+            if progress:
+                progress(model, counted.count, time.monotonic() - started)
+        reset_sequences(list(counts))
+
+    # Neither COPY nor bulk_create send signals
+    invalidate_search_index()
+    invalidate_attribute_index()
+    invalidate_plant_autocomplete()
+    user_ids = range(data.first_id[User], data.first_id[User] + plan.users)
+    invalidate_user_gardens(*user_ids)
+    invalidate_dashboards(*user_ids)
+    return counts
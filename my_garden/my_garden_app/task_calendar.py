@@ -0,0 +1,91 @@
+from typing import NamedTuple
+
+from django.db.models import Prefetch
+
+from .models import PlantGarden, PlantMaintenance, MONTH_LABELS, TASK_LABELS, WEEK_LABELS
+
+
+class CalendarRow(NamedTuple):
+    """
+    A single (planting, task, month, week) entry of the garden calendar.
+    """
+
+    plant_garden_id: int
+    plant_id: int
+    plant_name: str
+    start_date: object
+    location: str
+    task_id: int
+    task: int
+    month: int
+    week_of_month: int
+
+    @property
+    def task_label(self):
+        return TASK_LABELS.get(self.task)
+
+    @property
+    def month_label(self):
+        return MONTH_LABELS.get(self.month)
+
+    @property
+    def week_label(self):
+        return WEEK_LABELS.get(self.week_of_month)
+
+
+def build_garden_calendar(garden):
+    """
+    Build the list of calendar rows for all plantings in the garden.
+
+    Plantings and their plants are fetched in one joined query, maintenance tasks of those plants
+    are prefetched with one more query. Rows are ordered by planting, month and week.
+    """
+    tasks = PlantMaintenance.objects.only('id', 'plant', 'task', 'month', 'week_of_month')
+    plant_gardens = (PlantGarden.objects
+                     .filter(garden=garden)
+                     .select_related('plant')
+                     .only('id', 'start_date', 'location', 'plant', 'plant__id', 'plant__name')
+                     .prefetch_related(Prefetch('plant__plantmaintenance_set', queryset=tasks))
+                     .order_by('plant__name', 'start_date', 'id'))
+
+    return [row for plant_garden in plant_gardens
+            for row in calendar_rows(plant_garden, plant_garden.plant.plantmaintenance_set.all())]
+
+
+def calendar_rows(plant_garden, tasks):
+    """
+    Yield the calendar rows of one planting (with its plant loaded) for its plant's tasks, by month and week.
+    """
+    plant = plant_garden.plant
+    for task in sorted(tasks, key=lambda t: (t.month, t.week_of_month, t.id)):
+        yield CalendarRow(
+            plant_garden_id=plant_garden.id,
+            plant_id=plant.id,
+            plant_name=plant.name,
+            start_date=plant_garden.start_date,
+            location=plant_garden.location,
+            task_id=task.id,
+            task=task.task,
+            month=task.month,
+            week_of_month=task.week_of_month,
+        )
+
+
+def filter_month(rows, month):
+    """
+    Return only the rows scheduled for the given month (all rows if month is None).
+    """
+    if month is None:
+        return rows
+    return [row for row in rows if row.month == month]
+
+
+def parse_month(value):
+    """
+    Convert the month from the query string to int, returning None for empty or invalid values.
+    """
+    try:
+        month = int(value)
+    except (TypeError, ValueError):
+        return None
+    return month if month in MONTH_LABELS else None
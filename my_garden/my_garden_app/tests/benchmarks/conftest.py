@@ -0,0 +1,59 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+from django.db import connection
+
+from .datasets import DATASETS, clear, seed
+
+BASELINE_PATH = Path(__file__).with_name('baseline.json')
+# Dataset names to run, e.g. MY_GARDEN_BENCHMARK_DATASETS=1k,10k
+DATASET_NAMES = os.environ.get('MY_GARDEN_BENCHMARK_DATASETS', '1k').split(',')
+# With MY_GARDEN_BENCHMARK_UPDATE=1 the measured values are written to baseline.json instead of checked
+UPDATE_BASELINE = os.environ.get('MY_GARDEN_BENCHMARK_UPDATE') == '1'
+# Wall times depend on the machine, they are compared with the baseline only with MY_GARDEN_BENCHMARK_LATENCY=1
+CHECK_LATENCY = os.environ.get('MY_GARDEN_BENCHMARK_LATENCY') == '1'
+
+
+def pytest_collection_modifyitems(config, items):
+    """
+    Benchmarks seed large datasets and run only with MY_GARDEN_BENCHMARK=1 (or when updating the baseline).
+    """
+    if os.environ.get('MY_GARDEN_BENCHMARK') == '1' or UPDATE_BASELINE:
+        return
+    skip = pytest.mark.skip(reason="benchmarks run with MY_GARDEN_BENCHMARK=1")
+    for item in items:
+        if item.get_closest_marker('benchmark'):
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope='module', params=DATASET_NAMES)
+def benchmark_data(request, django_db_setup, django_db_blocker):
+    """
+    Seed the dataset once for all benchmarks of the module and remove it afterwards.
+    """
+    dataset = DATASETS[request.param]
+    with django_db_blocker.unblock():
+        data = seed(dataset)
+    yield data
+    with django_db_blocker.unblock():
+        clear()
+
+
+@pytest.fixture(scope='session')
+def benchmark_baseline():
+    """
+    The stored baseline, {'<vendor>:<dataset>': {label: {'queries', 'seconds', 'peak_kb'}}}; measured values
+    are added to it and written back at the end of the session when updating.
+    """
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    yield baseline
+    if UPDATE_BASELINE:
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + '\n')
+
+
+@pytest.fixture
+def baseline_key(benchmark_data):
+    # Query counts differ between databases (e.g. estimated counts on PostgreSQL)
+    return f'{connection.vendor}:{benchmark_data.dataset.name}'
@@ -0,0 +1,132 @@
+import datetime
+import random
+from dataclasses import dataclass
+
+from django.contrib.auth.models import User
+
+from my_garden_app.attribute_index import invalidate_attribute_index
+from my_garden_app.autocomplete import invalidate_plant_autocomplete
+from my_garden_app.models import Comments, Garden, MaintenanceMonthlySchedule, Plant, PlantGarden, PlantMaintenance, \
+    PlantPhoto
+from my_garden_app.search import invalidate_search_index
+
+BATCH_SIZE = 2000
+
+
+@dataclass(frozen=True)
+class Dataset:
+    """
+    Size of a synthetic dataset: catalogue size, plantings of the small and the big garden,
+    comments of the quiet and the busy plant.
+    """
+
+    name: str
+    plants: int
+    small_garden: int
+    big_garden: int
+    quiet_comments: int
+    busy_comments: int
+
+
+DATASETS = {
+    dataset.name: dataset for dataset in [
+        Dataset('1k', plants=1_000, small_garden=10, big_garden=100, quiet_comments=0, busy_comments=500),
+        Dataset('10k', plants=10_000, small_garden=10, big_garden=1_000, quiet_comments=0, busy_comments=5_000),
+        Dataset('100k', plants=100_000, small_garden=10, big_garden=1_000, quiet_comments=0, busy_comments=5_000),
+    ]
+}
+
+
+@dataclass
+class SeededData:
+    """
+    Objects the benchmarked URLs point at.
+    """
+
+    dataset: Dataset
+    user: User
+    small_garden: Garden
+    big_garden: Garden
+    quiet_plant: Plant
+    busy_plant: Plant
+    planting: PlantGarden
+    task: PlantMaintenance
+    comment: Comments
+
+
+def _choice(rng, choices):
+    return rng.choice(choices)[0]
+
+
+def seed(dataset, seed_value=2024):
+    """
+    Fill the database with the dataset with bulk_create and return the objects the benchmarks use.
+
+    Values are random but repeatable for the same seed, so runs compare against the same data.
+    """
+    rng = random.Random(seed_value)
+    user = User.objects.create_superuser(username='benchmark', password='benchmark')
+
+    plants = Plant.objects.bulk_create([
+        Plant(name=f'Roślina {number:06d}',
+              description=f'Opis rośliny {number}, {rng.choice(["krzew", "bylina", "pnącze", "drzewo"])}',
+              max_height=_choice(rng, Plant.MAXIMUM_HEIGHT_CHOICES),
+              spread=_choice(rng, Plant.SPREAD_CHOICES),
+              flowering_season=_choice(rng, Plant.FLOWERING_SEASON_CHOICES),
+              sunlight_exposure=_choice(rng, Plant.SUNLIGHT_EXPOSURE_CHOICES),
+              pruning_frequency=_choice(rng, Plant.PRUNING_FREQUENCY_CHOICES),
+              watering_needs=_choice(rng, Plant.WATERING_NEEDS_CHOICES),
+              fertilization=_choice(rng, Plant.FERTILIZATION_CHOICES),
+              pest_disease_resistance=_choice(rng, Plant.PEST_DISEASE_RESISTANCE_CHOICES))
+        for number in range(dataset.plants)
+    ], batch_size=BATCH_SIZE)
+    busy_plant, quiet_plant = plants[0], plants[-1]
+
+    # Three tasks in different months for every plant which is planted somewhere
+    planted = plants[:max(dataset.big_garden, dataset.small_garden)]
+    tasks = PlantMaintenance.objects.bulk_create([
+        PlantMaintenance(plant=plant, task=_choice(rng, PlantMaintenance.TASK_CHOICES),
+                         task_description='Opis zadania', week_of_month=rng.randint(1, 6), month=month)
+        for plant in planted for month in rng.sample(range(1, 13), 3)
+    ], batch_size=BATCH_SIZE)
+
+    small_garden = Garden.objects.create(name='Mały ogród')
+    big_garden = Garden.objects.create(name='Duży ogród')
+    for garden in (small_garden, big_garden):
+        garden.user.add(user)
+    start = datetime.date(2024, 1, 1)
+    plantings = PlantGarden.objects.bulk_create([
+        PlantGarden(garden=garden, plant=plant, start_date=start + datetime.timedelta(days=rng.randint(0, 365)),
+                    location=f'Rabata {rng.randint(1, 20)}')
+        for garden, count in ((small_garden, dataset.small_garden), (big_garden, dataset.big_garden))
+        for plant in plants[:count]
+    ], batch_size=BATCH_SIZE)
+
+    comments = Comments.objects.bulk_create([
+        Comments(plant=plant, user=user, comment=f'Komentarz {number}')
+        for plant, count in ((busy_plant, dataset.busy_comments), (quiet_plant, dataset.quiet_comments))
+        for number in range(count)
+    ], batch_size=BATCH_SIZE)
+
+    # bulk_create sends no post_save signals
+    invalidate_search_index()
+    invalidate_attribute_index()
+    invalidate_plant_autocomplete()
+
+    return SeededData(dataset=dataset, user=user, small_garden=small_garden, big_garden=big_garden,
+                      quiet_plant=quiet_plant, busy_plant=busy_plant, planting=plantings[0], task=tasks[0],
+                      comment=comments[0])
+
+
+def clear():
+    """
+    Remove everything seed() created.
+    """
+    # Plain DELETE statements, children first - delete() would load every row to send signals
+    for model in (Comments, MaintenanceMonthlySchedule, PlantPhoto, PlantGarden, PlantMaintenance, Garden.user.through,
+                  Garden, Plant):
+        model.objects.all()._raw_delete(model.objects.db)
+    User.objects.filter(username='benchmark').delete()
+    invalidate_search_index()
+    invalidate_attribute_index()
+    invalidate_plant_autocomplete()
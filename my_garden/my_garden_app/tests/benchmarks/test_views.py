@@ -0,0 +1,188 @@
+"""
+View-level benchmarks: every URL of my_garden/urls.py against seeded datasets of several sizes.
+
+Each scenario is requested with an empty cache (the worst case a visitor can hit) and measured for
+wall time, number of queries and peak memory allocated during the request. The numbers are compared
+with baseline.json: a view fails when it runs more queries than its baseline or allocates more than
+MEMORY_TOLERANCE times its baseline peak (plus MEMORY_SLACK_KB). Both hardly depend on the machine.
+Wall times do, so being slower than LATENCY_TOLERANCE times the baseline (plus LATENCY_SLACK for timer noise)
+fails only with MY_GARDEN_BENCHMARK_LATENCY=1, on the machine the baseline was stored on.
+Scenarios without a baseline for the database vendor and dataset fail; store one with
+MY_GARDEN_BENCHMARK_UPDATE=1.
+
+    MY_GARDEN_BENCHMARK=1 pytest my_garden_app/tests/benchmarks
+    MY_GARDEN_BENCHMARK=1 MY_GARDEN_BENCHMARK_DATASETS=1k,10k,100k pytest my_garden_app/tests/benchmarks
+    MY_GARDEN_BENCHMARK=1 MY_GARDEN_BENCHMARK_LATENCY=1 pytest my_garden_app/tests/benchmarks
+    MY_GARDEN_BENCHMARK_UPDATE=1 pytest my_garden_app/tests/benchmarks    # store new baseline values
+"""
+
+import time
+import tracemalloc
+from typing import Callable, NamedTuple
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver, reverse
+
+from .conftest import CHECK_LATENCY, UPDATE_BASELINE
+
+# Requests per scenario; the fastest one counts for latency, the one with most queries for queries
+REPEAT = 3
+LATENCY_TOLERANCE = 2.0
+# Absolute allowance in seconds, small next to the 1-15 ms of typical views so 2x slowdowns still fail
+LATENCY_SLACK = 0.003
+MEMORY_TOLERANCE = 1.5
+# Absolute allowance for allocations which vary between runs (caches of the interpreter and of Django)
+MEMORY_SLACK_KB = 64
+
+
+class Scenario(NamedTuple):
+    label: str
+    url_name: str
+    kwargs: Callable = lambda data: {}
+    params: dict = {}
+
+
+SCENARIOS = [
+    Scenario('home', 'home'),
+    Scenario('login', 'login'),
+    Scenario('add_plant', 'add_plant'),
+    Scenario('edit_plant', 'edit_plant', lambda data: {'plant_id': data.busy_plant.id}),
+    Scenario('delete_plant', 'delete_plant', lambda data: {'plant_id': data.busy_plant.id}),
+    Scenario('plants_list', 'plants_list'),
+    Scenario('plants_list[last_page]', 'plants_list', params={'page': 'last'}),
+    Scenario('plants_list[after]', 'plants_list', lambda data: {}, {'after': 500}),
+    Scenario('plant_details[busy]', 'plant_details', lambda data: {'plant_id': data.busy_plant.id}),
+    Scenario('plant_details[quiet]', 'plant_details', lambda data: {'plant_id': data.quiet_plant.id}),
+    Scenario('add_maintenance', 'add_maintenance'),
+    Scenario('edit_maintenance', 'edit_maintenance', lambda data: {'task_id': data.task.id}),
+    Scenario('delete_maintenance', 'delete_maintenance', lambda data: {'task_id': data.task.id}),
+    Scenario('maintenance_list', 'maintenance_list', lambda data: {'plant_id': data.busy_plant.id}),
+    Scenario('add_garden', 'add_garden'),
+    Scenario('edit_garden', 'edit_garden', lambda data: {'garden_id': data.big_garden.id}),
+    Scenario('gardens_list', 'gardens_list'),
+    Scenario('garden_details[small]', 'garden_details', lambda data: {'garden_id': data.small_garden.id}),
+    Scenario('garden_details[big]', 'garden_details', lambda data: {'garden_id': data.big_garden.id}),
+    Scenario('plant_search', 'plant_search'),
+    Scenario('plants_filter', 'plants_filter', params={'sunlight_exposure': 1, 'watering_needs': 2}),
+    Scenario('plant_autocomplete', 'plant_autocomplete', params={'q': 'roślina 00'}),
+    Scenario('garden_autocomplete', 'garden_autocomplete', params={'q': 'd'}),
+    Scenario('add_plant_to_garden', 'add_plant_to_garden', lambda data: {'garden_id': data.big_garden.id}),
+    Scenario('edit_plant_in_garden', 'edit_plant_in_garden', lambda data: {'plant_garden_id': data.planting.id}),
+    Scenario('delete_plant_from_garden', 'delete_plant_from_garden',
+             lambda data: {'plant_garden_id': data.planting.id}),
+    Scenario('monthly_tasks[small]', 'monthly_tasks', lambda data: {'garden_id': data.small_garden.id}),
+    Scenario('monthly_tasks[big]', 'monthly_tasks', lambda data: {'garden_id': data.big_garden.id}, {'month': 5}),
+    Scenario('add_comment', 'add_comment', lambda data: {'plant_id': data.busy_plant.id}),
+    Scenario('dashboard', 'dashboard'),
+    Scenario('garden_export', 'garden_export', lambda data: {'garden_id': data.big_garden.id, 'dataset': 'tasks'}),
+    Scenario('add_plant_photo', 'add_plant_photo', lambda data: {'plant_id': data.busy_plant.id}),
+    Scenario('comments_list[busy]', 'comments_list', lambda data: {'plant_id': data.busy_plant.id}),
+    Scenario('comments_list[quiet]', 'comments_list', lambda data: {'plant_id': data.quiet_plant.id}),
+    Scenario('comments_feed', 'comments_feed', lambda data: {'plant_id': data.busy_plant.id}),
+    Scenario('cache_stats', 'cache_stats'),
+    Scenario('metrics', 'metrics'),
+    Scenario('api_plant_list', 'api_plant_list', params={'fields': 'name,watering_needs', 'limit': 100}),
+    Scenario('api_plant_detail', 'api_plant_detail', lambda data: {'pk': data.busy_plant.id}),
+    Scenario('api_garden_list', 'api_garden_list'),
+    Scenario('api_garden_detail', 'api_garden_detail', lambda data: {'pk': data.big_garden.id}),
+    Scenario('api_planting_list', 'api_planting_list', lambda data: {},
+             {'fields': 'plant_name,start_date', 'limit': 100}),
+    Scenario('api_planting_detail', 'api_planting_detail', lambda data: {'pk': data.planting.id}),
+    Scenario('api_task_list', 'api_task_list', params={'limit': 100}),
+    Scenario('api_task_detail', 'api_task_detail', lambda data: {'pk': data.task.id}),
+    Scenario('api_comment_list', 'api_comment_list', params={'limit': 100}),
+    Scenario('api_comment_detail', 'api_comment_detail', lambda data: {'pk': data.comment.id}),
+    Scenario('async_plants_list', 'async_plants_list'),
+    Scenario('async_plant_details', 'async_plant_details', lambda data: {'plant_id': data.busy_plant.id}),
+    Scenario('async_gardens_list', 'async_gardens_list'),
+    Scenario('async_garden_details', 'async_garden_details', lambda data: {'garden_id': data.big_garden.id}),
+    Scenario('async_monthly_tasks', 'async_monthly_tasks', lambda data: {'garden_id': data.big_garden.id}),
+    Scenario('async_comments_list', 'async_comments_list', lambda data: {'plant_id': data.busy_plant.id}),
+    # Last, logging out ends the session of the client
+    Scenario('logout', 'logout'),
+]
+
+
+def request(client, url, params):
+    """
+    Send the request and read the whole body, streamed responses included.
+    """
+    response = client.get(url, params)
+    if response.streaming:
+        b''.join(response.streaming_content)
+    assert response.status_code in (200, 302), f"{url} returned {response.status_code}"
+    return response
+
+
+def measure(data, scenario):
+    """
+    Return {'queries', 'seconds', 'peak_kb'} of the scenario requested with an empty cache.
+    """
+    client = Client()
+    url = reverse(scenario.url_name, kwargs=scenario.kwargs(data))
+
+    def run():
+        # Logged in again every time, the logout scenario ends the session
+        client.force_login(data.user)
+        cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            request(client, url, scenario.params)
+            elapsed = time.perf_counter() - started
+        return elapsed, len(captured)
+
+    # Warm up in-process indexes and imports, which are built once per process
+    run()
+    runs = [run() for _ in range(REPEAT)]
+
+    # Separate run, tracing allocations slows the request down
+    client.force_login(data.user)
+    cache.clear()
+    tracemalloc.start()
+    try:
+        request(client, url, scenario.params)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'queries': max(queries for _, queries in runs), 'seconds': round(min(seconds for seconds, _ in runs), 4),
+            'peak_kb': peak // 1024}
+
+
+def test_every_url_has_a_scenario():
+    """
+    Test if every named URL of the project (admin aside) is benchmarked.
+    """
+    names = {pattern.name for pattern in get_resolver().url_patterns if getattr(pattern, 'name', None)}
+    assert names - {scenario.url_name for scenario in SCENARIOS} == set()
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db
+@pytest.mark.parametrize('scenario', SCENARIOS, ids=lambda scenario: scenario.label)
+def test_view_within_budget(benchmark_data, benchmark_baseline, baseline_key, scenario):
+    """
+    Test if the view runs no more queries than its baseline, does not allocate much more and is not much slower.
+    """
+    result = measure(benchmark_data, scenario)
+    budgets = benchmark_baseline.setdefault(baseline_key, {})
+    if UPDATE_BASELINE:
+        budgets[scenario.label] = result
+        return
+
+    budget = budgets.get(scenario.label)
+    if budget is None:
+        # Failing rather than skipping, a database without baselines would otherwise check nothing
+        pytest.fail(f"No baseline for {baseline_key} {scenario.label} (measured {result}); "
+                    f"run with MY_GARDEN_BENCHMARK_UPDATE=1 to store it.")
+    assert result['queries'] <= budget['queries'], (
+        f"{scenario.label}: {result['queries']} queries, budget {budget['queries']}")
+    memory_limit = budget['peak_kb'] * MEMORY_TOLERANCE + MEMORY_SLACK_KB
+    assert result['peak_kb'] <= memory_limit, (
+        f"{scenario.label}: {result['peak_kb']} KB allocated, budget {memory_limit:.0f} KB")
+    if CHECK_LATENCY:
+        limit = budget['seconds'] * LATENCY_TOLERANCE + LATENCY_SLACK
+        assert result['seconds'] <= limit, f"{scenario.label}: {result['seconds']:.4f} s, budget {limit:.4f} s"
@@ -1,11 +1,17 @@
 import pytest
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import Client
 
 from my_garden_app.models import Plant, PlantMaintenance, Garden, PlantGarden
 from my_garden_app.views import AddCommentView
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
 @pytest.fixture
 def client():
     return Client()
@@ -66,6 +72,16 @@ def user():
     return User.objects.create_user(username='testuser', password='testpassword')
 
 
+@pytest.fixture
+def owner_client(client, garden, user):
+    """
+    Client logged in as the owner of the garden.
+    """
+    garden.user.add(user)
+    client.force_login(user)
+    return client
+
+
 @pytest.fixture
 def add_comment_view():
     return AddCommentView()
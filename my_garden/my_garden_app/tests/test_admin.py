@@ -0,0 +1,81 @@
+from unittest import mock
+
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from my_garden_app.models import Garden, MaintenanceMonthlySchedule, Plant, PlantGarden, PlantMaintenance
+from my_garden_app.pagination import EstimatedCountPaginator
+
+
+@pytest.fixture
+def admin_client(client):
+    client.force_login(User.objects.create_superuser(username='admin', password='adminpassword'))
+    return client
+
+
+def changelist_queries(admin_client, model_name, django_assert_max_num_queries):
+    """
+    Return the number of queries of the changelist of the model.
+    """
+    url = reverse(f'admin:my_garden_app_{model_name}_changelist')
+    with django_assert_max_num_queries(100) as captured:
+        assert admin_client.get(url).status_code == 200
+    return len(captured)
+
+
+@pytest.mark.django_db
+def test_changelists_do_not_query_per_row(admin_client, plants, garden, django_assert_max_num_queries):
+    """
+    Test if the changelists of plantings, tasks and schedule rows take the same number of queries for 3 and 30 rows.
+    """
+    def add_rows():
+        for plant in plants:
+            plant_garden = PlantGarden.objects.create(garden=garden, plant=plant, start_date='2024-01-01',
+                                                      location='Rabata')
+            task = PlantMaintenance.objects.create(plant=plant, task=1, task_description='Cięcie', week_of_month=1,
+                                                   month=3)
+            MaintenanceMonthlySchedule.objects.get_or_create(plant_garden=plant_garden, task=task, month=3,
+                                                             defaults={'completion_date': '2024-03-01'})
+
+    add_rows()
+    counts = {name: changelist_queries(admin_client, name, django_assert_max_num_queries)
+              for name in ('plantgarden', 'plantmaintenance', 'maintenancemonthlyschedule')}
+    for _ in range(9):
+        add_rows()
+    assert {name: changelist_queries(admin_client, name, django_assert_max_num_queries)
+            for name in counts} == counts
+
+
+@pytest.mark.django_db
+def test_plant_autocomplete_by_name_prefix(admin_client, plants):
+    """
+    Test if the plant autocomplete used by the planting form matches the beginning of the name in any case.
+    """
+    Plant.objects.filter(pk=plants[0].pk).update(name='Róża')
+    response = admin_client.get(reverse('admin:autocomplete'), {
+        'term': 'róż', 'app_label': 'my_garden_app', 'model_name': 'plantgarden', 'field_name': 'plant'})
+    assert [result['text'] for result in response.json()['results']] == ['Róża']
+
+
+@pytest.mark.django_db
+def test_maintenance_str_uses_label_cache(maintenance_data):
+    """
+    Test if a task is shown with the label of its choice and the name of its plant.
+    """
+    assert str(maintenance_data) == 'Przycinanie - test_plant1'
+
+
+@pytest.mark.django_db
+def test_estimated_count_paginator(plants, settings):
+    """
+    Test if the estimate is used only for unfiltered querysets of tables above the threshold.
+    """
+    settings.ESTIMATED_COUNT_THRESHOLD = 1000
+    with mock.patch('my_garden_app.pagination.estimated_row_count', return_value=5000):
+        assert EstimatedCountPaginator(Plant.objects.order_by('id'), 50).count == 5000
+        assert EstimatedCountPaginator(Plant.objects.filter(name='test_plant1').order_by('id'), 50).count == 1
+    with mock.patch('my_garden_app.pagination.estimated_row_count', return_value=10):
+        assert EstimatedCountPaginator(Plant.objects.order_by('id'), 50).count == 3
+    # SQLite has no estimates
+    assert EstimatedCountPaginator(Garden.objects.order_by('id'), 50).count == 0
@@ -0,0 +1,106 @@
+import pytest
+from django.urls import reverse
+
+from my_garden_app.models import Comments, PlantMaintenance
+
+
+@pytest.mark.django_db
+def test_api_plants_sparse_fieldset(client, plants, django_assert_num_queries):
+    """
+    Test if ?fields= limits both the JSON and the selected columns.
+    """
+    with django_assert_num_queries(1) as context:
+        response = client.get(reverse('api_plant_list'), {'fields': 'name,watering_needs'})
+
+    assert response.status_code == 200
+    results = response.json()['results']
+    assert results[0] == {'id': plants[0].id, 'name': plants[0].name, 'watering_needs': plants[0].watering_needs}
+    sql = context.captured_queries[0]['sql']
+    assert '"description"' not in sql and '"watering_needs"' in sql
+
+
+@pytest.mark.django_db
+def test_api_plants_unknown_field(client):
+    """
+    Test if unknown fields are rejected with 400 and the list of allowed fields.
+    """
+    response = client.get(reverse('api_plant_list'), {'fields': 'name,password'})
+
+    assert response.status_code == 400
+    assert 'name' in response.json()['fields']
+
+
+@pytest.mark.django_db
+def test_api_plants_cursor_pagination(client, plants):
+    """
+    Test if ?after= and ?limit= walk the whole list without repeating plants.
+    """
+    seen, after = [], None
+    while True:
+        params = {'limit': 1, 'fields': 'name'}
+        if after:
+            params['after'] = after
+        data = client.get(reverse('api_plant_list'), params).json()
+        seen.extend(result['id'] for result in data['results'])
+        after = data['next_after']
+        if after is None:
+            break
+
+    assert seen == sorted(plant.id for plant in plants)
+
+
+@pytest.mark.django_db
+def test_api_etag_not_modified(client, plant):
+    """
+    Test if a matching If-None-Match returns 304 and a changed plant a new ETag.
+    """
+    url = reverse('api_plant_detail', kwargs={'pk': plant.id})
+    response = client.get(url)
+    etag = response['ETag']
+    assert response.json()['name'] == plant.name
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response.content == b''
+
+    plant.name = 'Nowa nazwa'
+    plant.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+
+
+@pytest.mark.django_db
+def test_api_tasks_and_comments_filters(client, user, plant):
+    """
+    Test if tasks and comments can be filtered by plant and comments include the author.
+    """
+    task = PlantMaintenance.objects.create(plant=plant, task=1, task_description='Cięcie', week_of_month=2, month=3)
+    Comments.objects.create(plant=plant, user=user, comment='Pięknie kwitnie')
+
+    tasks = client.get(reverse('api_task_list'), {'plant': plant.id}).json()['results']
+    assert tasks == [{'id': task.id, 'plant': plant.id, 'task': 1, 'task_description': 'Cięcie',
+                      'week_of_month': 2, 'month': 3}]
+    assert client.get(reverse('api_task_list'), {'plant': plant.id + 1}).json()['results'] == []
+    assert client.get(reverse('api_task_list'), {'plant': 'x'}).status_code == 400
+
+    comments = client.get(reverse('api_comment_list'), {'plant': plant.id, 'fields': 'comment,user'}).json()
+    assert comments['results'][0]['user'] == 'testuser'
+
+
+@pytest.mark.django_db
+def test_api_gardens_of_user(client, user, garden, plant_garden):
+    """
+    Test if gardens and plantings require login and list only the user's gardens.
+    """
+    assert client.get(reverse('api_garden_list')).status_code == 401
+
+    client.force_login(user)
+    assert client.get(reverse('api_garden_list')).json()['results'] == []
+    assert client.get(reverse('api_planting_detail', kwargs={'pk': plant_garden.id})).status_code == 404
+
+    garden.user.add(user)
+    assert client.get(reverse('api_garden_list')).json()['results'] == [{'id': garden.id, 'name': garden.name}]
+    planting = client.get(reverse('api_planting_detail', kwargs={'pk': plant_garden.id}),
+                          {'fields': 'plant_name,start_date'}).json()
+    assert planting == {'id': plant_garden.id, 'plant_name': 'test_plant1', 'start_date': '2024-01-01'}
@@ -0,0 +1,127 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from my_garden_app.models import Comments, PlantGarden, PlantMaintenance
+
+
+@pytest.mark.django_db
+def test_async_plants_list_view(client, plants):
+    """
+    Test if the async plant list renders the same page as the sync one, with page numbers and ?after=.
+    """
+    response = client.get(reverse('async_plants_list'))
+
+    assert response.status_code == 200
+    assert list(response.context['object_list']) == plants
+    assert response.context['page_obj'].paginator.count == 3
+    assert response.content == client.get(reverse('plants_list')).content
+
+    response = client.get(reverse('async_plants_list'), {'after': plants[0].id})
+    assert list(response.context['object_list']) == plants[1:]
+    assert response.context['next_after'] is None
+
+
+@pytest.mark.django_db
+def test_async_plant_detail_view(client, plant):
+    """
+    Test if the async plant detail shows the plant and returns 404 for unknown plants.
+    """
+    response = client.get(reverse('async_plant_details', kwargs={'plant_id': plant.id}))
+
+    assert response.status_code == 200
+    assert response.context['plant'] == plant
+    assert client.get(reverse('async_plant_details', kwargs={'plant_id': plant.id + 1})).status_code == 404
+
+
+@pytest.mark.django_db
+def test_async_gardens_list_view(client, user, garden):
+    """
+    Test if the async garden list requires login and shows the gardens of the user with their name.
+    """
+    url = reverse('async_gardens_list')
+    assert client.get(url).status_code == 302
+
+    garden.user.add(user)
+    client.force_login(user)
+    response = client.get(url)
+    assert list(response.context['object_list']) == [garden]
+    assert 'Aktualnie zalogowany użytkownik to testuser' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_async_garden_detail_and_monthly_tasks(owner_client, garden, plant, plant_garden):
+    """
+    Test if the async garden page and calendar group plantings and rows like the sync views.
+    """
+    PlantGarden.objects.create(garden=garden, plant=plant, start_date='2024-02-01', location='Taras')
+    PlantMaintenance.objects.create(plant=plant, task=1, task_description='Cięcie', week_of_month=2, month=3)
+    PlantMaintenance.objects.create(plant=plant, task=2, task_description='Nawóz', week_of_month=1, month=5)
+
+    response = owner_client.get(reverse('async_garden_details', kwargs={'garden_id': garden.id}))
+    assert [len(group['plantings']) for group in response.context['plant_groups']] == [2]
+
+    url_kwargs = {'garden_id': garden.id}
+    sync_rows = list(owner_client.get(reverse('monthly_tasks', kwargs=url_kwargs), {'month': 3}).context['tasks'])
+    async_rows = list(owner_client.get(reverse('async_monthly_tasks', kwargs=url_kwargs), {'month': 3}).context['tasks'])
+    assert async_rows == sync_rows
+    assert len(async_rows) == 2
+
+
+
+@pytest.mark.django_db
+def test_async_garden_views_require_owner(client, user, garden):
+    """
+    Test if the async garden views redirect anonymous users and hide gardens of other users.
+    """
+    url = reverse('async_garden_details', kwargs={'garden_id': garden.id})
+    assert client.get(url).status_code == 302
+    client.force_login(user)
+    assert client.get(url).status_code == 404
+    assert client.get(reverse('async_monthly_tasks', kwargs={'garden_id': garden.id})).status_code == 404
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_name', ['async_garden_details', 'async_monthly_tasks'])
+def test_async_garden_views_hide_missing_gardens(client, garden, url_name):
+    """
+    Test if anonymous users are sent to login for missing gardens too, so they cannot tell which gardens exist.
+    """
+    existing = client.get(reverse(url_name, kwargs={'garden_id': garden.id}))
+    missing = client.get(reverse(url_name, kwargs={'garden_id': garden.id + 1000}))
+    assert existing.status_code == missing.status_code == 302
+
+
+@pytest.mark.django_db
+def test_async_comments_list_view(client, user, plant):
+    """
+    Test if the async comments list pages by cursor, newest first.
+    """
+    for number in range(25):
+        Comments.objects.create(plant=plant, user=user, comment=f'Komentarz {number}')
+
+    response = client.get(reverse('async_comments_list', kwargs={'plant_id': plant.id}))
+    assert len(response.context['object_list']) == 20
+    response = client.get(reverse('async_comments_list', kwargs={'plant_id': plant.id}),
+                          {'cursor': response.context['next_cursor']})
+    assert [comment.comment for comment in response.context['object_list']][-1] == 'Komentarz 0'
+    assert response.context['next_cursor'] is None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_views_command(user, garden, plant):
+    """
+    Test if the benchmark reports sync and async throughput of every view.
+    """
+    garden.user.add(user)
+    stdout = io.StringIO()
+
+    call_command('benchmark_views', '--requests', '2', '--concurrency', '1', '--username', user.username,
+                 stdout=stdout)
+
+    output = stdout.getvalue()
+    for label in ('plants_list', 'plant_details', 'garden_details', 'monthly_tasks', 'comments_list',
+                  'gardens_list'):
+        assert label in output
@@ -0,0 +1,88 @@
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+
+from my_garden_app.autocomplete import VERSION_KEY, PrefixIndex, search_plant_names
+from my_garden_app.models import Garden, Plant
+
+
+def test_prefix_index_matches_names_and_words():
+    """
+    Test if the index finds plants by the beginning of the name or of any word, whole-name matches first.
+    """
+    index = PrefixIndex([(1, 'Róża damasceńska'), (2, 'Damascenka'), (3, 'Bez czarny'), (4, 'Róża pnąca')])
+
+    assert index.search('róż', 10) == [(1, 'Róża damasceńska'), (4, 'Róża pnąca')]
+    assert index.search('DAMAS', 10) == [(2, 'Damascenka'), (1, 'Róża damasceńska')]
+    assert index.search('róża p', 10) == [(4, 'Róża pnąca')]
+    assert index.search('róż', 1) == [(1, 'Róża damasceńska')]
+    assert index.search('  ', 10) == []
+    assert index.search('xyz', 10) == []
+
+
+@pytest.mark.django_db
+def test_plant_autocomplete_view(client, plants, django_assert_num_queries):
+    """
+    Test if plant suggestions come from the index, which is rebuilt after a plant is renamed.
+    """
+    url = reverse('plant_autocomplete')
+    assert client.get(url, {'q': 'test_plant'}).json()['results'][0] == {'id': plants[0].id, 'text': 'test_plant1'}
+
+    with django_assert_num_queries(0):
+        response = client.get(url, {'q': 'test_plant3'})
+    assert response.json() == {'results': [{'id': plants[2].id, 'text': 'test_plant3'}]}
+
+    plants[2].name = 'Glicynia'
+    plants[2].save()
+    assert client.get(url, {'q': 'gli'}).json() == {'results': [{'id': plants[2].id, 'text': 'Glicynia'}]}
+
+
+@pytest.mark.django_db
+def test_plant_index_follows_other_processes(plants, settings):
+    """
+    Test if the index is rebuilt when another process bumped the shared version, or when it got too old.
+    """
+    assert search_plant_names('test_plant3') == [(plants[2].id, 'test_plant3')]
+
+    # Renamed by another worker process: no signal here, only its version bump in the shared cache
+    Plant.objects.filter(pk=plants[2].pk).update(name='Glicynia')
+    assert search_plant_names('gli') == []
+    cache.incr(VERSION_KEY)
+    assert search_plant_names('gli') == [(plants[2].id, 'Glicynia')]
+
+    # With a process-local cache the bump is not seen at all, the age bound catches up
+    Plant.objects.filter(pk=plants[2].pk).update(name='Magnolia')
+    settings.PLANT_AUTOCOMPLETE_MAX_AGE = 0
+    assert search_plant_names('mag') == [(plants[2].id, 'Magnolia')]
+
+
+@pytest.mark.django_db
+def test_garden_autocomplete_view_lists_own_gardens(owner_client, garden):
+    """
+    Test if garden suggestions include only gardens of the logged-in user.
+    """
+    other_user = User.objects.create_user(username='other', password='testpassword')
+    Garden.objects.create(name='Test Cudzy').user.add(other_user)
+
+    response = owner_client.get(reverse('garden_autocomplete'), {'q': 'test'})
+    assert response.json() == {'results': [{'id': garden.id, 'text': 'Test Garden'}]}
+
+
+@pytest.mark.django_db
+def test_forms_render_widget_instead_of_options(client, user, plants):
+    """
+    Test if the maintenance form renders no option per plant, only the label of the chosen plant.
+    """
+    client.force_login(user)
+    response = client.get(reverse('add_maintenance'))
+    content = response.content.decode()
+    assert '<option' not in content.split('name="task"')[0]
+    assert reverse('plant_autocomplete') in content
+    assert 'js/autocomplete.js' in content
+
+    response = client.post(reverse('add_maintenance'), {'plant': plants[1].id, 'task': 1, 'task_description': '',
+                                                        'week_of_month': 1, 'month': 3})
+    assert response.status_code == 200
+    assert 'value="test_plant2"' in response.content.decode()
+    assert not Plant.objects.filter(plantmaintenance__isnull=False).exists()
@@ -0,0 +1,145 @@
+import datetime
+from unittest import mock
+
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
+
+from my_garden_app.dashboard import dashboard_timeout, due_tasks, get_dashboard, next_week_start, week_of_month
+from my_garden_app.models import Garden, PlantGarden, PlantMaintenance
+
+TODAY = datetime.date(2024, 3, 10)
+
+
+@pytest.mark.parametrize('day, week, next_start', [
+    (datetime.date(2024, 3, 1), 1, datetime.date(2024, 3, 8)),
+    (datetime.date(2024, 3, 10), 2, datetime.date(2024, 3, 15)),
+    (datetime.date(2024, 3, 28), 4, datetime.date(2024, 3, 29)),
+    (datetime.date(2024, 3, 31), 5, datetime.date(2024, 4, 1)),
+    (datetime.date(2023, 2, 28), 4, datetime.date(2023, 3, 1)),
+    (datetime.date(2024, 12, 30), 5, datetime.date(2025, 1, 1)),
+])
+def test_week_boundaries(day, week, next_start):
+    """
+    Test if weeks of the month start on the 1st, 8th, 15th, 22nd and 29th.
+    """
+    assert week_of_month(day) == week
+    assert next_week_start(day) == next_start
+
+
+@pytest.mark.django_db
+def test_due_tasks_grouped_by_garden_in_one_query(user, garden, plants, django_assert_num_queries):
+    """
+    Test if overdue tasks, tasks of this week, any week and later weeks of this month come from one query,
+    per garden.
+    """
+    other = Garden.objects.create(name='A-ogród')
+    garden.user.add(user)
+    other.user.add(user)
+    foreign = Garden.objects.create(name='Cudzy ogród')
+    PlantGarden.objects.create(garden=garden, plant=plants[0], start_date='2024-01-01', location='Rabata')
+    PlantGarden.objects.create(garden=other, plant=plants[1], start_date='2024-01-01', location='Taras')
+    PlantGarden.objects.create(garden=foreign, plant=plants[0], start_date='2024-01-01', location='Płot')
+    for week in (1, 2, 4, 6):
+        PlantMaintenance.objects.create(plant=plants[0], task=1, task_description='Cięcie', week_of_month=week, month=3)
+    PlantMaintenance.objects.create(plant=plants[0], task=2, task_description='Nawóz', week_of_month=2, month=4)
+    PlantMaintenance.objects.create(plant=plants[1], task=2, task_description='Nawóz', week_of_month=3, month=3)
+
+    with django_assert_num_queries(1):
+        gardens = due_tasks(user.pk, TODAY)
+
+    assert [item['garden_name'] for item in gardens] == ['A-ogród', 'Test Garden']
+    assert gardens[0]['this_week'] == [] and gardens[0]['overdue'] == []
+    assert [task.week_of_month for task in gardens[0]['later']] == [3]
+    assert [task.week_of_month for task in gardens[1]['this_week']] == [2, 6]
+    assert [task.week_of_month for task in gardens[1]['later']] == [4]
+    assert [task.week_of_month for task in gardens[1]['overdue']] == [1]
+    assert gardens[1]['this_week'][0].location == 'Rabata'
+
+
+@pytest.mark.django_db
+def test_dashboard_view_cached_until_change(owner_client, garden, plant, django_assert_num_queries):
+    """
+    Test if the dashboard is served from the cache and rebuilt after the tasks of a planted plant change.
+    """
+    PlantGarden.objects.create(garden=garden, plant=plant, start_date='2024-01-01', location='Rabata')
+    url = reverse('dashboard')
+
+    with mock.patch('django.utils.timezone.localdate', return_value=TODAY):
+        response = owner_client.get(url)
+        assert response.status_code == 200
+        assert 'Brak zadań w tym miesiącu.' in response.content.decode()
+
+        # Session and user only
+        with django_assert_num_queries(2):
+            owner_client.get(url)
+
+        PlantMaintenance.objects.create(plant=plant, task=1, task_description='Cięcie', week_of_month=2, month=3)
+        response = owner_client.get(url)
+    assert [task.task_label for task in response.context['gardens'][0]['this_week']] == ['Przycinanie']
+
+
+@pytest.mark.django_db
+def test_dashboard_view_requires_login(client):
+    """
+    Test if anonymous users are redirected to the login page.
+    """
+    assert client.get(reverse('dashboard')).status_code == 302
+
+
+@pytest.mark.django_db
+def test_dashboard_shows_overdue_tasks(owner_client, garden, plant):
+    """
+    Test if a task of an earlier week of this month is listed as overdue instead of disappearing.
+    """
+    PlantGarden.objects.create(garden=garden, plant=plant, start_date='2024-01-01', location='Rabata')
+    PlantMaintenance.objects.create(plant=plant, task=2, task_description='Nawóz', week_of_month=1, month=3)
+
+    with mock.patch('django.utils.timezone.localdate', return_value=TODAY):
+        response = owner_client.get(reverse('dashboard'))
+    assert [task.task_label for task in response.context['gardens'][0]['overdue']] == ['Nawożenie']
+    assert 'Zaległe' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_changes_invalidate_only_owners_dashboards(user, garden, plants, django_assert_num_queries):
+    """
+    Test if a change in a garden drops the dashboards of its owners and keeps those of other users.
+    """
+    other_user = User.objects.create_user(username='other', password='testpassword')
+    other_garden = Garden.objects.create(name='Cudzy ogród')
+    garden.user.add(user)
+    other_garden.user.add(other_user)
+    PlantGarden.objects.create(garden=garden, plant=plants[0], start_date='2024-01-01', location='Rabata')
+    planting = PlantGarden.objects.create(garden=other_garden, plant=plants[1], start_date='2024-01-01',
+                                          location='Taras')
+
+    with mock.patch('django.utils.timezone.localdate', return_value=TODAY):
+        get_dashboard(user.pk)
+        get_dashboard(other_user.pk)
+        PlantMaintenance.objects.create(plant=plants[0], task=1, task_description='Cięcie', week_of_month=2, month=3)
+        assert get_dashboard(user.pk)[0]['this_week']
+        with django_assert_num_queries(0):
+            assert get_dashboard(other_user.pk) == []
+
+        # A planting moved to another garden - the owners of both gardens see the change
+        PlantMaintenance.objects.create(plant=plants[1], task=1, task_description='Cięcie', week_of_month=2, month=3)
+        get_dashboard(user.pk)
+        planting.garden = garden
+        planting.save()
+        assert get_dashboard(other_user.pk) == []
+        assert len(get_dashboard(user.pk)[0]['this_week']) == 2
+
+
+@pytest.mark.django_db
+def test_dashboard_timeout_short_with_process_local_cache(settings):
+    """
+    Test if dashboards are kept only briefly in a per-process cache and until the week ends in a shared one.
+    """
+    now = timezone.make_aware(datetime.datetime(2024, 3, 10, 12, 0))
+    with mock.patch('django.utils.timezone.now', return_value=now):
+        assert dashboard_timeout(TODAY) == settings.DASHBOARD_LOCAL_CACHE_TIMEOUT
+        with mock.patch('my_garden_app.cache_versions.PROCESS_LOCAL_CACHES', ()):
+            # Until March 15th, 0:00
+            assert dashboard_timeout(TODAY) == 4 * 86400 + 12 * 3600
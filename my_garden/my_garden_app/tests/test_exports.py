@@ -0,0 +1,133 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+
+from my_garden_app.exports import async_chunks
+from my_garden_app.models import PlantMaintenance, MaintenanceMonthlySchedule
+
+
+def content(response):
+    return b''.join(response.streaming_content)
+
+
+@pytest.mark.django_db
+def test_export_plantings_csv(client, user, garden, plant_garden):
+    """
+    Test if the plantings of the user's garden are streamed as CSV.
+    """
+    garden.user.add(user)
+    client.force_login(user)
+
+    response = client.get(reverse('garden_export', kwargs={'garden_id': garden.id, 'dataset': 'plantings'}))
+
+    assert response.status_code == 200
+    assert response.streaming
+    assert response['Content-Type'] == 'text/csv; charset=utf-8'
+    assert f'garden-{garden.id}-plantings.csv' in response['Content-Disposition']
+    rows = list(csv.DictReader(io.StringIO(content(response).decode('utf-8'))))
+    assert rows == [{'id': str(plant_garden.id), 'plant': 'test_plant1', 'start_date': '2024-01-01',
+                     'location': 'Test Location'}]
+
+
+@pytest.mark.django_db
+def test_export_schedule_jsonl_gzip(client, user, garden, plant, plant_garden, django_capture_on_commit_callbacks):
+    """
+    Test if the schedule is streamed as gzip-compressed JSON Lines with labels of the choices.
+    """
+    garden.user.add(user)
+    client.force_login(user)
+    with django_capture_on_commit_callbacks(execute=True):
+        PlantMaintenance.objects.create(plant=plant, task=1, task_description='Cięcie', week_of_month=2, month=3)
+    assert MaintenanceMonthlySchedule.objects.count() == 1
+
+    response = client.get(reverse('garden_export', kwargs={'garden_id': garden.id, 'dataset': 'schedule'}),
+                          {'format': 'jsonl', 'gzip': '1'})
+
+    assert response['Content-Type'] == 'application/gzip'
+    lines = gzip.decompress(content(response)).decode('utf-8').splitlines()
+    row = json.loads(lines[0])
+    assert len(lines) == 1
+    assert (row['plant'], row['task'], row['month'], row['status']) == (
+        'test_plant1', 'Przycinanie', 'Marzec', 'Nie rozpoczęto')
+
+
+@pytest.mark.django_db
+def test_export_tasks_match_import_format(client, user, garden, plant, plant_garden):
+    """
+    Test if exported tasks use the columns and labels accepted by the import_maintenance command.
+    """
+    garden.user.add(user)
+    client.force_login(user)
+    PlantMaintenance.objects.create(plant=plant, task=2, task_description='Nawóz', week_of_month=6, month=5)
+
+    response = client.get(reverse('garden_export', kwargs={'garden_id': garden.id, 'dataset': 'tasks'}))
+
+    rows = list(csv.DictReader(io.StringIO(content(response).decode('utf-8'))))
+    assert [(r['plant'], r['task'], r['week_of_month'], r['month']) for r in rows] == [
+        ('test_plant1', 'Nawożenie', 'Brak', 'Maj')]
+
+
+@pytest.mark.django_db
+def test_export_requires_owner(client, user, garden):
+    """
+    Test if anonymous users are redirected to login and other users' gardens are not exported.
+    """
+    url = reverse('garden_export', kwargs={'garden_id': garden.id, 'dataset': 'plantings'})
+    assert client.get(url).status_code == 302
+
+    client.force_login(user)
+    assert client.get(url).status_code == 404
+    garden.user.add(user)
+    assert client.get(url, {'format': 'xml'}).status_code == 404
+    assert client.get(reverse('garden_export', kwargs={'garden_id': garden.id, 'dataset': 'users'})).status_code == 404
+
+
+@pytest.mark.django_db
+def test_export_streams_under_asgi(user, garden, plant_garden):
+    """
+    Test if under ASGI the export is an async stream, which Django does not read into a list before sending.
+    """
+    garden.user.add(user)
+    url = reverse('garden_export', kwargs={'garden_id': garden.id, 'dataset': 'plantings'})
+
+    client = AsyncClient()
+    client.force_login(user)
+
+    async def export():
+        response = await client.get(url)
+        return response, b''.join([chunk async for chunk in response.streaming_content])
+
+    response, body = async_to_sync(export)()
+    assert response.is_async
+    rows = list(csv.DictReader(io.StringIO(body.decode('utf-8'))))
+    assert [row['id'] for row in rows] == [str(plant_garden.id)]
+
+
+def test_async_chunks_reads_one_chunk_at_a_time():
+    """
+    Test if the async stream advances the sync one only as far as it was read and closes it when left early.
+    """
+    pulled = []
+
+    def chunks():
+        for number in range(3):
+            pulled.append(number)
+            yield b'%d' % number
+
+    source = chunks()
+
+    async def read_first():
+        stream = async_chunks(source)
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first
+
+    assert async_to_sync(read_first)() == b'0'
+    assert pulled == [0]
+    assert next(source, None) is None
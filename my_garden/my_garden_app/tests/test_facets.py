@@ -0,0 +1,83 @@
+import pytest
+from django.urls import reverse
+
+from my_garden_app.attribute_index import PlantAttributeIndex, get_attribute_index, invalidate_attribute_index
+from my_garden_app.facets import FACET_FIELDS, facet_counts, filter_plants
+from my_garden_app.models import Plant
+
+
+@pytest.fixture
+def catalogue():
+    """
+    Six plants with different sunlight and watering needs.
+    """
+    attributes = [(1, 1), (1, 2), (1, 2), (2, 2), (3, 3), (3, 1)]
+    return Plant.objects.bulk_create([
+        Plant(name=f'plant{i}', description='', max_height=1, spread=1, flowering_season=1 + i % 4,
+              sunlight_exposure=sunlight, pruning_frequency=1, watering_needs=watering, fertilization=1,
+              pest_disease_resistance=1)
+        for i, (sunlight, watering) in enumerate(attributes)
+    ])
+
+
+@pytest.mark.django_db
+def test_plant_facet_view_combines_filters(client, catalogue, settings, django_assert_num_queries):
+    """
+    Test if the facet view ORs values of one facet, ANDs facets and counts all facets in one aggregate query.
+    """
+    settings.PLANT_ATTRIBUTE_INDEX = False
+    url = reverse('plants_filter')
+    # One aggregate query for the counts and one for the page of results
+    with django_assert_num_queries(2):
+        response = client.get(url, {'sunlight_exposure': [1, 3], 'watering_needs': [2, 1], 'spread': 'x'})
+    assert response.status_code == 200
+    data = response.json()
+
+    assert data['filters'] == {'sunlight_exposure': [1, 3], 'watering_needs': [1, 2]}
+    assert data['count'] == 4
+    assert [plant['name'] for plant in data['results']] == ['plant0', 'plant1', 'plant2', 'plant5']
+    assert data['next_after'] is None
+
+    watering = {facet['value']: facet['count'] for facet in data['facets']['watering_needs']}
+    assert watering == {1: 2, 2: 2, 3: 0}
+    sunlight = data['facets']['sunlight_exposure'][0]
+    assert sunlight == {'value': 1, 'label': 'Pełne słońce', 'count': 3}
+
+
+@pytest.mark.django_db
+def test_attribute_index_matches_database(catalogue):
+    """
+    Test if bitmap filtering, counts and pages agree with the database queries.
+    """
+    rows = Plant.objects.order_by('id').values_list('id', 'name', *FACET_FIELDS)
+    index = PlantAttributeIndex(rows)
+    for filters in ({}, {'sunlight_exposure': [1]}, {'sunlight_exposure': [1, 3], 'watering_needs': [2, 1]},
+                    {'flowering_season': [2], 'watering_needs': [3]}):
+        matches = index.match(filters)
+        assert index.facet_counts(matches) == facet_counts(filter_plants(filters))
+        expected = list(filter_plants(filters).order_by('id').values_list('id', 'name'))
+        assert index.page(matches, 0, 100) == (expected, None)
+
+    matches = index.match({'sunlight_exposure': [1]})
+    first_page, next_after = index.page(matches, 0, 2)
+    assert first_page == [(catalogue[0].id, 'plant0'), (catalogue[1].id, 'plant1')]
+    assert index.page(matches, next_after, 2) == ([(catalogue[2].id, 'plant2')], None)
+
+
+@pytest.mark.django_db
+def test_plant_facet_view_uses_attribute_index(client, catalogue, django_assert_num_queries):
+    """
+    Test if the facet view answers from the index without queries and sees plant changes.
+    """
+    url = reverse('plants_filter')
+    # bulk_create sends no signals, so drop an index possibly built by an earlier test
+    invalidate_attribute_index()
+    get_attribute_index()
+    with django_assert_num_queries(0):
+        response = client.get(url, {'watering_needs': 3})
+    assert [plant['name'] for plant in response.json()['results']] == ['plant4']
+
+    catalogue[0].watering_needs = 3
+    catalogue[0].save()
+    response = client.get(url, {'watering_needs': 3})
+    assert response.json()['count'] == 2
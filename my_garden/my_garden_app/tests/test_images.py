@@ -0,0 +1,84 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+
+from my_garden_app import images
+
+
+@pytest.fixture
+def responsive_root(settings, tmp_path):
+    settings.RESPONSIVE_IMAGES_ROOT = tmp_path
+    settings.RESPONSIVE_IMAGES_URL = '/static/images/responsive/'
+    return tmp_path
+
+
+def test_responsive_image_without_manifest(responsive_root):
+    """
+    Test if images without generated variants are left as they are.
+    """
+    item = {'image': 'images/azalia.jpg', 'alt': 'Azalia'}
+    assert images.responsive_image(item) == item
+
+
+def test_responsive_image_from_manifest(responsive_root):
+    """
+    Test if the manifest turns into JPEG and WebP srcsets with the largest JPEG as the fallback.
+    """
+    (responsive_root / 'manifest.json').write_text(json.dumps({'images/azalia.jpg': {
+        'digest': 'abc', 'widths': [480, 960],
+        'variants': [
+            {'width': 480, 'format': 'webp', 'name': 'azalia.480.aaa.webp'},
+            {'width': 480, 'format': 'jpg', 'name': 'azalia.480.bbb.jpg'},
+            {'width': 960, 'format': 'webp', 'name': 'azalia.960.ccc.webp'},
+            {'width': 960, 'format': 'jpg', 'name': 'azalia.960.ddd.jpg'},
+        ],
+    }}))
+
+    item = images.responsive_image({'image': 'images/azalia.jpg', 'alt': 'Azalia'})
+
+    assert item['src'] == '/static/images/responsive/azalia.960.ddd.jpg'
+    assert item['srcset'] == ('/static/images/responsive/azalia.480.bbb.jpg 480w, '
+                              '/static/images/responsive/azalia.960.ddd.jpg 960w')
+    assert item['webp_srcset'].startswith('/static/images/responsive/azalia.480.aaa.webp 480w')
+
+
+def test_build_responsive_images_requires_pillow(monkeypatch):
+    """
+    Test if the command explains that Pillow is missing instead of failing with ImportError.
+    """
+    monkeypatch.setattr(images, 'Image', None)
+    with pytest.raises(CommandError):
+        call_command('build_responsive_images')
+
+
+@pytest.mark.django_db
+def test_build_responsive_images(responsive_root, tmp_path, settings, client):
+    """
+    Test if the command writes hashed variants no wider than the image, skips unchanged images and feeds the carousel.
+    """
+    Image = pytest.importorskip('PIL.Image')
+    source_dir = tmp_path / 'source'
+    (source_dir / 'images').mkdir(parents=True)
+    Image.new('RGB', (1200, 800), (40, 120, 60)).save(source_dir / 'images' / 'azalia.jpg')
+    settings.STATICFILES_DIRS = [source_dir]
+    settings.RESPONSIVE_IMAGES_ROOT = responsive_root / 'out'
+
+    call_command('build_responsive_images', 'images/azalia.jpg', '--widths', '480', '1600', '--workers', '1',
+                 stdout=io.StringIO())
+
+    manifest = json.loads((responsive_root / 'out' / 'manifest.json').read_text())
+    variants = manifest['images/azalia.jpg']['variants']
+    assert sorted((variant['width'], variant['format']) for variant in variants) == [
+        (480, 'jpg'), (480, 'webp'), (1200, 'jpg'), (1200, 'webp')]
+    assert all((responsive_root / 'out' / variant['name']).exists() for variant in variants)
+
+    stdout = io.StringIO()
+    call_command('build_responsive_images', 'images/azalia.jpg', '--widths', '480', '1600', stdout=stdout)
+    assert 'images/azalia.jpg: bez zmian' in stdout.getvalue()
+
+    carousel = client.get(reverse('home')).context['carousel_items']
+    assert '480w' in carousel[0]['webp_srcset']
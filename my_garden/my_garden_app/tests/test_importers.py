@@ -0,0 +1,183 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from my_garden_app.importers import import_maintenance, import_plants, read_rows
+from my_garden_app.models import MaintenanceMonthlySchedule, Plant, PlantMaintenance
+from my_garden_app.plant_cache import get_maintenance_tasks
+
+CSV_DATA = (
+    "name,description,max_height,spread,flowering_season,sunlight_exposure,"
+    "pruning_frequency,watering_needs,fertilization,pest_disease_resistance\n"
+    "Lawenda,Pachnąca bylina,Niska,Kompaktowa,Lato,Pełne słońce,Regularne,Niskie,Okazjonalne,Odporny\n"
+    "Hosta,Shade perennial,medium,wide,summer,full shade,occasional,high,regular,susceptible\n"
+    "Bez nazwy,,Niska,Kompaktowa,Lato,Pełne słońce,Regularne,Niskie,Okazjonalne,Fioletowy\n"
+    "Piwonia,Duże kwiaty,2,2,1,1,2,2,1,1\n"
+)
+
+
+def plant_row(name, **overrides):
+    row = {
+        'name': name, 'description': 'Opis', 'max_height': 'Wysoka', 'spread': 'Szeroka',
+        'flowering_season': 'Wiosna', 'sunlight_exposure': 'Cień', 'pruning_frequency': 'Regularne',
+        'watering_needs': 'Wysokie', 'fertilization': 'Regularne', 'pest_disease_resistance': 'Odporny',
+    }
+    row.update(overrides)
+    return row
+
+
+@pytest.mark.django_db
+def test_import_plants_maps_polish_and_english_labels():
+    """
+    Test if CSV rows with Polish, English and numeric labels are imported and invalid rows rejected.
+    """
+    result = import_plants(read_rows(io.StringIO(CSV_DATA), 'csv'), batch_size=2)
+
+    assert result.created == 3
+    assert [line for line, _ in result.rejected] == [4]
+    assert set(result.rejected[0][1]) == {'description', 'pest_disease_resistance'}
+
+    hosta = Plant.objects.get(name='Hosta')
+    assert (hosta.max_height, hosta.spread, hosta.sunlight_exposure, hosta.watering_needs) == (2, 1, 3, 3)
+    lavender = Plant.objects.get(name='Lawenda')
+    assert (lavender.max_height, lavender.flowering_season, lavender.pest_disease_resistance) == (3, 2, 1)
+
+
+@pytest.mark.django_db
+def test_import_plants_batches_inserts(django_assert_num_queries):
+    """
+    Test if rows are inserted with one INSERT per batch, each batch in its own transaction.
+    """
+    rows = [(number, plant_row(f'Roślina {number}')) for number in range(1, 6)]
+    progress = []
+
+    # 3 batches x (SAVEPOINT + INSERT + RELEASE)
+    with django_assert_num_queries(9):
+        result = import_plants(rows, batch_size=2, progress=lambda r: progress.append(r.processed))
+
+    assert result.created == 5
+    assert progress == [2, 4, 5]
+    assert Plant.objects.count() == 5
+
+
+@pytest.mark.django_db
+def test_import_plants_dry_run_does_not_write():
+    """
+    Test if a dry run validates rows without inserting anything.
+    """
+    rows = [(1, plant_row('Lawenda')), (2, plant_row('Róża', watering_needs='Bardzo wysokie'))]
+
+    result = import_plants(rows, dry_run=True)
+
+    assert result.created == 1
+    assert result.rejected[0][0] == 2
+    assert not Plant.objects.exists()
+
+
+@pytest.mark.django_db
+def test_import_plants_command_jsonl(tmp_path):
+    """
+    Test if the command imports a JSON Lines file and reports rejected rows on stderr.
+    """
+    path = tmp_path / 'plants.jsonl'
+    path.write_text('\n'.join([
+        json.dumps(plant_row('Lawenda')),
+        '{niepoprawny json',
+        json.dumps(plant_row('Hosta', sunlight_exposure='partial shade')),
+    ]), encoding='utf-8')
+    stdout, stderr = io.StringIO(), io.StringIO()
+
+    call_command('import_plants', str(path), '--batch-size', '2', stdout=stdout, stderr=stderr)
+
+    assert set(Plant.objects.values_list('name', flat=True)) == {'Lawenda', 'Hosta'}
+    assert Plant.objects.get(name='Hosta').sunlight_exposure == 2
+    assert 'Wiersz 2 odrzucony' in stderr.getvalue()
+    assert 'Dodano 2 roślin, odrzucono 1 wierszy' in stdout.getvalue()
+    assert 'wierszy/s' in stdout.getvalue()
+
+
+def test_import_plants_command_unknown_format(tmp_path):
+    """
+    Test if the command refuses files of unknown format.
+    """
+    path = tmp_path / 'plants.txt'
+    path.write_text('')
+
+    with pytest.raises(CommandError):
+        call_command('import_plants', str(path))
+
+
+def task_row(plant, **overrides):
+    row = {'plant': plant, 'task': 'Przycinanie', 'task_description': 'Cięcie', 'week_of_month': 'Drugi',
+           'month': 'Marzec'}
+    row.update(overrides)
+    return row
+
+
+@pytest.mark.django_db
+def test_import_maintenance_resolves_names_and_skips_duplicates(plant, django_assert_num_queries):
+    """
+    Test if plant names are resolved with one query and existing or repeated tasks are skipped.
+    """
+    PlantMaintenance.objects.create(plant=plant, task=1, task_description='Stare', week_of_month=2, month=3)
+    Plant.objects.create(name='Bliźniak', description='1', max_height=1, spread=1, flowering_season=1,
+                         sunlight_exposure=1, pruning_frequency=1, watering_needs=1, fertilization=1,
+                         pest_disease_resistance=1)
+    Plant.objects.create(name='bliźniak', description='2', max_height=1, spread=1, flowering_season=1,
+                         sunlight_exposure=1, pruning_frequency=1, watering_needs=1, fertilization=1,
+                         pest_disease_resistance=1)
+    rows = [
+        (1, task_row(plant.name)),
+        (2, task_row(plant.name.upper(), task='fertilizing', week_of_month='first', month='May')),
+        (3, task_row(plant.name, task='2', week_of_month='1', month='5')),
+        (4, task_row('Nieznana')),
+        (5, task_row('Bliźniak')),
+    ]
+
+    # Name map and one duplicate lookup for the whole batch
+    with django_assert_num_queries(2):
+        result = import_maintenance(rows, dry_run=True)
+    result = import_maintenance(rows)
+
+    assert (result.created, result.skipped) == (1, 2)
+    assert [line for line, _ in result.rejected] == [4, 5]
+    assert 'pasuje do 2 roślin' in result.rejected[1][1]['plant'][0]
+    assert PlantMaintenance.objects.filter(plant=plant, task=2, week_of_month=1, month=5).count() == 1
+
+
+@pytest.mark.django_db
+def test_import_maintenance_updates_schedule_and_cache(plant, plant_garden):
+    """
+    Test if imported tasks land in the schedule of existing plantings and the plant page cache is refreshed.
+    """
+    assert get_maintenance_tasks(plant.id) == []
+
+    import_maintenance([(1, task_row(plant.name))])
+
+    task = PlantMaintenance.objects.get(plant=plant)
+    assert MaintenanceMonthlySchedule.objects.filter(plant_garden=plant_garden, task=task, month=3).exists()
+    assert get_maintenance_tasks(plant.id) == [task]
+
+
+@pytest.mark.django_db
+def test_import_maintenance_command_dry_run(plant, tmp_path):
+    """
+    Test if the dry run of the command prints the diff and writes nothing.
+    """
+    PlantMaintenance.objects.create(plant=plant, task=1, task_description='Stare', week_of_month=2, month=3)
+    path = tmp_path / 'tasks.csv'
+    path.write_text("plant,task,task_description,week_of_month,month\n"
+                    f"{plant.name},Przycinanie,Cięcie,Drugi,Marzec\n"
+                    f"{plant.name},Nawożenie,Nawóz,Pierwszy,Maj\n", encoding='utf-8')
+    stdout = io.StringIO()
+
+    call_command('import_maintenance', str(path), '--dry-run', stdout=stdout)
+
+    output = stdout.getvalue()
+    assert '= wiersz 2: Przycinanie, tydzień Drugi, Marzec' in output
+    assert '+ wiersz 3: Nawożenie, tydzień Pierwszy, Maj' in output
+    assert 'Do dodania 1 zadań, pominięto 1 istniejących' in output
+    assert PlantMaintenance.objects.count() == 1
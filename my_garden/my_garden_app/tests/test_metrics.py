@@ -0,0 +1,192 @@
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+from asgiref.sync import SyncToAsync, async_to_sync
+from django.contrib.auth.models import User
+from django.core.handlers.asgi import ASGIHandler
+from django.test import AsyncClient
+from django.urls import reverse
+
+from my_garden_app import metrics, plant_cache
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.registry.reset()
+    plant_cache.reset_cache_stats()
+
+
+def sample(exposition, line_start):
+    """
+    Return the value of the sample line starting with line_start.
+    """
+    for line in exposition.splitlines():
+        if line.startswith(line_start + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    raise AssertionError(f"{line_start} not in the exposition")
+
+
+@pytest.mark.django_db
+def test_requests_recorded_per_view(client, plant):
+    """
+    Test if latency, status, queries, template time and response size are recorded under the URL name.
+    """
+    url = reverse('plant_details', kwargs={'plant_id': plant.id})
+    response = client.get(url)
+    client.get(url)
+    client.get('/no_such_page/')
+
+    views = metrics.registry.snapshot()['views']
+    series = views['plant_details']
+    assert series['count'] == 2
+    assert sum(series['buckets']) == 2
+    assert series['statuses'] == {200: 2}
+    assert series['queries'] >= 2
+    assert series['db_seconds'] > 0
+    assert series['template_seconds'] > 0
+    assert series['response_bytes'] == 2 * len(response.content)
+    assert views[metrics.UNRESOLVED]['statuses'] == {404: 1}
+
+
+def test_middleware_not_adapted_under_asgi(caplog, settings):
+    """
+    Test if the ASGI handler calls the middleware asynchronously instead of adapting it through a worker thread.
+    """
+    # Django logs the adapted handlers only in debug mode
+    settings.DEBUG = True
+    with caplog.at_level(logging.DEBUG, logger='django.request'):
+        handler = ASGIHandler()
+    assert not [record for record in caplog.records if 'MetricsMiddleware' in record.getMessage()]
+    assert not isinstance(handler._middleware_chain, SyncToAsync)
+
+
+@pytest.mark.django_db
+def test_async_requests_recorded(plant):
+    """
+    Test if queries of async views, run by the async ORM in another thread, are recorded under the URL name.
+    """
+    async def request():
+        return await AsyncClient().get(reverse('async_plant_details', kwargs={'plant_id': plant.id}))
+
+    response = async_to_sync(request)()
+
+    series = metrics.registry.snapshot()['views']['async_plant_details']
+    assert series['statuses'] == {200: 1}
+    assert series['queries'] >= 2
+    assert series['template_seconds'] > 0
+    assert series['response_bytes'] == len(response.content)
+
+
+@pytest.mark.django_db
+def test_metrics_view_exposition(client, plant):
+    """
+    Test if /metrics renders cumulative histograms, counters and plant cache lookups, and is open only to staff.
+    """
+    client.get(reverse('plant_details', kwargs={'plant_id': plant.id}))
+    # Local addresses get no access, behind a reverse proxy every client would have one
+    assert client.get(reverse('metrics'), REMOTE_ADDR='127.0.0.1').status_code == 403
+
+    client.force_login(User.objects.create_user(username='staff', password='staffpassword', is_staff=True))
+    response = client.get(reverse('metrics'))
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    exposition = response.content.decode()
+
+    assert '# TYPE my_garden_request_duration_seconds histogram' in exposition
+    assert sample(exposition, 'my_garden_request_duration_seconds_bucket{view="plant_details",le="+Inf"}') == 1
+    assert sample(exposition, 'my_garden_request_duration_seconds_count{view="plant_details"}') == 1
+    assert sample(exposition, 'my_garden_requests_total{view="plant_details",status="200"}') == 1
+    assert sample(exposition, 'my_garden_db_queries_total{view="plant_details"}') >= 1
+    assert sample(exposition, 'my_garden_plant_cache_requests_total{cache="plant",result="misses"}') == 1
+
+
+@pytest.mark.django_db
+def test_streaming_response_size(owner_client, garden, plant_garden):
+    """
+    Test if the size of a streamed export is added once the body has been read.
+    """
+    response = owner_client.get(reverse('garden_export', kwargs={'garden_id': garden.id, 'dataset': 'plantings'}))
+    body = b''.join(response.streaming_content)
+    assert metrics.registry.snapshot()['views']['garden_export']['response_bytes'] == len(body)
+
+
+@pytest.mark.django_db
+def test_metrics_bearer_token(client, settings):
+    """
+    Test if scrapers get in with the configured bearer token only, and not at all without one configured.
+    """
+    url = reverse('metrics')
+    assert client.get(url, HTTP_AUTHORIZATION='Bearer ').status_code == 403
+
+    settings.METRICS_TOKEN = 'sekret'
+    assert client.get(url, HTTP_AUTHORIZATION='Bearer zly').status_code == 403
+    assert client.get(url).status_code == 403
+    assert client.get(url, HTTP_AUTHORIZATION='Bearer sekret').status_code == 200
+
+
+def test_finished_threads_shards_are_retired():
+    """
+    Test if shards of finished threads are folded into the totals instead of piling up, one per thread.
+    """
+    registry = metrics.Registry([0.1])
+
+    def request():
+        registry.observe('home', 200, 0.01, metrics.RequestMetrics(), 10)
+
+    for _ in range(20):
+        thread = threading.Thread(target=request)
+        thread.start()
+        thread.join()
+    request()
+
+    assert registry.snapshot()['views']['home']['count'] == 21
+    # Only the shard of this thread is left
+    assert registry.shard_count() == 1
+    registry.reset()
+    assert registry.snapshot()['views'] == {}
+
+
+def test_multi_process_files_are_summed(tmp_path, settings):
+    """
+    Test if the totals of other worker processes found in METRICS_DIR are added to those of this process.
+    """
+    settings.METRICS_DIR = str(tmp_path)
+    bounds = metrics.registry.bucket_bounds
+    other = metrics.ViewSeries(len(bounds)).as_dict()
+    other.update(buckets=[1] + [0] * len(bounds), count=1, latency_sum=0.001, statuses={'200': 1}, queries=3)
+    # The parent of the test process stands in for another running worker
+    worker_file = tmp_path / f'{os.getppid()}.json'
+    worker_file.write_text(json.dumps({
+        'buckets': bounds, 'views': {'plants_list': other}, 'cache': {'plant': {'hits': 2, 'misses': 0}}}))
+    metrics.registry.observe('plants_list', 200, 0.2, metrics.RequestMetrics(), 100)
+
+    data = metrics.collect()
+    assert data['views']['plants_list']['count'] == 2
+    assert data['views']['plants_list']['queries'] == 3
+    assert data['views']['plants_list']['statuses'] == {'200': 2}
+    assert data['cache'] == {'plant': {'hits': 2, 'misses': 0}}
+    assert {path.name for path in tmp_path.iterdir()} == {worker_file.name, f'{os.getpid()}.json'}
+
+
+def test_files_of_finished_processes_are_removed(tmp_path, settings):
+    """
+    Test if totals of processes which are no longer running are dropped instead of being summed forever.
+    """
+    settings.METRICS_DIR = str(tmp_path)
+    finished = subprocess.Popen([sys.executable, '-c', 'pass'])
+    finished.wait()
+    bounds = metrics.registry.bucket_bounds
+    other = metrics.ViewSeries(len(bounds)).as_dict()
+    other.update(count=5, statuses={'200': 5})
+    (tmp_path / f'{finished.pid}.json').write_text(json.dumps({
+        'buckets': bounds, 'views': {'plants_list': other}, 'cache': {}}))
+
+    assert 'plants_list' not in metrics.collect()['views']
+    assert {path.name for path in tmp_path.iterdir()} == {f'{os.getpid()}.json'}
+
+    metrics.remove_process_file(str(tmp_path))
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,120 @@
+from unittest import mock
+
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from my_garden_app.models import Garden, PlantGarden
+from my_garden_app.cache_versions import cache_timeout
+from my_garden_app.ownership import GardenUser, garden_ids_of, invalidate_user_gardens
+
+
+@pytest.mark.django_db
+def test_garden_ids_cached_and_invalidated(user, garden, django_assert_num_queries):
+    """
+    Test if the user's garden ids are read once and dropped when gardens are assigned, taken away or deleted.
+    """
+    with django_assert_num_queries(1):
+        assert garden_ids_of(user.pk) == frozenset()
+    with django_assert_num_queries(0):
+        assert garden_ids_of(user.pk) == frozenset()
+
+    garden.user.add(user)
+    assert garden_ids_of(user.pk) == {garden.id}
+
+    other = Garden.objects.create(name='Drugi ogród')
+    user.garden_set.add(other)
+    assert garden_ids_of(user.pk) == {garden.id, other.id}
+
+    other.user.clear()
+    assert garden_ids_of(user.pk) == {garden.id}
+
+    garden.delete()
+    assert garden_ids_of(user.pk) == frozenset()
+
+
+@pytest.mark.django_db
+def test_revoked_garden_denied_after_version_bump(owner_client, user, garden):
+    """
+    Test if access ends with the next request once another process took the garden away and bumped the version.
+    """
+    url = reverse('garden_details', kwargs={'garden_id': garden.id})
+    assert owner_client.get(url).status_code == 200
+
+    # Removed behind the ORM's back, as another worker process would, which bumps the shared version
+    GardenUser.objects.filter(user=user).delete()
+    invalidate_user_gardens(user.pk)
+    assert owner_client.get(url).status_code == 404
+
+
+def test_garden_ids_kept_briefly_with_process_local_cache(settings):
+    """
+    Test if garden ids are cached only for the local timeout when other workers cannot see the invalidation.
+    """
+    assert cache_timeout(settings.GARDEN_OWNERSHIP_CACHE_TIMEOUT, settings.GARDEN_OWNERSHIP_LOCAL_CACHE_TIMEOUT) == \
+        settings.GARDEN_OWNERSHIP_LOCAL_CACHE_TIMEOUT
+    with mock.patch('my_garden_app.cache_versions.PROCESS_LOCAL_CACHES', ()):
+        assert cache_timeout(settings.GARDEN_OWNERSHIP_CACHE_TIMEOUT,
+                             settings.GARDEN_OWNERSHIP_LOCAL_CACHE_TIMEOUT) == settings.GARDEN_OWNERSHIP_CACHE_TIMEOUT
+
+
+@pytest.mark.django_db
+def test_garden_add_view_grants_ownership(client, user):
+    """
+    Test if a garden added by the user can be opened by them right away.
+    """
+    client.force_login(user)
+    assert garden_ids_of(user.pk) == frozenset()
+
+    response = client.post(reverse('add_garden'), {'name': 'Nowy ogród'})
+    garden = Garden.objects.get(name='Nowy ogród')
+    assert response.url == reverse('add_plant_to_garden', kwargs={'garden_id': garden.id})
+    assert client.get(reverse('garden_details', kwargs={'garden_id': garden.id})).status_code == 200
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_name', ['garden_details', 'edit_garden', 'monthly_tasks', 'add_plant_to_garden'])
+def test_garden_views_require_owner(client, user, garden, url_name):
+    """
+    Test if garden views redirect anonymous users to login and answer 404 for gardens of other users.
+    """
+    url = reverse(url_name, kwargs={'garden_id': garden.id})
+    assert client.get(url).status_code == 302
+
+    client.force_login(user)
+    assert client.get(url).status_code == 404
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url_name', ['edit_plant_in_garden', 'delete_plant_from_garden'])
+def test_planting_views_require_owner(client, user, plant_garden, url_name):
+    """
+    Test if plantings of gardens of other users can be neither edited nor deleted.
+    """
+    client.force_login(user)
+    url = reverse(url_name, kwargs={'plant_garden_id': plant_garden.id})
+    assert client.get(url).status_code == 404
+    assert client.post(url).status_code == 404
+    assert PlantGarden.objects.filter(id=plant_garden.id).exists()
+
+
+@pytest.mark.django_db
+def test_planting_form_offers_only_own_gardens(owner_client, garden):
+    """
+    Test if the planting form lets the user choose only from their own gardens.
+    """
+    other_user = User.objects.create_user(username='other', password='testpassword')
+    Garden.objects.create(name='Cudzy ogród').user.add(other_user)
+
+    response = owner_client.get(reverse('add_plant_to_garden', kwargs={'garden_id': garden.id}))
+    assert list(response.context['form'].fields['garden'].queryset) == [garden]
+
+
+@pytest.mark.django_db
+def test_planting_delete_by_owner(owner_client, plant_garden, garden):
+    """
+    Test if the owner deletes a planting and is sent back to the garden page.
+    """
+    response = owner_client.post(reverse('delete_plant_from_garden', kwargs={'plant_garden_id': plant_garden.id}))
+    assert response.url == reverse('garden_details', kwargs={'garden_id': garden.id})
+    assert not PlantGarden.objects.filter(id=plant_garden.id).exists()
@@ -0,0 +1,184 @@
+import datetime
+import io
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from my_garden_app import images
+from my_garden_app.models import PlantPhoto
+from my_garden_app.photos import claim_photo, process_photo
+
+
+@pytest.fixture
+def photo_settings(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.PLANT_PHOTO_WORKERS = 0
+    return settings
+
+
+def jpeg_bytes(size=(1200, 900)):
+    Image = pytest.importorskip('PIL.Image')
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (200, 80, 120)).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+@pytest.mark.django_db
+def test_photo_upload_generates_thumbnails(client, user, plant, photo_settings, django_capture_on_commit_callbacks):
+    """
+    Test if an uploaded photo gets thumbnails after commit and shows up lazily on the detail and list pages.
+    """
+    client.force_login(user)
+    upload = SimpleUploadedFile('roza.jpg', jpeg_bytes(), content_type='image/jpeg')
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post(reverse('add_plant_photo', kwargs={'plant_id': plant.id}), {'image': upload})
+
+    assert response.status_code == 302
+    photo = PlantPhoto.objects.get(plant=plant)
+    assert photo.status == PlantPhoto.STATUS_READY
+    assert photo.user == user
+    assert photo.thumbnail.name.endswith('.320.webp') and photo.medium.name.endswith('.960.webp')
+
+    content = client.get(reverse('plant_details', kwargs={'plant_id': plant.id})).content.decode()
+    assert f'src="{photo.thumbnail.url}"' in content and 'loading="lazy"' in content
+    content = client.get(reverse('plants_list')).content.decode()
+    assert photo.thumbnail.name in content
+
+
+@pytest.mark.django_db
+def test_photo_processing_failure_is_recorded(client, user, plant, photo_settings, monkeypatch,
+                                              django_capture_on_commit_callbacks):
+    """
+    Test if a photo which cannot be processed is marked as failed and not shown.
+    """
+    monkeypatch.setattr(images, 'Image', None)
+    client.force_login(user)
+    upload = SimpleUploadedFile('roza.jpg', b'not really a jpeg', content_type='image/jpeg')
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client.post(reverse('add_plant_photo', kwargs={'plant_id': plant.id}), {'image': upload})
+
+    assert PlantPhoto.objects.get(plant=plant).status == PlantPhoto.STATUS_FAILED
+    assert client.get(reverse('plant_details', kwargs={'plant_id': plant.id})).context['photos'] == []
+
+
+@pytest.mark.django_db
+def test_photo_upload_validation(client, user, plant, photo_settings):
+    """
+    Test if files with other extensions or over the size limit are rejected.
+    """
+    client.force_login(user)
+    url = reverse('add_plant_photo', kwargs={'plant_id': plant.id})
+
+    response = client.post(url, {'image': SimpleUploadedFile('skrypt.exe', b'MZ')})
+    assert response.status_code == 200
+    assert 'image' in response.context['form'].errors
+
+    photo_settings.PLANT_PHOTO_MAX_SIZE = 10
+    response = client.post(url, {'image': SimpleUploadedFile('roza.jpg', b'x' * 11)})
+    assert 'image' in response.context['form'].errors
+    assert not PlantPhoto.objects.exists()
+
+
+@pytest.mark.django_db
+def test_photo_upload_checks_csrf(user, plant, photo_settings):
+    """
+    Test if CSRF is still enforced although the view replaces the upload handlers before it.
+    """
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(user)
+
+    response = client.post(reverse('add_plant_photo', kwargs={'plant_id': plant.id}),
+                           {'image': SimpleUploadedFile('roza.jpg', b'x')})
+
+    assert response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_rotated_photo_derivatives_are_upright(client, user, plant, photo_settings,
+                                               django_capture_on_commit_callbacks):
+    """
+    Test if the EXIF orientation of a phone photo is applied before the derivatives are resized.
+    """
+    Image = pytest.importorskip('PIL.Image')
+    buffer = io.BytesIO()
+    exif = Image.Exif()
+    # Orientation 6: stored landscape, displayed rotated by 90 degrees
+    exif[0x0112] = 6
+    Image.new('RGB', (1200, 900), (200, 80, 120)).save(buffer, 'JPEG', exif=exif)
+    client.force_login(user)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client.post(reverse('add_plant_photo', kwargs={'plant_id': plant.id}),
+                    {'image': SimpleUploadedFile('roza.jpg', buffer.getvalue(), content_type='image/jpeg')})
+
+    photo = PlantPhoto.objects.get(plant=plant)
+    with photo.medium.open('rb') as medium, Image.open(medium) as image:
+        assert image.size == (900, 1200)
+
+
+@pytest.mark.django_db
+def test_stale_pending_photos_processed_by_command(user, plant, photo_settings, monkeypatch):
+    """
+    Test if the command processes photos left pending by a lost queue and leaves recent uploads alone.
+    """
+    monkeypatch.setattr(images, 'Image', None)
+    stale = PlantPhoto.objects.create(plant=plant, user=user, image='plant_photos/stara.jpg')
+    recent = PlantPhoto.objects.create(plant=plant, user=user, image='plant_photos/nowa.jpg')
+    PlantPhoto.objects.filter(pk=stale.pk).update(created_on=timezone.now() - datetime.timedelta(minutes=30))
+
+    out = io.StringIO()
+    call_command('process_pending_photos', older_than=10, stdout=out)
+
+    # Without Pillow processing fails, which still takes the photo out of the pending state
+    stale.refresh_from_db()
+    recent.refresh_from_db()
+    assert stale.status == PlantPhoto.STATUS_FAILED
+    assert recent.status == PlantPhoto.STATUS_PENDING
+    assert 'Przetworzono 1 zdjęć.' in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_photo_processed_once(user, plant, photo_settings, monkeypatch):
+    """
+    Test if a photo claimed by one worker is left alone by the others.
+    """
+    monkeypatch.setattr(images, 'Image', None)
+    photo = PlantPhoto.objects.create(plant=plant, user=user, image='plant_photos/zdjecie.jpg')
+
+    assert claim_photo(photo.id)
+    assert not claim_photo(photo.id)
+    assert not process_photo(photo.id)
+    photo.refresh_from_db()
+    assert photo.status == PlantPhoto.STATUS_PROCESSING
+    assert photo.processing_started is not None
+
+
+@pytest.mark.django_db
+def test_photos_of_dead_workers_processed_by_command(user, plant, photo_settings, monkeypatch):
+    """
+    Test if the command takes over photos whose processing started long ago and rejects a zero grace period.
+    """
+    monkeypatch.setattr(images, 'Image', None)
+    abandoned = PlantPhoto.objects.create(plant=plant, user=user, image='plant_photos/porzucone.jpg')
+    running = PlantPhoto.objects.create(plant=plant, user=user, image='plant_photos/w_toku.jpg')
+    PlantPhoto.objects.filter(pk=abandoned.pk).update(status=PlantPhoto.STATUS_PROCESSING,
+                                                      processing_started=timezone.now() - datetime.timedelta(hours=1))
+    claim_photo(running.pk)
+
+    out = io.StringIO()
+    call_command('process_pending_photos', older_than=10, stdout=out)
+
+    abandoned.refresh_from_db()
+    running.refresh_from_db()
+    assert abandoned.status == PlantPhoto.STATUS_FAILED
+    assert running.status == PlantPhoto.STATUS_PROCESSING
+    assert 'Przetworzono 1 zdjęć.' in out.getvalue()
+    with pytest.raises(CommandError):
+        call_command('process_pending_photos', older_than=0)
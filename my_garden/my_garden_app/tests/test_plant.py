@@ -1,3 +1,4 @@
+from datetime import timedelta
 from django.contrib.auth.models import User, Permission
 from django.utils import timezone
 import pytest
@@ -5,6 +6,7 @@ from django.urls import reverse
 from django.contrib.messages import get_messages
 from my_garden_app.forms import PlantMaintenanceForm, GardenAddForm
 from my_garden_app.models import Plant, PlantMaintenance, Comments, Garden, PlantGarden
+from my_garden_app.plant_cache import cache_stats, reset_cache_stats
 
 
 # Test for Homepage, login and logout
@@ -217,6 +219,35 @@ def test_plants_list_view(client, plants):
     assert len(response.context['object_list']) == 3
 
 
+@pytest.mark.django_db
+def test_plants_list_view_pagination(client, django_assert_num_queries):
+    """
+    Verify plants list view paginates by page number and by keyset (?after=) without counting rows.
+    """
+    plants = Plant.objects.bulk_create([
+        Plant(name=f'plant{i}', description='', max_height=1, spread=1, flowering_season=1, sunlight_exposure=1,
+              pruning_frequency=1, watering_needs=1, fertilization=1, pest_disease_resistance=1)
+        for i in range(25)
+    ])
+    url = reverse('plants_list')
+
+    response = client.get(url, {'page': 2})
+    assert response.status_code == 200
+    assert [plant.name for plant in response.context['object_list']] == [f'plant{i}' for i in range(20, 25)]
+    assert response.context['page_obj'].paginator.num_pages == 2
+
+    # Keyset mode runs a single query, with no COUNT(*)
+    with django_assert_num_queries(1):
+        response = client.get(url, {'after': 0})
+    assert len(response.context['object_list']) == 20
+    assert response.context['next_after'] == plants[19].id
+    assert response.context['page_obj'] is None
+
+    response = client.get(url, {'after': response.context['next_after']})
+    assert [plant.name for plant in response.context['object_list']] == [f'plant{i}' for i in range(20, 25)]
+    assert response.context['next_after'] is None
+
+
 @pytest.mark.django_db
 def test_plant_detail_view(client, plant):
     """
@@ -228,6 +259,45 @@ def test_plant_detail_view(client, plant):
     assert response.context['object'] == plant
 
 
+@pytest.mark.django_db
+def test_plant_detail_view_cached_until_edit(client, plant, django_assert_num_queries):
+    """
+    Ensure plant detail is served from the cache on repeated hits and read again after the plant is edited.
+    """
+    reset_cache_stats()
+    url = reverse('plant_details', kwargs={'plant_id': plant.id})
+    client.get(url)
+    # Only the freshness check of the conditional GET reaches the database
+    with django_assert_num_queries(1):
+        response = client.get(url)
+    assert response.context['object'] == plant
+    assert cache_stats()['plant'] == {'hits': 1, 'misses': 1}
+
+    data = {
+        'name': 'Nowa nazwa', 'description': 'Opis', 'max_height': 1, 'spread': 1, 'flowering_season': 2,
+        'sunlight_exposure': 1, 'pruning_frequency': 1, 'watering_needs': 1, 'fertilization': 1,
+        'pest_disease_resistance': 1,
+    }
+    client.post(reverse('edit_plant', kwargs={'plant_id': plant.pk}), data)
+    response = client.get(url)
+    assert response.context['object'].name == 'Nowa nazwa'
+
+
+@pytest.mark.django_db
+def test_cache_stats_view_for_staff_only(client, user):
+    """
+    Ensure cache counters are available only to staff users.
+    """
+    client.force_login(user)
+    assert client.get(reverse('cache_stats')).status_code == 403
+
+    user.is_staff = True
+    user.save()
+    response = client.get(reverse('cache_stats'))
+    assert response.status_code == 200
+    assert isinstance(response.json(), dict)
+
+
 #     tests for PlantMaintenance
 
 @pytest.mark.django_db
@@ -388,6 +458,7 @@ def test_garden_edit_view(client, garden, user):
     """
     Test if the GardenEditView edits an existing garden.
     """
+    garden.user.add(user)
     client.force_login(user)
     url = reverse('edit_garden', kwargs={'garden_id': garden.id})
     response = client.get(url)
@@ -409,6 +480,7 @@ def test_garden_edit_view_post(client, garden, user):
     """
     Test if the form submission in GardenEditView is valid.
     """
+    garden.user.add(user)
     client.force_login(user)
     url = reverse('edit_garden', kwargs={'garden_id': garden.id})
     form_data = {
@@ -425,6 +497,7 @@ def test_garden_edit_view_post_invalid(client, garden, user):
     """
     Test if the form submission in GardenEditView with invalid data.
     """
+    garden.user.add(user)
     client.force_login(user)
     url = reverse('edit_garden', kwargs={'garden_id': garden.id})
     form_data = {
@@ -458,12 +531,12 @@ def test_gardens_list_view_redirect_unauthenticated(client):
 
 
 @pytest.mark.django_db
-def test_garden_detail_view_with_plants(client, garden, plant_garden):
+def test_garden_detail_view_with_plants(owner_client, garden, plant_garden):
     """
     Test if GardenDetailView correctly displays details of garden with added plants.
     """
     url = reverse('garden_details', kwargs={'garden_id': garden.pk})
-    response = client.get(url)
+    response = owner_client.get(url)
 
     assert response.status_code == 200
     assert garden.name in response.content.decode()
@@ -472,12 +545,34 @@ def test_garden_detail_view_with_plants(client, garden, plant_garden):
 
 
 @pytest.mark.django_db
-def test_garden_detail_view_without_plants(client, garden):
+def test_garden_detail_view_query_count(owner_client, garden, plants, django_assert_num_queries):
+    """
+    Test if GardenDetailView uses a constant number of queries regardless of the number of plantings.
+    """
+    for plant in plants:
+        for location in ('Rabata', 'Taras'):
+            PlantGarden.objects.create(garden=garden, plant=plant, start_date='2024-01-01', location=location)
+
+    url = reverse('garden_details', kwargs={'garden_id': garden.pk})
+    owner_client.get(url)
+    # Session, user, freshness check, the garden and all plantings with their plants;
+    # the user's garden ids come from the cache
+    with django_assert_num_queries(5):
+        response = owner_client.get(url)
+
+    assert response.status_code == 200
+    plant_groups = response.context['plant_groups']
+    assert [group['plant'] for group in plant_groups] == plants
+    assert all(len(group['plantings']) == 2 for group in plant_groups)
+
+
+@pytest.mark.django_db
+def test_garden_detail_view_without_plants(owner_client, garden):
     """
     Test if GardenDetailView correctly handles the case of "no plants in the garden" scenario.
     """
     url = reverse('garden_details', kwargs={'garden_id': garden.pk})
-    response = client.get(url)
+    response = owner_client.get(url)
 
     assert response.status_code == 200
     assert garden.name in response.content.decode()
@@ -509,13 +604,13 @@ def test_plant_search_view(client, plants):
 
 
 @pytest.mark.django_db
-def test_plant_to_garden_add_view(client, garden):
+def test_plant_to_garden_add_view(owner_client, garden):
     """
     Test if PlantToGardenAddView correctly adds a plant to the garden.
     """
     # Access the add plant to garden view
     url = reverse('add_plant_to_garden', kwargs={'garden_id': garden.id})
-    response = client.get(url)
+    response = owner_client.get(url)
     assert response.status_code == 200
 
     # Check if the correct form class is used
@@ -575,17 +670,47 @@ def test_display_monthly_tasks_view(client, garden, maintenance_data, user):
     """
     Test if the DisplayMonthlyTasksView displays monthly tasks correctly.
     """
+    garden.user.add(user)
     client.force_login(user)
     url = reverse('monthly_tasks', kwargs={'garden_id': garden.id})
     response = client.get(url)
     assert response.status_code == 200
     assert 'garden' in response.context
-    assert 'plants' in response.context
     assert 'month_choices' in response.context
     assert 'selected_month' in response.context
     assert 'tasks' in response.context
 
 
+@pytest.mark.django_db
+def test_display_monthly_tasks_view_filters_precomputed_rows(owner_client, garden, plants,
+                                                             django_assert_num_queries):
+    """
+    Test if DisplayMonthlyTasksView filters and paginates calendar rows with a constant number of queries.
+    """
+    for plant in plants:
+        PlantGarden.objects.create(garden=garden, plant=plant, start_date='2024-01-01', location='Rabata')
+        for month in range(1, 13):
+            PlantMaintenance.objects.create(plant=plant, task=1, task_description='Opis', week_of_month=1, month=month)
+
+    url = reverse('monthly_tasks', kwargs={'garden_id': garden.id})
+    owner_client.get(url, {'month': 3})
+    # Session, user, garden, plantings with plants and prefetched maintenance tasks
+    with django_assert_num_queries(5):
+        response = owner_client.get(url, {'month': 3})
+
+    assert response.status_code == 200
+    assert response.context['selected_month'] == 3
+    rows = response.context['tasks'].object_list
+    assert len(rows) == 3
+    assert all(row.month == 3 for row in rows)
+    assert 'Marzec' in response.content.decode()
+
+    # 36 rows without the month filter, 10 per page
+    response = owner_client.get(url, {'page': 4})
+    assert response.context['tasks'].paginator.count == 36
+    assert len(response.context['tasks'].object_list) == 6
+
+
 # Tests for Comments
 @pytest.mark.django_db
 def test_add_comment_view_get(client, user, plant):
@@ -643,6 +768,20 @@ def test_add_comment_view_post_valid_form(client, user, plant):
     assert plant.comments_set.filter(comment=comment_text).exists()
 
 
+@pytest.mark.django_db
+def test_comments_list_view_refreshed_after_new_comment(client, user, plant):
+    """
+    Ensure the cached comments list is invalidated when a comment is added.
+    """
+    url = reverse('comments_list', kwargs={'plant_id': plant.id})
+    assert len(client.get(url).context['object_list']) == 0
+
+    client.force_login(user)
+    client.post(reverse('add_comment', kwargs={'plant_id': plant.id}), {'comment': 'Pięknie kwitnie'})
+    response = client.get(url)
+    assert [comment.comment for comment in response.context['object_list']] == ['Pięknie kwitnie']
+
+
 @pytest.mark.django_db
 def test_comments_list_view(client, user, plant):
     """
@@ -664,6 +803,32 @@ def test_comments_list_view(client, user, plant):
     assert response.context['plant'] == plant
 
 
+@pytest.mark.django_db
+def test_comments_feed_cursor_pagination(client, user, plant, django_assert_num_queries):
+    """
+    Test that comments are paginated newest first by cursor, also across equal timestamps, in HTML and JSON.
+    """
+    comments = [Comments.objects.create(comment=f"Comment {i}", plant=plant, user=user) for i in range(25)]
+    # The first ten comments share one timestamp, so the id decides their order
+    Comments.objects.filter(id__in=[comment.id for comment in comments[:10]]).update(
+        created_on=comments[0].created_on)
+    expected = list(Comments.objects.order_by('-created_on', '-id').values_list('id', flat=True))
+
+    url = reverse('comments_list', kwargs={'plant_id': plant.id})
+    response = client.get(url)
+    assert [comment.id for comment in response.context['object_list']] == expected[:20]
+    next_cursor = response.context['next_cursor']
+    assert 'Starsze komentarze' in response.content.decode()
+
+    feed_url = reverse('comments_feed', kwargs={'plant_id': plant.id})
+    # One query for the slice, authors are joined
+    with django_assert_num_queries(1):
+        data = client.get(feed_url, {'cursor': next_cursor}).json()
+    assert [comment['id'] for comment in data['comments']] == expected[20:]
+    assert data['comments'][0]['user'] == user.username
+    assert data['next_cursor'] is None
+
+
 @pytest.mark.django_db
 def test_comments_list_view_no_comments(client, user, plant):
     """
@@ -680,3 +845,58 @@ def test_comments_list_view_no_comments(client, user, plant):
     assert response.context['plant'] == plant
     # Check if the correct message is displayed ->decode method to convert bytes into a string
     assert 'Brak komentarzy dla tej rośliny.' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_plant_detail_view_not_modified(client, plant, django_assert_num_queries):
+    """
+    Test if a repeated request with the ETag gets 304 after one query and a new maintenance task makes the page stale.
+    """
+    url = reverse('plant_details', kwargs={'plant_id': plant.id})
+    response = client.get(url)
+    etag, last_modified = response['ETag'], response['Last-Modified']
+
+    with django_assert_num_queries(1):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code == 304
+
+    PlantMaintenance.objects.create(plant=plant, task=1, task_description='Cięcie', week_of_month=1, month=3)
+    response = client.get(reverse('maintenance_list', kwargs={'plant_id': plant.id}), HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+
+
+@pytest.mark.django_db
+def test_conditional_get_etag_depends_on_user(client, user, plant):
+    """
+    Test if the ETag changes after login, as the page shows the logged-in user.
+    """
+    url = reverse('comments_list', kwargs={'plant_id': plant.id})
+    etag = client.get(url)['ETag']
+
+    client.force_login(user)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code == 304
+
+    Comments.objects.create(plant=plant, user=user, comment='Nowy komentarz')
+    assert client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code == 200
+
+
+@pytest.mark.django_db
+def test_garden_detail_view_not_modified_until_planting_changes(owner_client, garden, plant):
+    """
+    Test if the garden page is stale after a plant is planted and after a planted plant is renamed.
+    """
+    url = reverse('garden_details', kwargs={'garden_id': garden.pk})
+    etag = owner_client.get(url)['ETag']
+    assert owner_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    PlantGarden.objects.create(garden=garden, plant=plant, start_date='2024-01-01', location='Rabata')
+    response = owner_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    etag = response['ETag']
+
+    Plant.objects.filter(pk=plant.pk).update(name='Nowa nazwa', updated_at=timezone.now() + timedelta(seconds=1))
+    assert owner_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
@@ -0,0 +1,99 @@
+import datetime
+
+import pytest
+from django.core.management import call_command
+
+from my_garden_app.models import Garden, PlantGarden, PlantMaintenance, MaintenanceMonthlySchedule
+from my_garden_app import signals
+from my_garden_app.schedule import materialize_schedule, planned_date, sync_schedule
+
+
+def test_planned_date():
+    """
+    Test if planned_date maps week of month to the first day of that week.
+    """
+    assert planned_date(2024, 3, 1) == datetime.date(2024, 3, 1)
+    assert planned_date(2024, 3, 3) == datetime.date(2024, 3, 15)
+    # Fifth week of February is clamped to the last day of the month
+    assert planned_date(2023, 2, 5) == datetime.date(2023, 2, 28)
+    # "Brak" week means the beginning of the month, "Brak" month means no date at all
+    assert planned_date(2024, 7, 6) == datetime.date(2024, 7, 1)
+    assert planned_date(2024, 13, 1) is None
+
+
+@pytest.mark.django_db
+def test_materialize_schedule_is_idempotent(plant, plant_garden):
+    """
+    Test if materialize_schedule expands plantings x tasks once and ignores existing rows on re-run.
+    """
+    PlantMaintenance.objects.create(plant=plant, task=1, task_description='Cięcie', week_of_month=2, month=3)
+    PlantMaintenance.objects.create(plant=plant, task=2, task_description='Nawóz', week_of_month=1, month=5)
+    PlantMaintenance.objects.create(plant=plant, task=2, task_description='Bez terminu', week_of_month=6, month=13)
+
+    assert materialize_schedule(2024, batch_size=1) == 2
+    assert materialize_schedule(2024) == 0
+
+    schedules = MaintenanceMonthlySchedule.objects.filter(plant_garden=plant_garden).order_by('month')
+    assert [(s.month, s.completion_date, s.status) for s in schedules] == [
+        (3, datetime.date(2024, 3, 8), 1),
+        (5, datetime.date(2024, 5, 1), 1),
+    ]
+
+
+@pytest.mark.django_db
+def test_materialize_schedule_for_single_garden(plant, plant_garden, maintenance_data):
+    """
+    Test if materialize_schedule limited to one garden leaves other gardens untouched and replace rebuilds rows.
+    """
+    other_garden = Garden.objects.create(name='Other Garden')
+    PlantGarden.objects.create(garden=other_garden, plant=plant, start_date='2024-01-01', location='Taras')
+
+    assert materialize_schedule(2024, garden=plant_garden.garden) == 1
+    assert not MaintenanceMonthlySchedule.objects.filter(plant_garden__garden=other_garden).exists()
+
+    call_command('materialize_schedule', '--year', '2025', '--garden', str(plant_garden.garden_id), '--replace')
+    schedule = MaintenanceMonthlySchedule.objects.get(plant_garden=plant_garden)
+    assert schedule.completion_date == datetime.date(2025, 1, 1)
+
+
+@pytest.mark.django_db
+def test_schedule_follows_planting_and_task_changes(plants, garden, django_capture_on_commit_callbacks, monkeypatch):
+    """
+    Test if signal handlers insert, update and delete only the affected schedule rows after commit.
+    """
+    sync_calls = []
+    monkeypatch.setattr(signals, 'sync_schedule', lambda **kwargs: sync_calls.append(kwargs) or sync_schedule(**kwargs))
+    first, second = plants[0], plants[1]
+    PlantMaintenance.objects.create(plant=second, task=2, task_description='Nawóz', week_of_month=1, month=4)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        task = PlantMaintenance.objects.create(plant=first, task=1, task_description='Cięcie', week_of_month=1,
+                                               month=3)
+        plant_garden = PlantGarden.objects.create(garden=garden, plant=first, start_date='2024-01-01',
+                                                  location='Rabata')
+    # Both saves coalesce into a single sync run
+    assert len(sync_calls) == 1
+    assert plant_garden.id in sync_calls[0]['plant_garden_ids'] and task.id in sync_calls[0]['task_ids']
+    schedule = MaintenanceMonthlySchedule.objects.get(plant_garden=plant_garden)
+    assert (schedule.task_id, schedule.month) == (task.id, 3)
+
+    # Moving the task to another week and month updates the existing row
+    with django_capture_on_commit_callbacks(execute=True):
+        task.month = 6
+        task.week_of_month = 2
+        task.save()
+    schedule.refresh_from_db()
+    assert schedule.month == 6
+    assert (schedule.completion_date.month, schedule.completion_date.day) == (6, 8)
+
+    # Replacing the plant in the planting swaps its schedule rows
+    with django_capture_on_commit_callbacks(execute=True):
+        plant_garden.plant = second
+        plant_garden.save()
+    assert list(MaintenanceMonthlySchedule.objects.filter(plant_garden=plant_garden)
+                .values_list('task__plant_id', 'month')) == [(second.id, 4)]
+
+    # Removing the planting removes its rows
+    with django_capture_on_commit_callbacks(execute=True):
+        plant_garden.delete()
+    assert not MaintenanceMonthlySchedule.objects.exists()
@@ -0,0 +1,62 @@
+import pytest
+
+from my_garden_app.models import Plant
+from my_garden_app.search import InvertedIndex, search_plants, terms_filter, tokenize
+
+
+def test_tokenize():
+    """
+    Test if tokenize splits on punctuation and underscores and lowercases words.
+    """
+    assert tokenize('Róża_pnąca, BIAŁA!') == ['róża', 'pnąca', 'biała']
+
+
+def test_inverted_index_ranks_name_matches_first():
+    """
+    Test if the inverted index matches word prefixes of every query word and prefers name matches.
+    """
+    index = InvertedIndex([
+        (1, 'Magnolia', 'Drzewo o dużych kwiatach'),
+        (2, 'Lawenda', 'Krzew pachnący, kwiaty jak magnolia'),
+        (3, 'Magnolia gwiaździsta', 'Niski krzew'),
+    ])
+    assert index.search('magn', limit=10) == [1, 3, 2]
+    assert index.search('magnolia krzew', limit=10) == [3, 2]
+    assert index.search('magnolia', limit=1) == [1]
+    assert index.search('tulipan', limit=10) == []
+
+
+@pytest.mark.django_db
+def test_search_plants_sees_catalogue_changes(plants):
+    """
+    Test if search_plants searches descriptions and rebuilds the index after plants are saved or deleted.
+    """
+    assert [plant.name for plant in search_plants('test_plant2 description')] == ['test_plant2']
+
+    plants[1].delete()
+    Plant.objects.create(name='Budleja', description='Przyciąga motyle', max_height=1, spread=1,
+                         flowering_season=2, sunlight_exposure=1, pruning_frequency=1, watering_needs=2,
+                         fertilization=1, pest_disease_resistance=1)
+    assert search_plants('test_plant2') == []
+    assert [plant.name for plant in search_plants('motyl')] == ['Budleja']
+    assert search_plants('   ') == []
+
+
+@pytest.mark.django_db
+def test_terms_filter_matches_every_word_like_inverted_index():
+    """
+    Test if the database filter of the PostgreSQL backend needs every word of the query, in any order
+    and in name or description, and agrees with the inverted index.
+    """
+    rows = [('Rose white', 'Climbing rose'), ('Rose red', 'White edge'), ('Lily white', 'Bulb'),
+            ('Rose', 'Shrub')]
+    for name, description in rows:
+        Plant.objects.create(name=name, description=description, max_height=1, spread=1, flowering_season=2,
+                             sunlight_exposure=1, pruning_frequency=1, watering_needs=2, fertilization=1,
+                             pest_disease_resistance=1)
+    query = 'white, ROSE'
+
+    matched = Plant.objects.filter(terms_filter(tokenize(query))).order_by('name')
+    assert [plant.name for plant in matched] == ['Rose red', 'Rose white']
+    index = InvertedIndex(Plant.objects.values_list('id', 'name', 'description'))
+    assert set(index.search(query, limit=10)) == {plant.id for plant in matched}
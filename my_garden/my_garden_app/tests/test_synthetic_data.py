@@ -0,0 +1,164 @@
+import datetime
+import io
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Count
+
+from my_garden_app.autocomplete import search_plant_names
+from my_garden_app.models import MONTH_CHOICES, Comments, Garden, MaintenanceMonthlySchedule, Plant, PlantGarden, \
+    PlantMaintenance
+from my_garden_app.schedule import NO_MONTH, planned_date
+from my_garden_app.synthetic_data import ChunkReader, GenerationPlan, copy_chunks, copy_value, generate
+
+PLAN = GenerationPlan(users=5, gardens=8, plants=60, plantings_per_garden=6, tasks_per_plant=2,
+                      comments_per_plant=2, year=2024)
+
+
+def choice_values(choices):
+    return {value for value, _ in choices}
+
+
+def snapshot():
+    """
+    Generated values without ids, which depend on the rows already in the database.
+    """
+    return (
+        list(Plant.objects.exclude(name__startswith='test_plant').order_by('id')
+             .values_list('description', 'max_height', 'flowering_season', 'watering_needs', 'updated_at')),
+        list(PlantMaintenance.objects.order_by('id').values_list('task', 'week_of_month', 'month')),
+        list(PlantGarden.objects.order_by('id').values_list('start_date', 'location')),
+    )
+
+
+@pytest.mark.django_db
+def test_generate_respects_relations_and_choices():
+    """
+    Test if every model gets rows with valid foreign keys and values from their choice domains.
+    """
+    counts = generate(PLAN, seed=1, method='bulk', batch_size=7)
+
+    assert counts[Plant] == Plant.objects.count() == 60
+    assert counts[Comments] == Comments.objects.count() == 120
+    assert User.objects.count() == 5 and Garden.objects.count() == 8
+    assert PlantGarden.objects.exists() and PlantMaintenance.objects.exists()
+    # Every user owns a garden, every garden has an owner
+    assert not User.objects.filter(garden__isnull=True).exists()
+    assert not Garden.objects.annotate(owners=Count('user')).filter(owners=0).exists()
+
+    for field in ('max_height', 'spread', 'flowering_season', 'sunlight_exposure', 'pruning_frequency',
+                  'watering_needs', 'fertilization', 'pest_disease_resistance'):
+        values = set(Plant.objects.values_list(field, flat=True))
+        assert values <= choice_values(Plant._meta.get_field(field).choices)
+    assert set(PlantMaintenance.objects.values_list('month', flat=True)) <= choice_values(MONTH_CHOICES)
+    assert set(PlantMaintenance.objects.values_list('week_of_month', flat=True)) <= choice_values(
+        PlantMaintenance.WEEK_OF_MONTH_CHOICES)
+    assert set(PlantMaintenance.objects.values_list('task', flat=True)) <= choice_values(PlantMaintenance.TASK_CHOICES)
+
+
+@pytest.mark.django_db
+def test_generate_schedule_matches_tasks():
+    """
+    Test if the schedule has one row per planted plant's task with a month, planned like materialize_schedule.
+    """
+    generate(PLAN, seed=2, method='bulk', today=datetime.date(2024, 6, 15))
+
+    expected = sum(PlantMaintenance.objects.filter(plant_id=planting.plant_id).exclude(month=NO_MONTH).count()
+                   for planting in PlantGarden.objects.all())
+    assert MaintenanceMonthlySchedule.objects.count() == expected
+    for row in MaintenanceMonthlySchedule.objects.select_related('plant_garden', 'task'):
+        assert row.task.plant_id == row.plant_garden.plant_id
+        assert row.completion_date == planned_date(2024, row.task.month, row.task.week_of_month)
+        if row.month > 6:
+            assert row.status == 1
+        elif row.month == 6:
+            assert row.status == 2
+
+
+@pytest.mark.django_db
+def test_generate_is_repeatable_for_seed(plants):
+    """
+    Test if the same seed gives the same values, also when the ids start elsewhere.
+    """
+    def clear():
+        for model in (PlantGarden, PlantMaintenance, Garden, User):
+            model.objects.all().delete()
+        Plant.objects.exclude(id__in=[plant.id for plant in plants[:1]]).delete()
+
+    generate(PLAN, seed=3, method='bulk')
+    first = snapshot()
+    clear()
+    # Only the first fixture plant is left, so the generated ids start lower this time
+    generate(PLAN, seed=3, method='bulk')
+    assert snapshot() == first
+    clear()
+    generate(PLAN, seed=4, method='bulk')
+    assert snapshot() != first
+
+
+@pytest.mark.django_db
+def test_generate_keeps_timestamps():
+    """
+    Test if bulk_create keeps the generated auto_now and auto_now_add values instead of the current time.
+    """
+    generate(PLAN, seed=6, method='bulk')
+
+    created = set(Comments.objects.values_list('created_on', flat=True))
+    assert len(created) > 1
+    assert max(created).year <= PLAN.year
+    assert max(Garden.objects.values_list('updated_at', flat=True)).year <= PLAN.year
+    assert Comments._meta.get_field('created_on').auto_now_add and Garden._meta.get_field('updated_at').auto_now
+
+
+@pytest.mark.django_db
+def test_generate_invalidates_indexes(plant):
+    """
+    Test if generated plants show up in indexes built before the generation (bulk writes send no signals).
+    """
+    assert search_plant_names('róża') == []
+    generate(GenerationPlan(users=1, gardens=1, plants=40, year=2024), seed=5, method='bulk')
+    assert search_plant_names('róża')
+
+
+def test_copy_format():
+    """
+    Test if values are escaped for COPY text format and buffers hold whole rows.
+    """
+    assert copy_value(None) == '\\N'
+    assert copy_value(True) == 't'
+    assert copy_value('a\tb\nc\\d') == 'a\\tb\\nc\\\\d'
+    assert copy_value(datetime.date(2024, 5, 1)) == '2024-05-01'
+
+    chunks = list(copy_chunks([(1, 'a'), (2, None), (3, 'c')], 2))
+    assert chunks == [b'1\ta\n2\t\\N\n', b'3\tc\n']
+    reader = ChunkReader(iter(chunks))
+    assert reader.read(3) == b'1\ta'
+    assert reader.read() == b'\n2\t\\N\n3\tc\n'
+    assert reader.read(10) == b''
+
+
+@pytest.mark.django_db
+def test_generate_garden_data_command():
+    """
+    Test if the command generates the same data for the same seed and day and rejects COPY outside PostgreSQL.
+    """
+    out = io.StringIO()
+    call_command('generate_garden_data', '--today=2024-06-15', users=2, gardens=3, plants=20, seed=7, method='bulk',
+                 stdout=out)
+    assert Plant.objects.count() == 20
+    assert 'Ziarno 7' in out.getvalue()
+
+    schedule = list(MaintenanceMonthlySchedule.objects.order_by('id').values_list('status', 'completion_date'))
+    for model in (MaintenanceMonthlySchedule, PlantGarden, PlantMaintenance, Comments, Garden, Plant, User):
+        model.objects.all().delete()
+    call_command('generate_garden_data', '--today=2024-06-15', users=2, gardens=3, plants=20, seed=7,
+                 method='bulk', stdout=io.StringIO())
+    assert list(MaintenanceMonthlySchedule.objects.order_by('id').values_list('status', 'completion_date')) == \
+        schedule
+
+    with pytest.raises(CommandError):
+        call_command('generate_garden_data', plants=-1)
+    with pytest.raises(CommandError, match='PostgreSQL'):
+        call_command('generate_garden_data', plants=5, method='copy', stdout=io.StringIO())
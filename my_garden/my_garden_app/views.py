@@ -1,14 +1,42 @@
-from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
+from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin, UserPassesTestMixin
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.views import LoginView, LogoutView
 from django.urls import reverse_lazy
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from django.utils.decorators import method_decorator
 from django.views import View
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.views.decorators.http import condition
+from django.views.decorators.vary import vary_on_cookie
 from django.views.generic import CreateView, UpdateView, DeleteView, ListView, DetailView, FormView, TemplateView
 from .forms import PlantAddForm, PlantEditForm, PlantMaintenanceForm, PlantToGardenAddForm, GardenAddForm, \
-    PlantSearchForm, CommentForm
+    PlantSearchForm, CommentForm, PlantPhotoForm
 from .models import Plant, PlantMaintenance, PlantGarden, Garden, MONTH_CHOICES, Comments
 from django.contrib import messages
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.core.handlers.asgi import ASGIRequest
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from . import metrics
+from . import plant_cache
+from .attribute_index import get_attribute_index
+from .autocomplete import search_plant_names
+from .dashboard import get_dashboard, week_of_month
+from .exports import CONTENT_TYPES, DATASETS, async_chunks, export_stream
+from .facets import facet_counts, filter_plants, parse_facet_filters
+from .freshness import garden_last_modified, plant_last_modified, touch_gardens, touch_plants, user_etag
+from .images import responsive_image
+from .ownership import GardenOwnerRequiredMixin, OwnedPlantingMixin, get_garden_ids, owns_garden
+from .pagination import keyset_page, parse_cursor_id
+from .photos import enqueue_photo, with_thumbnail
+from .search import search_plants
+from .task_calendar import build_garden_calendar, filter_month, parse_month
+
+# Conditional GET: a fresh page is answered with 304 after one indexed query, before any context is built
+plant_condition = condition(etag_func=user_etag(plant_last_modified), last_modified_func=plant_last_modified)
+garden_condition = condition(etag_func=user_etag(garden_last_modified), last_modified_func=garden_last_modified)
 
 
 class HomePageView(TemplateView):
@@ -30,7 +58,8 @@ class HomePageView(TemplateView):
             {'image': 'images/glicynia.jpg', 'alt': 'Glicynia'},
             {'image': 'images/magnolia.jpg', 'alt': 'Magnolia'},
         ]
-        context['carousel_items'] = carousel_items
+        # srcset of the pre-generated variants, if build_responsive_images was run
+        context['carousel_items'] = [responsive_image(item) for item in carousel_items]
         return context
 
 
@@ -76,6 +105,7 @@ class PlantEditView(UpdateView):
         """
 
         response = super().form_valid(form)
+        plant_cache.invalidate_plant(self.object.pk)
         messages.success(self.request, "Dane rośliny zostały zmienione.")
         return response
 
@@ -117,6 +147,15 @@ class PlantDeleteView(DeleteView):
         context['message'] = f'Następująca roślina zostanie usunięta { plant.name }'
         return context
 
+    def form_valid(self, form):
+        """
+        Delete the plant and drop its cached pages.
+        """
+        plant_id = self.object.pk
+        response = super().form_valid(form)
+        plant_cache.invalidate_plant(plant_id)
+        return response
+
 
 """Create view to display list of plants using generic ListView"""
 
@@ -124,33 +163,46 @@ class PlantDeleteView(DeleteView):
 class PlantsListView(ListView):
     """
     A view for listing all plants.
+
+    Supports page numbers (?page=) and keyset pagination (?after=<plant id>), which seeks
+    straight to the next page through the primary key index without OFFSET or COUNT(*).
     """
 
     template_name = 'plants_list.html'
+    paginate_by = 20
 
     def get_queryset(self):
         """
-        Get the queryset of all plants.
+        Get the queryset of all plants, limited to the columns used by the template.
         """
-        return Plant.objects.all()
+        return with_thumbnail(Plant.objects.only('id', 'name').order_by('id'))
 
-        # Pagination
-        paginator = Paginator(plants, 20)
-        page = request.GET.get('page')
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Paginate by page number, or by the id of the last seen plant if ?after= is given.
+        """
+        self.next_after = None
+        after = parse_cursor_id(self.request.GET.get('after'))
+        if after is None:
+            return super().paginate_queryset(queryset, page_size)
 
-        try:
-            plants = paginator.page(page)
-        except PageNotAnInteger:
-            # if page is not integer, deliver 1st page
-            plants = paginator.page(1)
-        except EmptyPage:
-            # If page out of range, deliver last one
-            plants = paginator.page(paginator.num_pages)
+        plants, self.next_after = keyset_page(queryset, after, page_size)
+        return None, None, plants, self.next_after is not None
+
+    def get_context_data(self, **kwargs):
+        """
+        Add additional context data for the template.
+        """
+        context = super().get_context_data(**kwargs)
+        context['next_after'] = self.next_after
+        return context
 
 
 """Create view to display details for plant using generic DetailView"""
 
 
+@method_decorator(vary_on_cookie, name='dispatch')
+@method_decorator(plant_condition, name='dispatch')
 class PlantDetailView(DetailView):
     """A base view for displaying a single object."""
 
@@ -158,12 +210,19 @@ class PlantDetailView(DetailView):
     template_name = 'plant_details.html'
     pk_url_kwarg = 'plant_id'
 
+    def get_object(self, queryset=None):
+        """
+        Get the plant from the cache.
+        """
+        return plant_cache.get_plant(self.kwargs.get(self.pk_url_kwarg))
+
     def get_context_data(self, **kwargs):
         """
         Add additional context data for the template.
         """
         context = super().get_context_data(**kwargs)
         context['plant_id'] = self.kwargs.get(self.pk_url_kwarg)
+        context['photos'] = plant_cache.get_photos(context['plant_id'])
         return context
 
 
@@ -188,7 +247,9 @@ class PLantMaintenanceAddView(CreateView):
         plant = form.cleaned_data['plant']
         # Add confirmation
         messages.success(self.request, f"Zadania dla: { plant.name } zostały dodane.")
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        plant_cache.invalidate_plant(plant.pk)
+        return response
 
     def get_context_data(self, **kwargs):
         """
@@ -225,6 +286,16 @@ class PlantMaintenanceEditView(UpdateView):
         context['plant_id'] = self.object.plant_id
         return context
 
+    def form_valid(self, form):
+        """
+        Save the task and drop cached pages of both the previous and the current plant.
+        """
+        response = super().form_valid(form)
+        plant_cache.invalidate_plant(form.initial.get('plant'), self.object.plant_id)
+        # The signal touches only the current plant
+        touch_plants(form.initial.get('plant'))
+        return response
+
     def get_success_url(self):
         """
         Get the URL to redirect to after successfully updating the object.
@@ -261,6 +332,14 @@ class PlantMaintenanceDeleteView(DeleteView):
         context['message'] = f'Następujące zadanie zostanie usunięte: { task_name } dla {plant_maintenance.plant}'
         return context
 
+    def form_valid(self, form):
+        """
+        Delete the task and drop cached pages of its plant.
+        """
+        response = super().form_valid(form)
+        plant_cache.invalidate_plant(self.object.plant_id)
+        return response
+
     def get_success_url(self):
         """
         Get the URL to redirect to after successfully updating the object.
@@ -271,6 +350,8 @@ class PlantMaintenanceDeleteView(DeleteView):
         return reverse_lazy('maintenance_list', kwargs={'plant_id': plant_id})
 
 
+@method_decorator(vary_on_cookie, name='dispatch')
+@method_decorator(plant_condition, name='dispatch')
 class MaintenanceDetailView(DetailView):
     """
     A view for displaying maintenance tasks for a specific plant.
@@ -280,25 +361,29 @@ class MaintenanceDetailView(DetailView):
     template_name = 'tasks_list.html'
     pk_url_kwarg = 'plant_id'
 
+    def get_object(self, queryset=None):
+        """
+        Get the plant from the cache.
+        """
+        return plant_cache.get_plant(self.kwargs.get(self.pk_url_kwarg))
+
     def get_context_data(self, **kwargs):
         """
         Add additional data to the context.
         """
         context = super().get_context_data(**kwargs)
-        # # Get the plant_id from the URL
+        # Get the plant_id from the URL
         plant_id = self.kwargs.get(self.pk_url_kwarg)
-        # # Retrieve the plant object based on plant_id
-        plant = get_object_or_404(Plant, pk=plant_id)
 
-        # Filter maintenance tasks for the plant
-        tasks = PlantMaintenance.objects.filter(plant_id=plant_id)
+        # Maintenance tasks for the plant
+        tasks = plant_cache.get_maintenance_tasks(plant_id)
 
         # Condition for displaying the message in case no tasks assigned
         if not tasks:
             context['no_tasks'] = True
 
         context['tasks'] = tasks
-        context['plant'] = plant
+        context['plant'] = self.object
         context['plant_id'] = plant_id
         return context
 
@@ -331,7 +416,7 @@ class GardenAddView(LoginRequiredMixin, CreateView):
         return reverse_lazy('add_plant_to_garden', kwargs={'garden_id': self.object.pk})
 
 
-class GardenEditView(UpdateView):
+class GardenEditView(GardenOwnerRequiredMixin, UpdateView):
     """
    A view for editing an existing garden.
    """
@@ -348,7 +433,7 @@ class GardenEditView(UpdateView):
         """
         context = super().get_context_data(**kwargs)
         garden_id = self.kwargs.get(self.pk_url_kwarg)
-        garden = get_object_or_404(Garden, pk=garden_id)
+        garden = self.object
 
         context['button_text'] = 'Edytuj'
         context['message'] = "Edytujesz:"
@@ -375,11 +460,10 @@ class GardensListView(LoginRequiredMixin, ListView):
         """
         Get the queryset of gardens associated with the current user.
         """
-        user = self.request.user
-        return Garden.objects.filter(user=user)
+        return Garden.objects.filter(id__in=get_garden_ids(self.request))
 
 
-class GardenDetailView(DetailView):
+class GardenDetailView(GardenOwnerRequiredMixin, DetailView):
     """
     A view for displaying details of a single garden object.
     """
@@ -388,39 +472,42 @@ class GardenDetailView(DetailView):
     template_name = 'garden_details.html'
     pk_url_kwarg = 'garden_id'
 
+    # On get, not dispatch: the ownership check must come before a 304 answer
+    @method_decorator(vary_on_cookie)
+    @method_decorator(garden_condition)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def get_context_data(self, **kwargs):
         """
         Add additional context data for the template.
         """
         context = super().get_context_data(**kwargs)
-        garden_id = self.kwargs.get(self.pk_url_kwarg)
-        # user = self.request.user
-
-        # Retrieve the garden object with given ID
-        garden = get_object_or_404(Garden, pk=garden_id)
-        # Get all plants associated with garden
-        plants = garden.plants.all()
+        garden = self.object
+        garden_id = garden.pk
+
+        # Fetch all plantings of the garden together with their plants in a single query
+        plant_gardens = (PlantGarden.objects
+                         .filter(garden=garden)
+                         .select_related('plant')
+                         .order_by('plant__name', 'plant_id', 'start_date', 'id'))
+
+        # Group plantings per plant, so the template can walk them directly:
+        # [{'plant': plant, 'plantings': [plant_garden, ...]}, ...]
+        plant_groups = []
+        for plant_garden in plant_gardens:
+            if not plant_groups or plant_groups[-1]['plant'].id != plant_garden.plant_id:
+                plant_groups.append({'plant': plant_garden.plant, 'plantings': []})
+            plant_groups[-1]['plantings'].append(plant_garden)
 
         # Check to display message in case of "no plants associated with the garden"
-        if not plants:
+        if not plant_groups:
             context['no_plants'] = True
 
         context['garden'] = garden
-        context['plants'] = plants
+        context['plants'] = [group['plant'] for group in plant_groups]
+        context['plant_groups'] = plant_groups
         context['garden_id'] = garden_id
-
-        # Get the plant_garden_ids for all plants in the ga
-        # dictionary with key is a tuple:plant.id, plant_garden.start_date, plant_garden.location and value is plant_garden.id
-        plant_garden_ids = {}
-        for plant in plants:
-            # Filtering PlantGarden by garden and plant
-            plant_gardens = PlantGarden.objects.filter(garden=garden, plant=plant)
-            # If there are multiple entries, handle them based on start_date and location
-            for plant_garden in plant_gardens:
-                key = (plant.id, plant_garden.start_date, plant_garden.location)
-                plant_garden_ids[key] = plant_garden.id
-
-        context['plant_garden_ids'] = plant_garden_ids
         return context
 
 
@@ -432,6 +519,7 @@ class PlantSearchView(FormView):
     template_name = 'search_plant.html'
     form_class = PlantSearchForm
     success_url = '/plant_details/'
+    results_limit = 50
 
     def form_valid(self, form):
         """
@@ -439,8 +527,8 @@ class PlantSearchView(FormView):
         """
         # Get the search query from the form
         query = form.cleaned_data.get('query')
-        # Filter plants by name containing the query
-        plants = Plant.objects.filter(name__icontains=query)
+        # Search plants by name and description, best matches first
+        plants = search_plants(query, limit=self.results_limit)
         # Render the response with the search results
         return self.render_to_response(self.get_context_data(form=form, plants=plants))
 
@@ -453,10 +541,86 @@ class PlantSearchView(FormView):
         return context
 
 
+class PlantFacetView(View):
+    """
+    A JSON view for filtering plants by any combination of their attributes.
+
+    Returns a page of matching plants together with per-facet counts for the whole result set,
+    answered from the in-memory attribute index (or from the database if PLANT_ATTRIBUTE_INDEX is off).
+    """
+
+    page_size = 50
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET requests with facet values in the query string.
+        """
+        filters = parse_facet_filters(request.GET)
+        after = parse_cursor_id(request.GET.get('after')) or 0
+
+        if settings.PLANT_ATTRIBUTE_INDEX:
+            # Answer from the in-memory bitmap index, without database queries
+            index = get_attribute_index()
+            matches = index.match(filters)
+            total, facets = index.facet_counts(matches)
+            page, next_after = index.page(matches, after, self.page_size)
+        else:
+            plants = filter_plants(filters)
+            # All facet counts in one aggregate query
+            total, facets = facet_counts(plants)
+            # Keyset pagination over the filtered plants
+            page, next_after = keyset_page(plants.only('id', 'name'), after, self.page_size)
+            page = [(plant.id, plant.name) for plant in page]
+
+        return JsonResponse({
+            'filters': filters,
+            'count': total,
+            'results': [{'id': plant_id, 'name': name} for plant_id, name in page],
+            'next_after': next_after,
+            'facets': facets,
+        })
+
+
+class PlantAutocompleteView(View):
+    """
+    A JSON view suggesting plants whose name (or a word of it) starts with ?q=, for AutocompleteWidget.
+
+    Answered from the in-memory prefix index, without database queries.
+    """
+
+    limit = 10
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET requests with the typed text in ?q=.
+        """
+        results = search_plant_names(request.GET.get('q', ''), self.limit)
+        return JsonResponse({'results': [{'id': plant_id, 'text': name} for plant_id, name in results]})
+
+
+class GardenAutocompleteView(LoginRequiredMixin, View):
+    """
+    A JSON view suggesting gardens of the logged-in user whose name starts with ?q= (all of them for empty ?q=).
+    """
+
+    limit = 10
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET requests with the typed text in ?q=.
+        """
+        query = request.GET.get('q', '').strip()
+        gardens = Garden.objects.filter(id__in=get_garden_ids(request)).order_by('name', 'id')
+        if query:
+            gardens = gardens.filter(name__istartswith=query)
+        results = gardens.values_list('id', 'name')[:self.limit]
+        return JsonResponse({'results': [{'id': garden_id, 'text': name} for garden_id, name in results]})
+
+
 """Create view to add plant to garden using generic CreateView"""
 
 
-class PlantToGardenAddView(CreateView):
+class PlantToGardenAddView(GardenOwnerRequiredMixin, OwnedPlantingMixin, CreateView):
     """
     A view for adding a plant to a garden using a generic CreateView.
     """
@@ -483,7 +647,7 @@ class PlantToGardenAddView(CreateView):
 """Create view to edit plant in garden with initial data using generic UpdateView"""
 
 
-class PlantToGardenEditView(UpdateView):
+class PlantToGardenEditView(OwnedPlantingMixin, UpdateView):
     """
     A view for editing a plant in a garden using a generic UpdateView.
     """
@@ -502,36 +666,32 @@ class PlantToGardenEditView(UpdateView):
         context['message'] = "Edytujesz:"
         return context
 
+    def form_valid(self, form):
+        """
+        Save the planting; if it moved to another garden, the previous garden changed as well.
+        """
+        response = super().form_valid(form)
+        touch_gardens(form.initial.get('garden'))
+        return response
+
     def get_success_url(self):
         """
         Get the URL to redirect to after successfully editing the plant in the garden.
         """
-        # Get_object() method retrieves PlantGarden instance
-        plant_garden = self.get_object()
-        # Access the garden attribute from the PlantGarden instance to get garden.id to hand over to url
-        garden_id = plant_garden.garden.id
-        return reverse_lazy('garden_details', kwargs={'garden_id': garden_id})
+        return reverse_lazy('garden_details', kwargs={'garden_id': self.object.garden_id})
 
 
 """Create view to delete plant using generic DeleteView"""
 
 
-class PlantToGardenDeleteView(LoginRequiredMixin, DeleteView):
+class PlantToGardenDeleteView(OwnedPlantingMixin, DeleteView):
     """
     A view for deleting a plant from a garden using a generic DeleteView.
     """
     model = PlantGarden
     template_name = 'edit_delete.html'
     pk_url_kwarg = 'plant_garden_id'
-
-    def get_object(self, queryset=None):
-        """
-        Get the PlantGarden object based on the provided plant_garden_id.
-        """
-        plant_garden_id = self.kwargs.get(self.pk_url_kwarg)
-        # Get the plant garden associated with the provided ID and the current user
-        plant_garden = PlantGarden.objects.select_related('garden').get(id=plant_garden_id, garden__user=self.request.user)
-        return plant_garden
+    queryset = PlantGarden.objects.select_related('plant')
 
     def get_context_data(self, **kwargs):
         """
@@ -539,8 +699,7 @@ class PlantToGardenDeleteView(LoginRequiredMixin, DeleteView):
         """
         context = super().get_context_data(**kwargs)
         context['button_text'] = 'Usuń'
-        # Get the PlantGarden object
-        plant_garden = self.get_object()
+        plant_garden = self.object
         # Get the plant associated with PlantGarden
         plant = plant_garden.plant
         context['message'] = f'Następująca roślina zostanie usunięta: {plant.name}, posadzona: {plant_garden.start_date}'
@@ -553,7 +712,7 @@ class PlantToGardenDeleteView(LoginRequiredMixin, DeleteView):
         return reverse_lazy('garden_details', kwargs={'garden_id': self.object.garden_id})
 
 
-class DisplayMonthlyTasksView(View):
+class DisplayMonthlyTasksView(GardenOwnerRequiredMixin, View):
     """
     A view for displaying monthly tasks related to a garden.
     """
@@ -566,17 +725,15 @@ class DisplayMonthlyTasksView(View):
 
         # Get garden or return 404 if it doesn't exist
         garden = get_object_or_404(Garden, id=garden_id)
-        plants = garden.plants.all()
 
         month_choices = MONTH_CHOICES
 
-        tasks = PlantMaintenance.objects.filter(plant__plantgarden__garden=garden)
-        month = request.GET.get('month')
-        if month:
-            tasks = tasks.filter(month=month)
+        # Precomputed (planting, task, month, week) rows, filtered by month in Python
+        month = parse_month(request.GET.get('month'))
+        rows = filter_month(build_garden_calendar(garden), month)
 
-    # Pagination
-        paginator = Paginator(tasks, 10)
+        # Pagination
+        paginator = Paginator(rows, 10)
         page = request.GET.get('page')
 
         try:
@@ -590,14 +747,109 @@ class DisplayMonthlyTasksView(View):
 
         context = {
             'garden': garden,
-            'plants': plants,
             'month_choices': month_choices,
-            'selected_month': int(month) if month else None,
+            'selected_month': month,
             'tasks': tasks,
         }
         return render(request, 'monthly_tasks.html', context)
 
 
+class DashboardView(LoginRequiredMixin, View):
+    """
+    A view listing the tasks of this week and the rest of this month in all gardens of the user.
+    """
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET requests; the tasks come from the per-user cache, rebuilt once a week or after changes.
+        """
+        today = timezone.localdate()
+        context = {
+            'gardens': get_dashboard(request.user.pk),
+            'month_label': dict(MONTH_CHOICES).get(today.month),
+            'week': week_of_month(today),
+        }
+        return render(request, 'dashboard.html', context)
+
+
+class GardenExportView(LoginRequiredMixin, View):
+    """
+    A view streaming plantings, maintenance tasks or the schedule of the user's garden as CSV or JSON Lines.
+
+    Rows are read from the database in chunks and written to the response as they come, so memory use
+    does not grow with the size of the garden, under ASGI as well. ?gzip=1 compresses the stream.
+    """
+
+    def get(self, request, garden_id, dataset):
+        """
+        Handle GET requests with ?format=csv|jsonl and optional ?gzip=1.
+        """
+        file_format = request.GET.get('format', 'csv')
+        if dataset not in DATASETS or file_format not in CONTENT_TYPES:
+            raise Http404("Nieznany format eksportu.")
+        # Only gardens of the logged-in user can be exported
+        if not owns_garden(request, garden_id):
+            raise Http404("Nie znaleziono ogrodu.")
+        garden = get_object_or_404(Garden, id=garden_id)
+        compress = request.GET.get('gzip') == '1'
+
+        filename = f'garden-{garden.id}-{dataset}.{file_format}'
+        stream = export_stream(garden, dataset, file_format, compress=compress)
+        if isinstance(request, ASGIRequest):
+            stream = async_chunks(stream)
+        if compress:
+            response = StreamingHttpResponse(stream, content_type='application/gzip')
+            filename += '.gz'
+        else:
+            response = StreamingHttpResponse(stream, content_type=CONTENT_TYPES[file_format])
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class PlantPhotoAddView(LoginRequiredMixin, View):
+    """
+    A view for uploading a photo of a plant.
+
+    The upload is streamed to a temporary file on disk instead of memory, thumbnails are generated
+    in the background after the photo is saved.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        """
+        Replace the upload handlers - possible only before the body is read, so CSRF is checked afterwards.
+        """
+        request.upload_handlers = [TemporaryFileUploadHandler(request)]
+        return self._dispatch(request, *args, **kwargs)
+
+    @method_decorator(csrf_protect)
+    def _dispatch(self, request, *args, **kwargs):
+        return super().dispatch(request, *args, **kwargs)
+
+    def get(self, request, plant_id):
+        """
+        Handle GET requests to display the upload form.
+        """
+        plant = plant_cache.get_plant(plant_id)
+        return render(request, 'add_photo.html', {'form': PlantPhotoForm(), 'plant': plant})
+
+    def post(self, request, plant_id):
+        """
+        Handle POST requests with the uploaded photo.
+        """
+        plant = plant_cache.get_plant(plant_id)
+        form = PlantPhotoForm(request.POST, request.FILES)
+        if not form.is_valid():
+            return render(request, 'add_photo.html', {'form': form, 'plant': plant})
+        photo = form.save(commit=False)
+        photo.plant = plant
+        photo.user = request.user
+        photo.save()
+        enqueue_photo(photo.id)
+        messages.success(request, "Zdjęcie zostało dodane, miniatura pojawi się za chwilę.")
+        return redirect('plant_details', plant_id=plant_id)
+
+
 class AddCommentView(LoginRequiredMixin, View):
     """
     A view for adding comments to a plant.
@@ -621,25 +873,33 @@ class AddCommentView(LoginRequiredMixin, View):
             comment.plant_id = plant_id
             comment.user = request.user
             comment.save()
+            plant_cache.invalidate_plant(plant_id)
         return redirect('plant_details', plant_id=plant_id)
 
 
+@method_decorator(vary_on_cookie, name='dispatch')
+@method_decorator(plant_condition, name='dispatch')
 class CommentsListView(ListView):
     """
-    A view for listing comments related to a plant.
+    A view for listing comments related to a plant, newest first and paginated by cursor.
     """
 
     template_name = 'comments_list.html'
+    page_size = 20
 
     def get_queryset(self):
         """
-        Get the queryset of comments for the specified plant.
+        Get the page of comments for the specified plant.
         """
         # Get the plant ID from the URL parameters
         plant_id = self.kwargs['plant_id']
-        # Filter comments for the selected plant
-        queryset = Comments.objects.filter(plant_id=plant_id)
-        return queryset
+        cursor = self.request.GET.get('cursor')
+        # The first page comes from the cache, older pages are read by cursor
+        if cursor:
+            comments, self.next_cursor = plant_cache.comments_page(plant_id, cursor, self.page_size)
+        else:
+            comments, self.next_cursor = plant_cache.get_comments(plant_id, self.page_size)
+        return comments
 
     def get_context_data(self, **kwargs):
         """
@@ -647,8 +907,78 @@ class CommentsListView(ListView):
         """
         context = super().get_context_data(**kwargs)
         # Get the plant object
-        plant = get_object_or_404(Plant, pk=self.kwargs['plant_id'])
+        plant = plant_cache.get_plant(self.kwargs['plant_id'])
         # Add the plant name to the template context
         context['plant'] = plant
+        context['next_cursor'] = self.next_cursor
 
         return context
+
+
+class CommentsFeedView(View):
+    """
+    A JSON view returning the next slice of a plant's comments, for infinite scrolling.
+    """
+
+    page_size = 20
+
+    def get(self, request, plant_id):
+        """
+        Handle GET requests for the page of comments after ?cursor=.
+        """
+        cursor = request.GET.get('cursor')
+        if cursor:
+            comments, next_cursor = plant_cache.comments_page(plant_id, cursor, self.page_size)
+        else:
+            comments, next_cursor = plant_cache.get_comments(plant_id, self.page_size)
+        return JsonResponse({
+            'comments': [
+                {
+                    'id': comment.id,
+                    'comment': comment.comment,
+                    'created_on': comment.created_on.isoformat(),
+                    'user': comment.user.username,
+                }
+                for comment in comments
+            ],
+            'next_cursor': next_cursor,
+        })
+
+
+class CacheStatsView(UserPassesTestMixin, View):
+    """
+    A JSON view with hit/miss counters of the plant cache in this process, for staff users.
+    """
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET requests returning the cache counters.
+        """
+        return JsonResponse(plant_cache.cache_stats())
+
+
+class MetricsView(UserPassesTestMixin, View):
+    """
+    Request and cache metrics of all worker processes in Prometheus text format.
+
+    Open to staff users and to scrapers sending METRICS_TOKEN as a bearer token.
+    """
+
+    raise_exception = True
+
+    def test_func(self):
+        if self.request.user.is_staff:
+            return True
+        token = settings.METRICS_TOKEN
+        authorization = self.request.META.get('HTTP_AUTHORIZATION', '')
+        return bool(token) and constant_time_compare(authorization, f'Bearer {token}')
+
+    def get(self, request, *args, **kwargs):
+        """
+        Handle GET requests from the Prometheus scraper.
+        """
+        return HttpResponse(metrics.render_exposition(metrics.collect()),
+                            content_type='text/plain; version=0.0.4; charset=utf-8')